@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ActivityEvent
+
+PRUNE_BATCH_SIZE = 1000
+
+_pending = ContextVar("board_activity", default=None)
+
+
+def enabled():
+    return getattr(settings, "BOARD_ACTIVITY_LOG", True)
+
+
+@contextmanager
+def collect(board, actor=None):
+    """Buffer the ``record`` calls made inside; write them with one INSERT on commit.
+
+    Use inside the transaction doing the work: a rollback drops the buffered
+    events together with the on_commit hook, so the log never shows a change
+    that did not happen.
+    """
+    if not enabled():
+        yield
+        return
+    events = []
+    token = _pending.set((board, actor, events))
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+    if events:
+        transaction.on_commit(lambda: ActivityEvent.objects.bulk_create(events))
+
+
+def record(verb, **data):
+    """Note ``verb`` against the board of the enclosing ``collect``; a no-op outside one."""
+    pending = _pending.get()
+    if pending is None:
+        return
+    board, actor, events = pending
+    actor_id = actor.pk if actor is not None and actor.is_authenticated else None
+    events.append(ActivityEvent(board_id=board.id, actor_id=actor_id, verb=verb, data=data))
+
+
+def retention_cutoff(days=None):
+    if days is None:
+        days = getattr(settings, "BOARD_ACTIVITY_RETENTION_DAYS", 90)
+    return timezone.now() - timedelta(days=days)
+
+
+def prune(cutoff, batch_size=PRUNE_BATCH_SIZE):
+    """Delete events older than ``cutoff``, oldest first, one short DELETE per batch."""
+    deleted = 0
+    while True:
+        old = ActivityEvent.objects.filter(created_at__lt=cutoff).order_by("created_at")
+        ids = list(old.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += ActivityEvent.objects.filter(id__in=ids).delete()[0]
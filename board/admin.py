@@ -1,9 +1,9 @@
 from django.contrib import admin
-from .models import Board, BoardMember, List, Card
+from .models import ActivityEvent, Board, BoardMember, List, Card, CardAssignment, ArchivedCard
 
 @admin.register(Board)
 class BoardAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "created_by", "join_code", "created_at")
+    list_display = ("id", "name", "created_by", "join_code", "version", "created_at")
     search_fields = ("name", "join_code", "created_by__username")
 
 @admin.register(BoardMember)
@@ -22,3 +22,22 @@ class CardAdmin(admin.ModelAdmin):
     list_display = ("id", "board", "list", "title", "position", "created_at")
     list_filter = ("board", "list")
     search_fields = ("title", "desc")
+
+@admin.register(CardAssignment)
+class CardAssignmentAdmin(admin.ModelAdmin):
+    list_display = ("id", "board", "card", "user", "tag", "assigned_at")
+    list_filter = ("tag",)
+    search_fields = ("card__title", "user__username")
+    raw_id_fields = ("card", "user", "board")
+
+@admin.register(ActivityEvent)
+class ActivityEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "board", "actor", "verb", "created_at")
+    list_filter = ("verb",)
+    raw_id_fields = ("board", "actor")
+
+@admin.register(ArchivedCard)
+class ArchivedCardAdmin(admin.ModelAdmin):
+    list_display = ("id", "board", "list_title", "title", "finished_at", "archived_at")
+    list_filter = ("board",)
+    search_fields = ("title", "desc")
@@ -1,5 +1,17 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 class BoardConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "board"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .db import configure_connection
+        from .instrumentation import install_query_recorder
+        from .search import install_after_migrate
+
+        connection_created.connect(configure_connection)
+        connection_created.connect(install_query_recorder)
+        post_migrate.connect(install_after_migrate, sender=self)
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Board, Card
+from .operations import archive, bump_version
+
+ARCHIVE_BATCH_SIZE = 500
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = getattr(settings, "BOARD_ARCHIVE_AFTER_DAYS", 30)
+    return timezone.now() - timedelta(days=days)
+
+
+def due_cards(cutoff, board_id=None):
+    """Cards finished at or before ``cutoff``; served by the partial finished_at index."""
+    cards = Card.objects.filter(tag=Card.TAG_FINISHED, finished_at__lte=cutoff)
+    if board_id is not None:
+        cards = cards.filter(board_id=board_id)
+    return cards
+
+
+def due_batch(cards, batch_size):
+    # Oldest first: the partial finished_at index serves both the filter and the order.
+    return cards.order_by("finished_at", "id").values_list("id", "board_id")[:batch_size]
+
+
+def archive_due(cutoff, board_id=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """Archive due cards in batches; return ``{board_id: archived}``.
+
+    Every board in a batch gets its own short transaction and version bump,
+    so a large backlog never holds a board's lock for long.
+    """
+    archived = {}
+    while True:
+        by_board = {}
+        for card_id, pk in due_batch(due_cards(cutoff, board_id), batch_size):
+            by_board.setdefault(pk, []).append(card_id)
+        if not by_board:
+            return archived
+        for pk, ids in by_board.items():
+            with transaction.atomic():
+                board = Board.objects.filter(id=pk).first()
+                if board is None:
+                    continue
+                bump_version(board)
+                # Re-checked under the board lock: a card may have been edited since.
+                moved, _ = archive(board, due_cards(cutoff, pk).filter(id__in=ids))
+            archived[pk] = archived.get(pk, 0) + len(moved)
@@ -0,0 +1,221 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+
+from .counters import recount
+from .models import Board, BoardMember, List, Card, desc_preview
+from .ordering import nth_position
+
+
+def bench_user(username="bench"):
+    User = get_user_model()
+    user, _ = User.objects.get_or_create(username=username)
+    return user
+
+
+WORDS = (
+    "budget essay review plan exam vocabulary reading writing listening speaking finance charity "
+    "project report draft notes revision practice mock goal weekly daily club volunteer journal "
+    "spreadsheet article summary outline deadline feedback lecture tutorial quiz grammar"
+).split()
+
+
+def random_text(rng, words=8, vocabulary=20000):
+    # A few common words plus a long tail, roughly like real card text.
+    return " ".join(
+        rng.choice(WORDS) if rng.random() < 0.2 else f"term{rng.randrange(vocabulary)}"
+        for _ in range(words)
+    )
+
+
+def seed_board(owner, lists=3, cards_per_list=10, desc="", name="Bench board", text=None):
+    b = Board.objects.create(name=name, created_by=owner, join_code=Board.generate_join_code())
+    BoardMember.objects.create(board=b, user=owner, role=BoardMember.ROLE_ADMIN)
+    created = List.objects.bulk_create(
+        List(board=b, title=f"List {li}", position=nth_position(li)) for li in range(lists)
+    )
+    def card(lst, ci):
+        title, body = (f"Card {ci}", desc) if text is None else (text(), text())
+        return Card(
+            board=b, list=lst, title=title, desc=body, desc_preview=desc_preview(body), position=nth_position(ci)
+        )
+
+    for lst in created:
+        Card.objects.bulk_create((card(lst, ci) for ci in range(cards_per_list)), batch_size=1000)
+    recount(b)
+    return b
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        yield counter
+
+
+def explain(qs):
+    # QuerySet.explain() puts the prefix inside the subquery that filtering on a window adds.
+    sql, params = qs.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+        return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+
+
+def timed(fn, repeat=20):
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(samples):
+    return {
+        "n": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def seed_members(board, count, username="bench-member"):
+    """``count`` extra members of ``board``, cycling through the non-admin roles."""
+    User = get_user_model()
+    roles = [BoardMember.ROLE_MENTOR, BoardMember.ROLE_STUDENT, BoardMember.ROLE_SPECTATOR]
+    users = User.objects.bulk_create(
+        User(username=f"{username}-{board.id}-{i}", password="!") for i in range(count)
+    )
+    BoardMember.objects.bulk_create(
+        BoardMember(board=board, user=u, role=roles[i % len(roles)]) for i, u in enumerate(users)
+    )
+    return users
+
+
+WORKLOADS = {}
+
+
+def workload(name):
+    """Register ``setup(client, board) -> request(i)`` as a named benchmark workload."""
+    def decorator(setup):
+        WORKLOADS[name] = setup
+        return setup
+    return decorator
+
+
+def _check(res):
+    if res.status_code != 200:
+        raise RuntimeError(f"{res.request['PATH_INFO']} answered {res.status_code}")
+    if getattr(res, "streaming", False):
+        b"".join(res.streaming_content)
+    return res
+
+
+def _lists_and_cards(board):
+    lists = list(board.lists.order_by("position", "id").values_list("id", flat=True))
+    cards = list(Card.objects.filter(board=board).order_by("id").values_list("id", flat=True))
+    return lists, cards
+
+
+@workload("board_view")
+def _board_view(client, board):
+    url = reverse("board:board_view", args=[board.id])
+    return lambda i: _check(client.get(url))
+
+
+@workload("card_move")
+def _card_move(client, board):
+    url = reverse("board:card_move", args=[board.id])
+    lists, cards = _lists_and_cards(board)
+
+    def request(i):
+        body = {"card_id": cards[i % len(cards)], "to_list_id": lists[i % len(lists)], "to_index": i % 10}
+        _check(client.post(url, body, content_type="application/json"))
+    return request
+
+
+@workload("list_reorder")
+def _list_reorder(client, board):
+    url = reverse("board:list_reorder", args=[board.id])
+    lists, _ = _lists_and_cards(board)
+
+    def request(i):
+        shift = i % len(lists) + 1
+        _check(client.post(url, {"order": lists[shift:] + lists[:shift]}, content_type="application/json"))
+    return request
+
+
+@workload("card_update")
+def _card_update(client, board):
+    _, cards = _lists_and_cards(board)
+
+    def request(i):
+        url = reverse("board:card_update", args=[board.id, cards[i % len(cards)]])
+        body = {"title": f"Edited {i}", "desc": "Benchmark edit", "tag": "in_progress"}
+        _check(client.post(url, body, content_type="application/json"))
+    return request
+
+
+@workload("export_json")
+def _export_json(client, board):
+    url = reverse("board:export_json", args=[board.id])
+    return lambda i: _check(client.get(url, {"compact": 1}))
+
+
+@workload("search")
+def _search(client, board):
+    url = reverse("board:card_search", args=[board.id])
+    terms = ["budget", "essay review", "term42", "weekly plan"]
+    return lambda i: _check(client.get(url, {"q": terms[i % len(terms)]}))
+
+
+def committing(request):
+    """Run the on_commit hooks each request queues right after it, as its commit would.
+
+    The benches share one rolled-back transaction, so the hooks (event
+    publishing, activity inserts) would otherwise never run or be timed.
+    """
+    def call(i):
+        start = len(connection.run_on_commit)
+        response = request(i)
+        hooks = connection.run_on_commit[start:]
+        del connection.run_on_commit[start:]
+        for _, hook, _ in hooks:
+            hook()
+        return response
+    return call
+
+
+def run_workload(setup, client, board, repeat, warmup=2):
+    request = committing(setup(client, board))
+    for i in range(warmup):
+        request(i)
+    with count_queries() as counter:
+        samples = timed(request, repeat)
+    row = {"queries": round(counter.count / len(samples), 2), "rps": round(len(samples) / sum(samples), 1)}
+    row.update(summarize(samples))
+    return row
@@ -0,0 +1,111 @@
+from collections import Counter, defaultdict
+
+from django.db import models
+
+from .models import TAG_COUNTERS, Board, List, Card
+from .ordering import POSITION_STEP, nth_position
+
+COUNTER_FIELDS = tuple(TAG_COUNTERS.values())
+
+
+def _increments(by_tag):
+    return {TAG_COUNTERS[tag]: models.F(TAG_COUNTERS[tag]) + n for tag, n in by_tag.items()}
+
+
+def tag_fields(tags):
+    """Counter field values for cards carrying ``tags``."""
+    seen = Counter(tags)
+    return {field: seen[tag] for tag, field in TAG_COUNTERS.items()}
+
+
+def tally(rows):
+    """``{list_id: Counter(tag)}`` from ``(list_id, tag)`` pairs."""
+    deltas = defaultdict(Counter)
+    for list_id, tag in rows:
+        deltas[list_id][tag] += 1
+    return deltas
+
+
+def negate(deltas):
+    return {list_id: {tag: -n for tag, n in by_tag.items()} for list_id, by_tag in deltas.items()}
+
+
+def adjust_board(board, by_tag, **fields):
+    by_tag = {tag: n for tag, n in by_tag.items() if n}
+    if by_tag or fields:
+        Board.objects.filter(id=board.id).update(**_increments(by_tag), **fields)
+
+
+def adjust(board, deltas, fields=None):
+    """Add ``{list_id: {tag: n}}`` to the list counters and their sum to the board's.
+
+    F() expressions throughout, so concurrent writers never lose an update:
+    one UPDATE per touched list plus one for the board. Lists whose counts
+    change take the board version, which keys their cached fragment and
+    delta sync. ``fields`` adds ``{list_id: {field: value}}`` to the same
+    statements. Returns the non-zero deltas, keyed for JSON, for events.
+    """
+    fields = fields or {}
+    totals = Counter()
+    changed = {}
+    for list_id in {*deltas, *fields}:
+        by_tag = {tag: n for tag, n in deltas.get(list_id, {}).items() if n}
+        extra = dict(fields.get(list_id, {}))
+        if by_tag:
+            extra["version"] = board.version
+            totals.update(by_tag)
+            changed[str(list_id)] = by_tag
+        if by_tag or extra:
+            List.objects.filter(board=board, id=list_id).update(**_increments(by_tag), **extra)
+    adjust_board(board, totals)
+    return changed
+
+
+def template_counts(template):
+    """Board counters for a fresh board seeded from ``template``."""
+    rows = template.get("lists", [])
+    counts = tag_fields(card.get("tag", Card.TAG_NOT_STARTED) for row in rows for card in row.get("cards", []))
+    counts["next_list_position"] = nth_position(len(rows))
+    return counts
+
+
+def recount(board):
+    """Recompute the board's counters from its rows, and lift any next position
+    that is not above every existing one (a higher one is left alone).
+
+    One grouped query over the cards plus the writes; returns True when anything was off.
+    """
+    lists = list(List.objects.filter(board=board).order_by("id"))
+    counts = defaultdict(Counter)
+    tops = {}
+    rows = (
+        Card.objects.filter(board=board)
+        .values_list("list_id", "tag")
+        .annotate(n=models.Count("id"), top=models.Max("position"))
+        .order_by()
+    )
+    for list_id, tag, n, top in rows:
+        counts[list_id][tag] = n
+        tops[list_id] = max(top, tops.get(list_id, 0))
+
+    stale = []
+    for lst in lists:
+        expected = {TAG_COUNTERS[tag]: counts[lst.id][tag] for tag in TAG_COUNTERS}
+        expected["next_card_position"] = max(lst.next_card_position, tops.get(lst.id, 0) + POSITION_STEP)
+        if any(getattr(lst, f) != v for f, v in expected.items()):
+            for f, v in expected.items():
+                setattr(lst, f, v)
+            lst.version = board.version
+            stale.append(lst)
+    if stale:
+        List.objects.bulk_update(stale, [*COUNTER_FIELDS, "next_card_position", "version"], batch_size=500)
+
+    board_counts = {field: sum(getattr(lst, field) for lst in lists) for field in COUNTER_FIELDS}
+    top = max((lst.position for lst in lists), default=0)
+    board_counts["next_list_position"] = max(board.next_list_position, top + POSITION_STEP)
+    board_stale = any(getattr(board, f) != v for f, v in board_counts.items())
+    if board_stale:
+        Board.objects.filter(id=board.id).update(**board_counts)
+        for f, v in board_counts.items():
+            setattr(board, f, v)
+    return bool(stale) or board_stale
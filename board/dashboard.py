@@ -0,0 +1,82 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+from .exporting import list_counts
+from .models import BoardMember, List
+from .pagination import before_time_cursor, encode_time_cursor
+
+DASHBOARD_PAGE_SIZE = 50
+
+
+def _timeout():
+    return getattr(settings, "BOARD_DASHBOARD_CACHE_TIMEOUT", 60)
+
+
+def _generation_key(user_id):
+    return f"board:dashboard:gen:{user_id}"
+
+
+def forget_dashboard(user_id):
+    """Retire every cached page of ``user_id``'s dashboard at once."""
+    if _timeout():
+        cache.set(_generation_key(user_id), time.time_ns(), None)
+
+
+def build_page(user, cursor=None, limit=DASHBOARD_PAGE_SIZE):
+    """One page of ``user``'s boards, newest membership first, in two queries.
+
+    Card counts and last activity come from the board row itself; list counts
+    from one grouped query over the page's boards.
+    """
+    members = (
+        BoardMember.objects.filter(user=user)
+        .select_related("board")
+        .order_by("-joined_at", "-id")
+    )
+    if cursor:
+        members = before_time_cursor(members, "joined_at", cursor)
+    page = list(members[:limit + 1])
+    next_cursor = encode_time_cursor(page[limit - 1].joined_at, page[limit - 1].id) if len(page) > limit else None
+    page = page[:limit]
+
+    lists = dict(
+        List.objects.filter(board_id__in=[m.board_id for m in page])
+        .values_list("board_id")
+        .annotate(n=models.Count("id"))
+        .order_by()
+    )
+    boards = [
+        {
+            "id": m.board_id,
+            "name": m.board.name,
+            "role": m.role,
+            "joined_at": m.joined_at.isoformat(),
+            "lists": lists.get(m.board_id, 0),
+            "cards": list_counts(m.board),
+            "cards_total": m.board.cards_total,
+            "last_activity_at": m.board.last_activity_at.isoformat(),
+        }
+        for m in page
+    ]
+    return {"boards": boards, "next": next_cursor}
+
+
+def dashboard_page(user, cursor=None, limit=DASHBOARD_PAGE_SIZE):
+    """``build_page`` behind the cache, keyed on the user's dashboard generation.
+
+    Membership changes bump the generation; counts and activity may lag by
+    up to BOARD_DASHBOARD_CACHE_TIMEOUT seconds.
+    """
+    timeout = _timeout()
+    if not timeout:
+        return build_page(user, cursor, limit)
+    generation = cache.get_or_set(_generation_key(user.pk), time.time_ns, None)
+    key = f"board:dashboard:{user.pk}:{generation}:{cursor or ''}:{limit}"
+    page = cache.get(key)
+    if page is None:
+        page = build_page(user, cursor, limit)
+        cache.set(key, page, timeout)
+    return page
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+SQLITE_PRAGMA_NAMES = {"journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size", "temp_store"}
+
+
+def sqlite_pragma_statements(pragmas):
+    # busy_timeout goes first so that switching journal_mode waits for the lock too.
+    for name, value in sorted(pragmas.items(), key=lambda item: item[0] != "busy_timeout"):
+        if name not in SQLITE_PRAGMA_NAMES:
+            raise ImproperlyConfigured(f"Unsupported SQLite pragma: {name}")
+        if not isinstance(value, int) and not str(value).isidentifier():
+            raise ImproperlyConfigured(f"Bad value for SQLite pragma {name}: {value!r}")
+        yield f"PRAGMA {name} = {value}"
+
+
+def apply_sqlite_pragmas(cursor, pragmas):
+    for statement in sqlite_pragma_statements(pragmas):
+        cursor.execute(statement)
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", None)
+    if pragmas:
+        with connection.cursor() as cursor:
+            apply_sqlite_pragmas(cursor, pragmas)
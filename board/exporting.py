@@ -0,0 +1,145 @@
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+
+from .models import TAG_COUNTERS, BoardMember, List, Card, Tombstone
+
+EXPORT_CHUNK_SIZE = 2000
+STREAM_BUFFER_BYTES = 64 * 1024
+
+_compact = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+def board_data(board):
+    return {"id": board.id, "name": board.name, "join_code": board.join_code}
+
+
+def member_data(m):
+    return {"username": m.user.username, "role": m.role}
+
+
+def list_data(lst):
+    return {"id": lst.id, "title": lst.title, "position": lst.position}
+
+
+def list_counts(lst):
+    return {tag: getattr(lst, field) for tag, field in TAG_COUNTERS.items()}
+
+
+def card_data(c):
+    return {
+        "id": c.id,
+        "list_id": c.list_id,
+        "title": c.title,
+        "desc": c.desc,
+        "tag": c.tag,
+        "position": c.position,
+        "created_at": c.created_at.isoformat(),
+    }
+
+
+def export_sections(board):
+    """Yield ``(key, item_type, rows)`` for each exported collection, lazily."""
+    members = BoardMember.objects.select_related("user").filter(board=board).order_by("role", "user__username")
+    lists = List.objects.filter(board=board).order_by("position", "id")
+    cards = Card.objects.filter(board=board).order_by("list_id", "position", "id")
+
+    yield "members", "member", (member_data(m) for m in members.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+    yield "lists", "list", (list_data(l) for l in lists.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+    yield "cards", "card", (card_data(c) for c in cards.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+
+
+def export_document(board):
+    data = {"board": board_data(board)}
+    for key, _, rows in export_sections(board):
+        data[key] = list(rows)
+    return data
+
+
+def changes_since(board, since):
+    """Lists and cards written after version ``since``, plus ids deleted since then.
+
+    ``since`` of 0, or one ahead of the board (a restored database), gets the
+    full board instead with ``full`` set. Rows committed while this runs may
+    carry a newer version than the one returned; clients just see them twice.
+    """
+    full = since <= 0 or since > board.version
+    lists = List.objects.filter(board=board).order_by("position", "id")
+    cards = Card.objects.filter(board=board).order_by("list_id", "position", "id")
+    deleted = {"lists": [], "cards": []}
+    if not full:
+        # Deltas come in write order, which the (board, version) indexes serve without a sort.
+        lists = lists.filter(version__gt=since).order_by("version", "id")
+        cards = cards.filter(version__gt=since).order_by("version", "id")
+        tombstones = Tombstone.objects.filter(board=board, version__gt=since).order_by("version", "id")
+        for kind, object_id in tombstones.values_list("kind", "object_id"):
+            deleted[kind + "s"].append(object_id)
+
+    return {
+        "version": board.version,
+        "since": since,
+        "full": full,
+        "lists": [{**list_data(l), "counts": list_counts(l)} for l in lists],
+        "cards": [card_data(c) for c in cards],
+        "deleted": deleted,
+    }
+
+
+def iter_json(board):
+    yield '{"board":' + _compact(board_data(board))
+    for key, _, rows in export_sections(board):
+        yield f',"{key}":['
+        sep = ""
+        for row in rows:
+            yield sep + _compact(row)
+            sep = ","
+        yield "]"
+    yield "}"
+
+
+def iter_ndjson(board):
+    yield _compact({"type": "board", **board_data(board)}) + "\n"
+    for _, item_type, rows in export_sections(board):
+        for row in rows:
+            yield _compact({"type": item_type, **row}) + "\n"
+
+
+def buffered(chunks, size=STREAM_BUFFER_BYTES):
+    buf = []
+    buffered_len = 0
+    for chunk in chunks:
+        data = chunk.encode()
+        buf.append(data)
+        buffered_len += len(data)
+        if buffered_len >= size:
+            yield b"".join(buf)
+            buf = []
+            buffered_len = 0
+    if buf:
+        yield b"".join(buf)
+
+
+async def aiterate(chunks):
+    """Drive the sync ``chunks`` from an async response, one chunk per thread hop.
+
+    Under ASGI Django would otherwise collect a sync iterator into a list
+    before sending anything. The hops are thread-sensitive, so the database
+    cursors behind ``chunks`` stay on the thread that opened them.
+    """
+    chunks = iter(chunks)
+    step = sync_to_async(next)
+    while True:
+        chunk = await step(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
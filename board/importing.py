@@ -0,0 +1,152 @@
+import json
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import COUNTER_FIELDS, tag_fields
+from .dashboard import forget_dashboard
+from .models import BoardMember, List, Card, desc_preview
+from .ordering import nth_position
+from .seeds import insert_board
+
+IMPORT_BATCH_SIZE = 1000
+
+
+class InvalidImport(ValueError):
+    pass
+
+
+def parse_document(raw):
+    """Accept either an export_json document or its NDJSON form."""
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    try:
+        doc = json.loads(raw)
+    except ValueError:
+        doc = None
+    if isinstance(doc, dict) and doc.get("type") != "board":
+        return doc
+
+    doc = {"board": {}, "members": [], "lists": [], "cards": []}
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise InvalidImport("bad_json")
+        if not isinstance(row, dict):
+            raise InvalidImport("bad_json")
+        kind = row.pop("type", None)
+        if kind == "board":
+            doc["board"] = row
+        elif kind in ("member", "list", "card"):
+            doc[kind + "s"].append(row)
+        else:
+            raise InvalidImport("bad_row_type")
+    return doc
+
+
+def _is_int(value):
+    return value is None or (isinstance(value, int) and not isinstance(value, bool))
+
+
+def _valid_rows(rows, keys):
+    return isinstance(rows, list) and all(isinstance(r, dict) and all(_is_int(r.get(k)) for k in keys) for r in rows)
+
+
+def _sort_key(row):
+    return (row.get("position") or 0, row.get("id") or 0)
+
+
+def import_board(doc, owner, name=None, with_members=False, batch_size=IMPORT_BATCH_SIZE):
+    lists = doc.get("lists") or []
+    cards = doc.get("cards") or []
+    members = doc.get("members") or []
+    # Ids, list references and positions are sorted and hashed below: ints (or absent) only.
+    if not (
+        _valid_rows(lists, ("id", "position"))
+        and _valid_rows(cards, ("id", "list_id", "position"))
+        and _valid_rows(members, ())
+    ):
+        raise InvalidImport("bad_document")
+
+    name = str(name or (doc.get("board") or {}).get("name") or "").strip()[:120] or "Untitled board"
+    valid_tags = dict(Card.TAG_CHOICES).keys()
+    valid_roles = dict(BoardMember.ROLE_CHOICES).keys()
+
+    cards_by_list = defaultdict(list)
+    for row in cards:
+        if row.get("tag") not in valid_tags:
+            row = {**row, "tag": Card.TAG_NOT_STARTED}
+        cards_by_list[row.get("list_id")].append(row)
+
+    ordered_lists = sorted(lists, key=_sort_key)
+    # A repeated list id keeps its last list, as in the mapping below.
+    owner_index = {row.get("id"): idx for idx, row in enumerate(ordered_lists)}
+    if set(cards_by_list) - set(owner_index):
+        raise InvalidImport("unknown_list")
+
+    def counts_for(idx, row):
+        rows = cards_by_list.get(row.get("id"), ()) if owner_index[row.get("id")] == idx else ()
+        counts = tag_fields(card["tag"] for card in rows)
+        counts["next_card_position"] = nth_position(len(rows))
+        return counts
+
+    list_counts = [counts_for(idx, row) for idx, row in enumerate(ordered_lists)]
+    board_counts = {field: sum(c[field] for c in list_counts) for field in COUNTER_FIELDS}
+
+    with transaction.atomic():
+        board = insert_board(
+            name=name, created_by=owner, next_list_position=nth_position(len(ordered_lists)), **board_counts
+        )
+        new_members = [BoardMember(board=board, user=owner, role=BoardMember.ROLE_ADMIN)]
+        if with_members:
+            roles = {
+                m.get("username"): m.get("role")
+                for m in members
+                if m.get("role") in valid_roles and m.get("username") != owner.get_username()
+            }
+            users = get_user_model().objects.filter(username__in=list(roles))
+            new_members += [BoardMember(board=board, user=u, role=roles[u.username]) for u in users]
+        BoardMember.objects.bulk_create(new_members)
+        for m in new_members:
+            forget_dashboard(m.user_id)
+
+        new_lists = List.objects.bulk_create(
+            [
+                List(
+                    board=board,
+                    title=str(row.get("title") or "Untitled")[:120],
+                    position=nth_position(idx),
+                    **list_counts[idx],
+                )
+                for idx, row in enumerate(ordered_lists)
+            ],
+            batch_size=batch_size,
+        )
+        list_ids = {row.get("id"): lst for row, lst in zip(ordered_lists, new_lists)}
+
+        now = timezone.now()
+        new_cards = []
+        for old_id, lst in list_ids.items():
+            for idx, row in enumerate(sorted(cards_by_list.get(old_id, ()), key=_sort_key)):
+                tag = row["tag"]
+                desc = str(row.get("desc") or "")
+                new_cards.append(
+                    Card(
+                        board=board,
+                        list=lst,
+                        title=str(row.get("title") or "Untitled")[:200],
+                        desc=desc,
+                        desc_preview=desc_preview(desc),
+                        tag=tag,
+                        position=nth_position(idx),
+                        finished_at=now if tag == Card.TAG_FINISHED else None,
+                    )
+                )
+        Card.objects.bulk_create(new_cards, batch_size=batch_size)
+
+    return board
@@ -0,0 +1,191 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger("board.metrics")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+_current = ContextVar("board_request_metrics", default=None)
+
+
+class QueryLog:
+    """Queries issued while handling one request, fed by ``record_query``."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def duplicates(self):
+        """``(sql, times)`` for statements run more than once; the mark of an N+1 loop."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n > 1]
+
+
+def record_query(execute, sql, params, many, context):
+    log = _current.get()
+    if log is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        log.seconds += time.perf_counter() - start
+        log.count += 1
+        log.statements[sql] += 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # Connected to connection_created for every connection, whether or not the
+    # middleware is enabled: outside a measured request it is a single lookup.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.total:.6f}"
+        yield f"{name}_count{{{labels}}} {cumulative}"
+
+
+class Registry:
+    """Per-process request metrics, rendered in the Prometheus text format.
+
+    Each worker process keeps its own numbers; scrape every worker or run one
+    metrics-enabled process per host.
+    """
+
+    HISTOGRAMS = (
+        ("lini_request_duration_seconds", "Wall time per request.", DURATION_BUCKETS),
+        ("lini_request_db_seconds", "Time spent in SQL per request.", DURATION_BUCKETS),
+        ("lini_request_queries", "SQL queries per request.", QUERY_BUCKETS),
+    )
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.requests = Counter()
+        self.duplicates = Counter()
+
+    def observe(self, view, method, status, wall, db, queries, duplicates):
+        with self.lock:
+            for (name, _, buckets), value in zip(self.HISTOGRAMS, (wall, db, queries)):
+                key = (name, view, method)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(buckets)
+                self.histograms[key].observe(value)
+            self.requests[(view, method, status)] += 1
+            self.duplicates[view] += duplicates
+
+    def render(self):
+        with self.lock:
+            out = []
+            for name, help_text, _ in self.HISTOGRAMS:
+                out += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (metric, view, method), hist in sorted(self.histograms.items()):
+                    if metric == name:
+                        out += hist.lines(name, f'view="{view}",method="{method}"')
+            out += ["# HELP lini_requests_total Requests handled.", "# TYPE lini_requests_total counter"]
+            for (view, method, status), n in sorted(self.requests.items()):
+                out.append(f'lini_requests_total{{view="{view}",method="{method}",status="{status}"}} {n}')
+            out += [
+                "# HELP lini_duplicate_queries_total Queries repeating an earlier statement of the same request.",
+                "# TYPE lini_duplicate_queries_total counter",
+            ]
+            for view, n in sorted(self.duplicates.items()):
+                out.append(f'lini_duplicate_queries_total{{view="{view}"}} {n}')
+            return "\n".join(out) + "\n"
+
+
+registry = Registry()
+
+
+class RequestMetricsMiddleware:
+    """Time each request and its SQL; report via Server-Timing, logs and /metrics.
+
+    Enabled with BOARD_METRICS=1. Queries are attributed through a context
+    variable, so work done by async views in sync_to_async threads counts too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        log, token, start = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, log, start)
+
+    async def __acall__(self, request):
+        log, token, start = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, log, start)
+
+    def _start(self):
+        log = QueryLog()
+        return log, _current.set(log), time.perf_counter()
+
+    def _finish(self, request, response, log, start):
+        wall = time.perf_counter() - start
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name if match else None) or "unresolved"
+        duplicates = log.duplicates()
+        repeated = sum(n - 1 for _, n in duplicates)
+
+        registry.observe(view, request.method, response.status_code, wall, log.seconds, log.count, repeated)
+        response["Server-Timing"] = (
+            f'app;dur={wall * 1000:.1f}, db;dur={log.seconds * 1000:.1f};desc="{log.count} queries"'
+        )
+
+        line = {
+            "view": view,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "wall_ms": round(wall * 1000, 2),
+            "db_ms": round(log.seconds * 1000, 2),
+            "queries": log.count,
+            "duplicate_queries": repeated,
+        }
+        threshold = getattr(settings, "BOARD_METRICS_DUPLICATE_THRESHOLD", 5)
+        if duplicates and duplicates[0][1] >= threshold:
+            line["repeated_sql"] = duplicates[0][0][:500]
+            line["repeated_times"] = duplicates[0][1]
+            logger.warning(json.dumps(line))
+        else:
+            logger.info(json.dumps(line))
+        return response
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from board.archiving import ARCHIVE_BATCH_SIZE, archive_cutoff, archive_due, due_cards
+
+
+class Command(BaseCommand):
+    help = "Move cards finished more than --days ago into the archive table, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Defaults to BOARD_ARCHIVE_AFTER_DAYS (30).")
+        parser.add_argument("--board-id", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options["days"])
+        if options["dry_run"]:
+            count = due_cards(cutoff, options["board_id"]).count()
+            self.stdout.write(f"{count} cards finished before {cutoff:%Y-%m-%d %H:%M} would be archived")
+            return
+
+        archived = archive_due(cutoff, board_id=options["board_id"], batch_size=max(1, options["batch_size"]))
+        for board_id, count in archived.items():
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Board {board_id}: {count}")
+        total = sum(archived.values())
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} cards from {len(archived)} boards"))
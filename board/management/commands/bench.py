@@ -0,0 +1,98 @@
+import json
+import random
+import subprocess
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+
+from board.benchmarks import WORKLOADS, bench_user, random_text, run_workload, seed_board, seed_members
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def regressions(results, baseline, threshold):
+    """Rows whose p50 grew by more than ``threshold`` (a fraction) against ``baseline``."""
+    before = {row["workload"]: row for row in baseline.get("results", [])}
+    slower = []
+    for row in results:
+        old = before.get(row["workload"])
+        if old and old["p50_ms"] and row["p50_ms"] > old["p50_ms"] * (1 + threshold):
+            slower.append(f"{row['workload']} p50 {old['p50_ms']} -> {row['p50_ms']} ms")
+        if old and row["queries"] > old["queries"]:
+            slower.append(f"{row['workload']} queries {old['queries']} -> {row['queries']}")
+    return slower
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic board and time the board API through the test client: p50/p95/p99 latency, "
+        "queries per request and throughput, as JSON. Runs in a rolled-back transaction. "
+        "Use --output to save a run and --baseline to compare against one from another commit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lists", type=int, default=10)
+        parser.add_argument("--cards", type=int, default=1000, help="Cards on the board, spread over the lists")
+        parser.add_argument("--members", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--workloads", default=",".join(WORKLOADS), help="Comma-separated, among: " + ", ".join(WORKLOADS))
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--output", help="Also write the report to this file")
+        parser.add_argument("--baseline", help="A previous report; fail if a workload got slower or issues more queries")
+        parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p50 growth against --baseline (0.2 = 20%%)")
+
+    def handle(self, *args, **options):
+        names = [n.strip() for n in options["workloads"].split(",") if n.strip()]
+        unknown = [n for n in names if n not in WORKLOADS]
+        if unknown:
+            raise CommandError(f"Unknown workloads: {', '.join(unknown)}")
+        if options["lists"] < 1 or options["cards"] < options["lists"]:
+            raise CommandError("Need at least one list and one card per list.")
+
+        rng = random.Random(options["seed"])
+        results = []
+        with transaction.atomic():
+            owner = bench_user()
+            b = seed_board(
+                owner,
+                lists=options["lists"],
+                cards_per_list=options["cards"] // options["lists"],
+                text=lambda: random_text(rng),
+                name="API bench",
+            )
+            seed_members(b, options["members"])
+            client = Client()
+            client.force_login(owner)
+
+            for name in names:
+                row = {"workload": name}
+                row.update(run_workload(WORKLOADS[name], client, b, options["repeat"]))
+                results.append(row)
+            transaction.set_rollback(True)
+
+        report = {
+            "revision": git_revision(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "params": {k: options[k] for k in ("lists", "cards", "members", "repeat", "seed")},
+            "results": results,
+        }
+        text = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(text + "\n")
+        self.stdout.write(text)
+
+        if options["baseline"]:
+            with open(options["baseline"]) as fh:
+                slower = regressions(results, json.load(fh), options["threshold"])
+            if slower:
+                raise CommandError("Regressions against baseline:\n  " + "\n  ".join(slower))
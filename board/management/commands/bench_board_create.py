@@ -0,0 +1,62 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from board.benchmarks import bench_user, count_queries, summarize, timed
+from board.models import Board, BoardMember, List, Card
+from board.ordering import nth_position
+from board.seeds import TEMPLATES, create_board
+
+
+def row_by_row(owner, template):
+    # The previous board_create: pre-checked join code, one INSERT per row.
+    join_code = Board.generate_join_code()
+    while Board.objects.filter(join_code=join_code).exists():
+        join_code = Board.generate_join_code()
+    with transaction.atomic():
+        b = Board.objects.create(name=template["board_name"], created_by=owner, join_code=join_code)
+        BoardMember.objects.create(board=b, user=owner, role=BoardMember.ROLE_ADMIN)
+        for li, row in enumerate(template["lists"]):
+            List.objects.create(board=b, title=row["title"], position=nth_position(li))
+            lst = b.lists.get(position=nth_position(li))
+            for ci, card in enumerate(row.get("cards", [])):
+                Card.objects.create(board=b, list=lst, title=card["title"], desc=card.get("desc", ""), position=nth_position(ci))
+
+
+def bulk(owner, template):
+    create_board(owner, template)
+
+
+class Command(BaseCommand):
+    help = "Measure board creations per second, row by row against bulk seeding. Runs in a rolled-back transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--templates", default="starter,maiphuonglinh", help="Comma-separated template names")
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        names = [n.strip() for n in options["templates"].split(",") if n.strip()]
+        unknown = [n for n in names if n not in TEMPLATES]
+        if unknown:
+            raise CommandError(f"Unknown templates: {', '.join(unknown)}")
+
+        results = []
+        with transaction.atomic():
+            owner = bench_user()
+            for name in names:
+                template = TEMPLATES[name]
+                for scheme, create in (("row_by_row", row_by_row), ("bulk", bulk)):
+                    with count_queries() as counter:
+                        samples = timed(lambda i: create(owner, template), options["repeat"])
+                    row = {
+                        "template": name,
+                        "scheme": scheme,
+                        "queries_per_board": counter.count / len(samples),
+                        "boards_per_s": round(len(samples) / sum(samples), 1),
+                    }
+                    row.update(summarize(samples))
+                    results.append(row)
+            transaction.set_rollback(True)
+
+        self.stdout.write(json.dumps(results, indent=2))
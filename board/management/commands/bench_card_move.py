@@ -0,0 +1,63 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from board.benchmarks import bench_user, count_queries, seed_board, summarize, timed
+from board.models import Card
+from board.ordering import place
+
+
+def dense_move(board, card, to_list, to_index):
+    # The previous algorithm: renumber every card of both lists.
+    from_cards = [c for c in Card.objects.filter(board=board, list_id=card.list_id).order_by("position", "id") if c.id != card.id]
+    to_cards = from_cards if card.list_id == to_list.id else list(Card.objects.filter(board=board, list=to_list).order_by("position", "id"))
+    to_index = max(0, min(to_index, len(to_cards)))
+    to_cards.insert(to_index, card)
+    if card.list_id != to_list.id:
+        for idx, c in enumerate(from_cards):
+            Card.objects.filter(board=board, id=c.id).update(position=idx)
+    for idx, c in enumerate(to_cards):
+        Card.objects.filter(board=board, id=c.id).update(list_id=to_list.id, position=idx)
+    card.list_id = to_list.id
+
+
+def sparse_move(board, card, to_list, to_index):
+    siblings = Card.objects.filter(board=board, list=to_list).exclude(id=card.id)
+    pos = place(siblings, to_index)
+    Card.objects.filter(board=board, id=card.id).update(list=to_list, position=pos)
+    card.list_id = to_list.id
+
+
+class Command(BaseCommand):
+    help = "Compare card_move latency of the dense and sparse position schemes. Runs in a rolled-back transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated cards per list")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+        results = []
+
+        with transaction.atomic():
+            owner = bench_user()
+            for size in sizes:
+                for name, move in (("dense", dense_move), ("sparse", sparse_move)):
+                    b = seed_board(owner, lists=2, cards_per_list=size)
+                    lists = list(b.lists.order_by("position", "id"))
+                    cards = list(Card.objects.filter(board=b, list=lists[0]).order_by("position", "id"))
+
+                    def run(i):
+                        card = cards[i % len(cards)]
+                        to_list = lists[(i + 1) % 2] if card.list_id == lists[0].id else lists[0]
+                        move(b, card, to_list, size // 2)
+
+                    with count_queries() as counter:
+                        samples = timed(run, options["repeat"])
+                    row = {"scheme": name, "cards_per_list": size, "queries_per_move": counter.count / len(samples)}
+                    row.update(summarize(samples))
+                    results.append(row)
+            transaction.set_rollback(True)
+
+        self.stdout.write(json.dumps(results, indent=2))
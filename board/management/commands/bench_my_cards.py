@@ -0,0 +1,125 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+
+from board.benchmarks import bench_user, count_queries, explain, summarize, timed
+from board.models import Board, BoardMember, List, Card, CardAssignment
+from board.ordering import nth_position
+from board import pagination
+
+TAGS = [tag for tag, _ in Card.TAG_CHOICES]
+
+
+def seed(owner, boards, cards, members, batch_size):
+    """``boards`` boards sharing ``members`` users; every card is assigned to one of them."""
+    User = get_user_model()
+    users = [owner] + User.objects.bulk_create(
+        User(username=f"bench-assignee-{i}", password="!") for i in range(members - 1)
+    )
+    created = Board.objects.bulk_create(
+        Board(name=f"Assigned {i}", created_by=owner, join_code=f"bench-my-{i}") for i in range(boards)
+    )
+    BoardMember.objects.bulk_create(
+        (BoardMember(board=b, user=u, role=BoardMember.ROLE_STUDENT) for b in created for u in users),
+        batch_size=batch_size,
+    )
+    lists = List.objects.bulk_create(List(board=b, title="Work", position=nth_position(0)) for b in created)
+
+    per_board = cards // boards
+    for b, lst in zip(created, lists):
+        rows = Card.objects.bulk_create(
+            (
+                Card(board=b, list=lst, title=f"Card {ci}", tag=TAGS[ci % len(TAGS)], position=nth_position(ci))
+                for ci in range(per_board)
+            ),
+            batch_size=batch_size,
+        )
+        CardAssignment.objects.bulk_create(
+            (CardAssignment(card=c, user=users[ci % members], board=b, tag=c.tag) for ci, c in enumerate(rows)),
+            batch_size=batch_size,
+        )
+    return created
+
+
+def per_board(user, limit):
+    # "My cards" as a loop over the user's boards: one query per board.
+    found = []
+    for board_id in BoardMember.objects.filter(user=user).values_list("board_id", flat=True):
+        found += CardAssignment.objects.filter(board_id=board_id, user=user).order_by("-assigned_at", "-id")[:limit]
+    return sorted(found, key=lambda a: (a.assigned_at, a.id), reverse=True)[:limit]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed many boards of assigned cards and time /api/my-cards/: first page, a deep page and a tag "
+        "filter, against a per-board loop. Prints JSON with query plans. Runs in a rolled-back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--boards", type=int, default=1000)
+        parser.add_argument("--cards", type=int, default=1_000_000, help="Cards in total, spread over the boards")
+        parser.add_argument("--members", type=int, default=20, help="Assignees per board, the bench user included")
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--depth", type=int, default=100, help="Pages to walk before timing the deep page")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["boards"] < 1 or options["cards"] < options["boards"] or options["members"] < 1:
+            raise CommandError("Need at least one board, one card per board and one member.")
+
+        url = reverse("board:my_cards")
+        results = []
+        with transaction.atomic():
+            owner = bench_user()
+            started = time.perf_counter()
+            seed(owner, options["boards"], options["cards"], options["members"], options["batch_size"])
+            seeded = time.perf_counter() - started
+            client = Client()
+            client.force_login(owner)
+
+            deep = None
+            for _ in range(options["depth"]):
+                deep = client.get(url, {"after": deep} if deep else {}).json()["next"] or deep
+
+            cases = [
+                ("first_page", {}),
+                ("deep_page", {"after": deep} if deep else {}),
+                ("tag_in_progress", {"tag": Card.TAG_IN_PROGRESS}),
+            ]
+            for name, params in cases:
+                with count_queries() as counter:
+                    samples = timed(lambda i: client.get(url, params), options["repeat"])
+                row = {"case": name, "queries": counter.count / len(samples)}
+                row.update(summarize(samples))
+                results.append(row)
+
+            with count_queries() as counter:
+                samples = timed(lambda i: per_board(owner, 50), max(1, options["repeat"] // 10))
+            row = {"case": "per_board_loop", "queries": counter.count / len(samples)}
+            row.update(summarize(samples))
+            results.append(row)
+
+            assigned = CardAssignment.objects.filter(user=owner).select_related("card", "board")
+            plans = {
+                "first_page": explain(assigned.order_by("-assigned_at", "-id")[:51]),
+                "tag_in_progress": explain(assigned.filter(tag=Card.TAG_IN_PROGRESS).order_by("-assigned_at", "-id")[:51]),
+            }
+            if deep:
+                plans["deep_page"] = explain(
+                    pagination.before_time_cursor(assigned, "assigned_at", deep).order_by("-assigned_at", "-id")[:51]
+                )
+            transaction.set_rollback(True)
+
+        report = {
+            "database": connection.vendor,
+            "params": {k: options[k] for k in ("boards", "cards", "members", "repeat", "depth")},
+            "seed_s": round(seeded, 1),
+            "results": results,
+            "plans": {name: plan.splitlines() for name, plan in plans.items()},
+        }
+        self.stdout.write(json.dumps(report, indent=2))
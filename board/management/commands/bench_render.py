@@ -0,0 +1,69 @@
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from board.benchmarks import bench_user, count_queries, seed_board, summarize, timed
+
+
+class Command(BaseCommand):
+    help = (
+        "Time board_view on a large board with a cold and a warm fragment cache. "
+        "Uses the configured template_fragments backend and runs in a rolled-back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lists", type=int, default=10)
+        parser.add_argument("--cards-per-list", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        results = []
+
+        with transaction.atomic():
+            owner = bench_user()
+            b = seed_board(
+                owner,
+                lists=options["lists"],
+                cards_per_list=options["cards_per_list"],
+                desc="Read the chapter, write a summary and bring two questions to the tutorial.",
+                name="Render bench",
+            )
+            client = Client()
+            client.force_login(owner)
+            url = reverse("board:board_view", args=[b.id])
+
+            def render(i=0):
+                res = client.get(url)
+                if res.status_code != 200:
+                    raise RuntimeError(f"board_view answered {res.status_code}")
+                return res
+
+            # A fresh key prefix per run misses every fragment without clearing a shared cache.
+            cold = []
+            for _ in range(repeat):
+                fragments = {**settings.CACHES["template_fragments"], "KEY_PREFIX": f"bench-{uuid.uuid4().hex}"}
+                with override_settings(CACHES={**settings.CACHES, "template_fragments": fragments}):
+                    start = time.perf_counter()
+                    res = render()
+                    cold.append(time.perf_counter() - start)
+
+            render()
+            warm = timed(render, repeat)
+            with count_queries() as counter:
+                render()
+
+            cards = options["lists"] * options["cards_per_list"]
+            for name, samples in (("cold", cold), ("warm", warm)):
+                row = {"cache": name, "cards": cards, "bytes": len(res.content), "queries": counter.count}
+                row.update(summarize(samples))
+                results.append(row)
+            transaction.set_rollback(True)
+
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,45 @@
+import json
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+
+from board import search
+from board.benchmarks import bench_user, random_text, seed_board, summarize, timed
+from board.models import Card
+
+
+class Command(BaseCommand):
+    help = "Compare card search latency of the full-text index and icontains scans. Runs in a rolled-back transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000", help="Comma-separated cards per board")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+        rng = random.Random(1)
+        terms = ["term42", "term1234 term77", "budget", "term999", "essay review"]
+        results = []
+
+        with transaction.atomic():
+            owner = bench_user()
+            for size in sizes:
+                b = seed_board(owner, lists=10, cards_per_list=size // 10, text=lambda: random_text(rng))
+
+                def indexed(i):
+                    search.search_board(b, terms[i % len(terms)])
+
+                def scan(i):
+                    cond = models.Q()
+                    for t in terms[i % len(terms)].split():
+                        cond &= models.Q(title__icontains=t) | models.Q(desc__icontains=t)
+                    list(Card.objects.filter(board=b).filter(cond).order_by("list_id", "position", "id")[:search.SEARCH_LIMIT])
+
+                for name, fn in (("icontains", scan), ("fulltext", indexed)):
+                    row = {"method": name, "cards": size}
+                    row.update(summarize(timed(fn, options["repeat"])))
+                    results.append(row)
+            transaction.set_rollback(True)
+
+        self.stdout.write(json.dumps(results, indent=2))
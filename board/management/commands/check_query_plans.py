@@ -0,0 +1,82 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+
+from board import activity, archiving, pagination, search
+from board.benchmarks import bench_user, explain, seed_board
+from board.models import ActivityEvent, Board, BoardMember, List, Card, CardAssignment, Tombstone
+
+# EXPLAIN lines that mean a full scan or an extra sort pass, per backend.
+BAD_PLAN = {
+    # "qualify" is the subquery Django wraps around a filtered window; it is already bounded.
+    "sqlite": re.compile(r"\bSCAN (?!board_card_fts\b|qualify\b)\w+|USE TEMP B-TREE"),
+    "postgresql": re.compile(r"\bSeq Scan on board_|\bSort\b"),
+}
+
+
+def hot_queries(board, user):
+    """The per-request queries of board/views.py (and the archiver), as they are issued there."""
+    cards = Card.objects.filter(board=board)
+    cutoff = archiving.archive_cutoff()
+    assigned = CardAssignment.objects.filter(user=user).select_related("card", "board").order_by("-assigned_at", "-id")
+    member_role = BoardMember.objects.filter(board=models.OuterRef("pk"), user_id=user.pk).values("role")[:1]
+    return {
+        "board_and_role": Board.objects.filter(id=board.id).annotate(member_role=models.Subquery(member_role)),
+        "home_memberships": BoardMember.objects.select_related("board").filter(user=user).order_by("-joined_at"),
+        "dashboard_page": pagination.before_time_cursor(
+            BoardMember.objects.select_related("board").filter(user=user).order_by("-joined_at", "-id"), "joined_at", "1.1"
+        )[:51],
+        "dashboard_lists": (
+            List.objects.filter(board_id__in=[board.id]).values_list("board_id").annotate(n=models.Count("id")).order_by()
+        ),
+        "my_cards": pagination.before_time_cursor(assigned, "assigned_at", "1.1")[:51],
+        "my_cards_tag": pagination.before_time_cursor(assigned.filter(tag=Card.TAG_IN_PROGRESS), "assigned_at", "1.1")[:51],
+        "board_lists": List.objects.filter(board=board).order_by("position", "id"),
+        "board_cards": pagination.first_pages(cards, 50),
+        "board_cards_search": pagination.first_pages(search.filter_cards(cards, "budget"), 50),
+        "list_page": pagination.after_cursor(cards.filter(list_id=1), "65536.1").order_by(*pagination.CARD_ORDER)[:51],
+        "move_neighbours": cards.filter(list_id=1).exclude(id=1).order_by("position", "id").values_list("position", flat=True)[:2],
+        "list_cards": cards.filter(list_id=1).order_by("position", "id"),
+        "changed_lists": List.objects.filter(board=board, version__gt=1).order_by("version", "id"),
+        "changed_cards": cards.filter(version__gt=1).order_by("version", "id"),
+        "tombstones": Tombstone.objects.filter(board=board, version__gt=1).order_by("version", "id"),
+        "archive_batch": archiving.due_batch(archiving.due_cards(cutoff), 500),
+        "activity_feed": ActivityEvent.objects.filter(board=board, id__lt=1000).order_by("-id")[:51],
+        "activity_prune": (
+            ActivityEvent.objects.filter(created_at__lt=activity.retention_cutoff()).order_by("created_at").values("id")[:1000]
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot board queries and fail if any needs a table scan or a temporary sort."
+
+    def handle(self, *args, **options):
+        pattern = BAD_PLAN.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"No plan rules for the {connection.vendor} backend.")
+
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    # Tiny tables always favour a sequential scan; ask whether an index path exists.
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            user = bench_user("plan-check")
+            board = seed_board(user, lists=2, cards_per_list=2, name="Plan check")
+
+            for name, qs in hot_queries(board, user).items():
+                plan = explain(qs)
+                bad = [line.strip() for line in plan.splitlines() if pattern.search(line)]
+                status = self.style.ERROR("FAIL") if bad else self.style.SUCCESS("ok")
+                self.stdout.write(f"{status} {name}")
+                if bad or options["verbosity"] > 1:
+                    for line in plan.splitlines():
+                        self.stdout.write(f"    {line}")
+                if bad:
+                    failures.append(name)
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError("Query plans regressed: " + ", ".join(failures))
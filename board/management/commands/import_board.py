@@ -0,0 +1,47 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from board.importing import InvalidImport, import_board, parse_document
+
+
+class Command(BaseCommand):
+    help = "Create a board from an export_json document (JSON or NDJSON)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Export file to load, or - for stdin")
+        parser.add_argument("--user-id", type=int, required=True, help="User ID who will own the board")
+        parser.add_argument("--name", default=None, help="Board name (defaults to the exported name)")
+        parser.add_argument(
+            "--with-members",
+            action="store_true",
+            help="Also add exported members whose usernames exist here",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            owner = User.objects.get(id=options["user_id"])
+        except User.DoesNotExist:
+            raise CommandError("Owner user not found. Provide a valid --user-id.")
+
+        if options["path"] == "-":
+            raw = sys.stdin.read()
+        else:
+            with open(options["path"], "rb") as fh:
+                raw = fh.read()
+
+        try:
+            board = import_board(
+                parse_document(raw),
+                owner,
+                name=options["name"],
+                with_members=options["with_members"],
+            )
+        except InvalidImport as exc:
+            raise CommandError(f"Invalid export document: {exc}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported board "{board.name}" (id {board.id}) with join code: {board.join_code}'
+        ))
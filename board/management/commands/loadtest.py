@@ -0,0 +1,143 @@
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.middleware.csrf import get_token
+from django.test import Client, RequestFactory
+from django.urls import reverse
+
+from board.benchmarks import bench_user, seed_board, summarize
+from board.models import Card
+
+ENDPOINTS = ("card_update", "card_move")
+
+
+def login_cookies(user):
+    """A session cookie plus a matching CSRF cookie and header token."""
+    client = Client()
+    client.force_login(user)
+    request = RequestFactory().get("/")
+    token = get_token(request)
+    session = client.cookies[settings.SESSION_COOKIE_NAME].value
+    cookie = f"{settings.SESSION_COOKIE_NAME}={session}; {settings.CSRF_COOKIE_NAME}={request.META['CSRF_COOKIE']}"
+    return cookie, token
+
+
+class Target:
+    def __init__(self, name, base_url, boards):
+        self.name = name
+        self.url = urlsplit(base_url)
+        self.boards = boards
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.url.scheme == "https" else http.client.HTTPConnection
+            conn = self.local.conn = cls(self.url.netloc, timeout=30)
+        return conn
+
+    def post(self, path, body, headers):
+        conn = self.connection()
+        try:
+            conn.request("POST", path, body=json.dumps(body), headers=headers)
+            res = conn.getresponse()
+            res.read()
+            return res.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self.local.conn = None
+            return 0
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer card_update and card_move on running servers and compare requests/second, e.g. "
+        "`gunicorn trello_django.wsgi -w 4 -b :8000` against "
+        "`uvicorn trello_django.asgi:application --workers 4 --port 8001` with "
+        "--server wsgi=http://127.0.0.1:8000 --server asgi=http://127.0.0.1:8001. "
+        "The servers must share this database; the boards it seeds are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--server", action="append", required=True, metavar="NAME=URL")
+        parser.add_argument("--clients", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=5000, help="Requests per endpoint per server")
+        parser.add_argument("--boards", type=int, default=20, help="Boards the clients are spread over")
+        parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+
+    def handle(self, *args, **options):
+        servers = []
+        for spec in options["server"]:
+            name, sep, url = spec.partition("=")
+            if not sep or not url.startswith(("http://", "https://")):
+                raise CommandError(f"Expected NAME=URL, got {spec!r}")
+            servers.append((name, url.rstrip("/")))
+        endpoints = [e.strip() for e in options["endpoints"].split(",") if e.strip()]
+        if set(endpoints) - set(ENDPOINTS):
+            raise CommandError(f"Endpoints must be among {', '.join(ENDPOINTS)}")
+
+        owner = bench_user("loadtest")
+        boards = [seed_board(owner, lists=2, cards_per_list=50, name="Load test") for _ in range(options["boards"])]
+        cookie, token = login_cookies(owner)
+        results = []
+        try:
+            for name, url in servers:
+                target = Target(name, url, boards)
+                for endpoint in endpoints:
+                    results.append(self.run(target, endpoint, cookie, token, options["clients"], options["requests"]))
+        finally:
+            for b in boards:
+                b.delete()
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run(self, target, endpoint, cookie, token, clients, total):
+        prefix = target.url.path.rstrip("/")
+        host = target.url.netloc
+        headers = {
+            "Content-Type": "application/json",
+            "Cookie": cookie,
+            "X-CSRFToken": token,
+            "Referer": f"{target.url.scheme}://{host}/",
+            "Origin": f"{target.url.scheme}://{host}",
+        }
+        plans = []
+        for b in target.boards:
+            lists = list(b.lists.order_by("position", "id").values_list("id", flat=True))
+            cards = list(Card.objects.filter(board=b).values_list("id", flat=True))
+            plans.append((b, lists, cards))
+
+        def request(i):
+            b, lists, cards = plans[i % len(plans)]
+            card = cards[(i // len(plans)) % len(cards)]
+            if endpoint == "card_update":
+                path = reverse("board:card_update", args=[b.id, card])
+                body = {"title": f"Load {i}", "desc": "", "tag": "in_progress"}
+            else:
+                path = reverse("board:card_move", args=[b.id])
+                body = {"card_id": card, "to_list_id": lists[i % 2], "to_index": i % 25}
+            start = time.perf_counter()
+            status = target.post(prefix + path, body, headers)
+            return status, time.perf_counter() - start
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            outcomes = list(pool.map(request, range(total)))
+        elapsed = time.perf_counter() - started
+
+        ok = [seconds for status, seconds in outcomes if status == 200]
+        row = {
+            "server": target.name,
+            "endpoint": endpoint,
+            "clients": clients,
+            "requests": total,
+            "errors": total - len(ok),
+            "rps": round(len(ok) / elapsed, 1),
+        }
+        row.update(summarize(ok))
+        return row
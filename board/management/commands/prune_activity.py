@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from board.activity import PRUNE_BATCH_SIZE, prune, retention_cutoff
+from board.models import ActivityEvent
+
+
+class Command(BaseCommand):
+    help = "Delete activity events older than --days, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Defaults to BOARD_ACTIVITY_RETENTION_DAYS (90).")
+        parser.add_argument("--batch-size", type=int, default=PRUNE_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options["days"])
+        if options["dry_run"]:
+            count = ActivityEvent.objects.filter(created_at__lt=cutoff).count()
+            self.stdout.write(f"{count} events before {cutoff:%Y-%m-%d %H:%M} would be deleted")
+            return
+
+        deleted = prune(cutoff, batch_size=max(1, options["batch_size"]))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} activity events"))
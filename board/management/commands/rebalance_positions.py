@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Greatest
+
+from board.models import Board, List, Card
+from board.operations import bump_version
+from board.ordering import nth_position, rebalance
+
+
+class Command(BaseCommand):
+    help = "Re-spread list and card positions so later moves have room to land without renumbering."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board-id", type=int, default=None, help="Only rebalance this board")
+
+    def handle(self, *args, **options):
+        boards = Board.objects.order_by("id")
+        if options["board_id"]:
+            boards = boards.filter(id=options["board_id"])
+
+        total = 0
+        for b in boards.iterator():
+            with transaction.atomic():
+                # Under the board lock, so no concurrent move places a row mid-renumber;
+                # rows take the new version so delta clients pick the positions up.
+                bump_version(b)
+                # Renumbering can lift the last position past the stored next one.
+                n = rebalance(List.objects.filter(board=b), version=b.version)
+                Board.objects.filter(id=b.id).update(
+                    next_list_position=Greatest("next_list_position", Value(nth_position(n)))
+                )
+                for list_id in List.objects.filter(board=b).values_list("id", flat=True):
+                    n = rebalance(Card.objects.filter(board=b, list_id=list_id), version=b.version)
+                    List.objects.filter(id=list_id).update(
+                        next_card_position=Greatest("next_card_position", Value(nth_position(n)))
+                    )
+                    total += n
+
+        self.stdout.write(self.style.SUCCESS(f"Rebalanced {total} cards"))
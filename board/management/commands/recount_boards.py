@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from board.counters import recount
+from board.models import Board
+from board.operations import bump_version
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-list and per-board card counters and next positions from the cards themselves."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board-id", type=int, default=None, help="Only recount this board")
+
+    def handle(self, *args, **options):
+        boards = Board.objects.order_by("id").values_list("id", flat=True)
+        if options["board_id"]:
+            boards = boards.filter(id=options["board_id"])
+
+        checked = fixed = 0
+        for pk in boards.iterator():
+            with transaction.atomic():
+                b = Board.objects.filter(id=pk).first()
+                if b is None:
+                    continue
+                # Under the board lock, so no batch can move the counters mid-count;
+                # the new version also retires cached list fragments.
+                bump_version(b)
+                b.refresh_from_db()
+                checked += 1
+                if recount(b):
+                    fixed += 1
+                    self.stdout.write(f"Board {pk}: counters repaired")
+                else:
+                    transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS(f"Recounted {checked} boards, repaired {fixed}"))
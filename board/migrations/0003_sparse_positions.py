@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:29
+
+from django.db import migrations, models
+
+POSITION_STEP = 1 << 16
+
+
+def _renumber(model, group_field, step, offset):
+    rows = list(model.objects.order_by(group_field, "position", "id").only("id", group_field, "position"))
+    current_group = object()
+    idx = 0
+    for obj in rows:
+        group = getattr(obj, group_field)
+        if group != current_group:
+            current_group = group
+            idx = 0
+        obj.position = (idx + offset) * step
+        idx += 1
+    model.objects.bulk_update(rows, ["position"], batch_size=500)
+
+
+def spread_positions(apps, schema_editor):
+    _renumber(apps.get_model("board", "List"), "board_id", POSITION_STEP, 1)
+    _renumber(apps.get_model("board", "Card"), "list_id", POSITION_STEP, 1)
+
+
+def compact_positions(apps, schema_editor):
+    _renumber(apps.get_model("board", "List"), "board_id", 1, 0)
+    _renumber(apps.get_model("board", "Card"), "list_id", 1, 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0002_card_tag'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='card',
+            name='position',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='list',
+            name='position',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(spread_positions, compact_positions),
+    ]
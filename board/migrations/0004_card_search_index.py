@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-17 19:40
+
+from django.db import migrations
+
+from board import search
+
+
+def install_search(apps, schema_editor):
+    search.install(schema_editor.connection)
+
+
+def uninstall_search(apps, schema_editor):
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0003_sparse_positions'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
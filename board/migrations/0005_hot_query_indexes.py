@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0004_card_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='boardmember',
+            index=models.Index(fields=['user', '-joined_at'], name='member_user_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['board', 'list', 'position'], name='card_board_list_pos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='list',
+            index=models.Index(fields=['board', 'position'], name='list_board_pos_idx'),
+        ),
+    ]
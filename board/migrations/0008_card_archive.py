@@ -0,0 +1,59 @@
+# Generated by Django 6.0.1 on 2026-10-17 19:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def stamp_finished(apps, schema_editor):
+    # The real finish time is unknown; start the archive clock at the upgrade.
+    Card = apps.get_model("board", "Card")
+    Card.objects.filter(tag="finished", finished_at__isnull=True).update(finished_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0007_change_tracking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedCard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('list_title', models.CharField(blank=True, default='', max_length=120)),
+                ('original_id', models.BigIntegerField()),
+                ('title', models.CharField(default='Untitled', max_length=200)),
+                ('desc', models.TextField(blank=True, default='')),
+                ('tag', models.CharField(choices=[('not_started', 'Not started'), ('in_progress', 'In progress'), ('finished', 'Finished')], default='finished', max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='card',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(stamp_finished, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(condition=models.Q(('finished_at__isnull', False)), fields=['finished_at'], name='card_finished_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedcard',
+            name='board',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_cards', to='board.board'),
+        ),
+        migrations.AddField(
+            model_name='archivedcard',
+            name='list',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_cards', to='board.list'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcard',
+            index=models.Index(fields=['board', '-id'], name='archived_board_id_idx'),
+        ),
+    ]
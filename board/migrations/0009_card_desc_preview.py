@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-17 19:16
+
+from django.db import migrations, models
+
+DESC_PREVIEW_LENGTH = 140
+
+
+def _preview(desc):
+    desc = (desc or "").strip()
+    if len(desc) <= DESC_PREVIEW_LENGTH:
+        return desc
+    return desc[:DESC_PREVIEW_LENGTH - 1].rstrip() + "\u2026"
+
+
+def fill_previews(apps, schema_editor):
+    Card = apps.get_model("board", "Card")
+    last_id = 0
+    while True:
+        rows = list(Card.objects.filter(id__gt=last_id).exclude(desc="").order_by("id").only("id", "desc")[:1000])
+        if not rows:
+            break
+        for card in rows:
+            card.desc_preview = _preview(card.desc)
+        Card.objects.bulk_update(rows, ["desc_preview"], batch_size=500)
+        last_id = rows[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0008_card_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='card',
+            name='desc_preview',
+            field=models.CharField(blank=True, default='', max_length=140),
+        ),
+        migrations.RunPython(fill_previews, migrations.RunPython.noop),
+    ]
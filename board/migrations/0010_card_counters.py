@@ -0,0 +1,95 @@
+# Generated by Django 6.0.1 on 2026-10-17 19:22
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+POSITION_STEP = 1 << 16
+
+TAG_COUNTERS = {
+    "not_started": "cards_not_started",
+    "in_progress": "cards_in_progress",
+    "finished": "cards_finished",
+}
+
+
+def fill_counters(apps, schema_editor):
+    Board = apps.get_model("board", "Board")
+    List = apps.get_model("board", "List")
+    Card = apps.get_model("board", "Card")
+
+    counts = defaultdict(dict)
+    tops = {}
+    rows = Card.objects.values_list("list_id", "tag").annotate(n=models.Count("id"), top=models.Max("position")).order_by()
+    for list_id, tag, n, top in rows:
+        if tag in TAG_COUNTERS:
+            counts[list_id][TAG_COUNTERS[tag]] = n
+        tops[list_id] = max(top, tops.get(list_id, 0))
+
+    last_id = 0
+    while True:
+        lists = list(List.objects.filter(id__gt=last_id).order_by("id")[:1000])
+        if not lists:
+            break
+        for lst in lists:
+            for field in TAG_COUNTERS.values():
+                setattr(lst, field, counts[lst.id].get(field, 0))
+            lst.next_card_position = tops.get(lst.id, 0) + POSITION_STEP
+        List.objects.bulk_update(lists, [*TAG_COUNTERS.values(), "next_card_position"], batch_size=500)
+        last_id = lists[-1].id
+
+    sums = {field: models.Sum(field) for field in TAG_COUNTERS.values()}
+    for row in List.objects.values("board_id").annotate(top=models.Max("position"), **sums).order_by():
+        board_id = row.pop("board_id")
+        Board.objects.filter(id=board_id).update(next_list_position=row.pop("top") + POSITION_STEP, **row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0009_card_desc_preview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='cards_finished',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='cards_in_progress',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='cards_not_started',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='next_list_position',
+            field=models.PositiveBigIntegerField(default=65536),
+        ),
+        migrations.AddField(
+            model_name='list',
+            name='cards_finished',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='list',
+            name='cards_in_progress',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='list',
+            name='cards_not_started',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='list',
+            name='next_card_position',
+            field=models.PositiveBigIntegerField(default=65536),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-17 19:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def stamp_activity(apps, schema_editor):
+    # The best known activity time for existing boards is their creation.
+    Board = apps.get_model("board", "Board")
+    Board.objects.update(last_activity_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0010_card_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(stamp_activity, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='boardmember',
+            name='member_user_joined_idx',
+        ),
+        migrations.AddIndex(
+            model_name='boardmember',
+            index=models.Index(fields=['user', '-joined_at', '-id'], name='member_user_joined_idx'),
+        ),
+    ]
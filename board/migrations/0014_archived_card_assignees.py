@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:05
+
+import board.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0013_activity_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedcard',
+            name='assignees',
+            field=models.JSONField(blank=True, default=board.models.no_assignees),
+        ),
+    ]
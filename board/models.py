@@ -1,8 +1,33 @@
 import secrets
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-class Board(models.Model):
+from .ordering import POSITION_STEP
+
+class CardCounts(models.Model):
+    """Cards per tag, kept in step by board.counters; ``recount_boards`` repairs drift."""
+
+    cards_not_started = models.PositiveIntegerField(default=0)
+    cards_in_progress = models.PositiveIntegerField(default=0)
+    cards_finished = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def cards_total(self) -> int:
+        return self.cards_not_started + self.cards_in_progress + self.cards_finished
+
+    def progress(self) -> dict:
+        """Whole percentages per tag for the progress bars."""
+        total = self.cards_total or 1
+        return {
+            "finished": self.cards_finished * 100 // total,
+            "in_progress": self.cards_in_progress * 100 // total,
+        }
+
+class Board(CardCounts):
     name = models.CharField(max_length=120, default="Untitled board")
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -11,6 +36,11 @@ class Board(models.Model):
     )
     join_code = models.CharField(max_length=16, unique=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    version = models.PositiveBigIntegerField(default=0)
+    # Above every list position on the board; new lists take it.
+    next_list_position = models.PositiveBigIntegerField(default=POSITION_STEP)
+    # Stamped with every version bump.
+    last_activity_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self) -> str:
         return self.name
@@ -40,21 +70,42 @@ class BoardMember(models.Model):
 
     class Meta:
         unique_together = [("board", "user")]
+        indexes = [
+            # (joined_at, id) is the dashboard keyset; id breaks ties without a sort.
+            models.Index(fields=["user", "-joined_at", "-id"], name="member_user_joined_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.board_id}:{self.user_id}:{self.role}"
 
-class List(models.Model):
+class List(CardCounts):
     board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name="lists")
     title = models.CharField(max_length=120, default="Untitled")
-    position = models.PositiveIntegerField(default=0)
+    position = models.PositiveBigIntegerField(default=0)
+    version = models.PositiveBigIntegerField(default=0)
+    # Above every card position in the list; cards added at the end take it.
+    next_card_position = models.PositiveBigIntegerField(default=POSITION_STEP)
 
     class Meta:
         ordering = ["position", "id"]
+        indexes = [
+            models.Index(fields=["board", "position"], name="list_board_pos_idx"),
+            models.Index(fields=["board", "version"], name="list_board_version_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
+DESC_PREVIEW_LENGTH = 140
+
+
+def desc_preview(desc) -> str:
+    """The start of ``desc`` as shown on the board; the full text loads with the card."""
+    desc = (desc or "").strip()
+    if len(desc) <= DESC_PREVIEW_LENGTH:
+        return desc
+    return desc[:DESC_PREVIEW_LENGTH - 1].rstrip() + "\u2026"
+
 class Card(models.Model):
     TAG_NOT_STARTED = "not_started"
     TAG_IN_PROGRESS = "in_progress"
@@ -70,17 +121,136 @@ class Card(models.Model):
     list = models.ForeignKey(List, on_delete=models.CASCADE, related_name="cards")
     title = models.CharField(max_length=200, default="Untitled")
     desc = models.TextField(blank=True, default="")
+    # Written together with desc; bulk_create and update() callers must set it too.
+    desc_preview = models.CharField(max_length=DESC_PREVIEW_LENGTH, blank=True, default="")
     tag = models.CharField(
         max_length=20,
         choices=TAG_CHOICES,
         default=TAG_NOT_STARTED,
     )
-    position = models.PositiveIntegerField(default=0)
+    position = models.PositiveBigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    version = models.PositiveBigIntegerField(default=0)
+    # When the card last became finished; drives automatic archiving.
+    finished_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["position", "id"]
+        indexes = [
+            models.Index(fields=["board", "list", "position"], name="card_board_list_pos_idx"),
+            models.Index(fields=["board", "version"], name="card_board_version_idx"),
+            models.Index(
+                fields=["finished_at"], name="card_finished_at_idx", condition=models.Q(finished_at__isnull=False)
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def save(self, *args, **kwargs):
+        self.desc_preview = desc_preview(self.desc)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "desc" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "desc_preview"}
+        super().save(*args, **kwargs)
+
+TAG_COUNTERS = {
+    Card.TAG_NOT_STARTED: "cards_not_started",
+    Card.TAG_IN_PROGRESS: "cards_in_progress",
+    Card.TAG_FINISHED: "cards_finished",
+}
+
+class CardAssignment(models.Model):
+    """A card assigned to a board member.
+
+    ``board`` and ``tag`` copy the card's so "my cards" across boards reads
+    one index range; operations keep ``tag`` in step with card updates.
+    """
+
+    card = models.ForeignKey(Card, on_delete=models.CASCADE, related_name="assignments")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="card_assignments")
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name="card_assignments")
+    tag = models.CharField(max_length=20, choices=Card.TAG_CHOICES, default=Card.TAG_NOT_STARTED)
+    assigned_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = [("card", "user")]
+        indexes = [
+            models.Index(fields=["user", "-assigned_at", "-id"], name="assignment_user_recent_idx"),
+            models.Index(fields=["user", "tag", "-assigned_at", "-id"], name="assignment_user_tag_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} on {self.card}"
+
+def no_assignees():
+    # Module level: inside ArchivedCard, ``list`` is the foreign key.
+    return []
+
+class ArchivedCard(models.Model):
+    """A card moved out of the hot Card table; board pages and exports never read it."""
+
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name="archived_cards")
+    # Kept loosely: the list may be deleted while the card sits in the archive.
+    list = models.ForeignKey(List, on_delete=models.SET_NULL, null=True, blank=True, related_name="archived_cards")
+    list_title = models.CharField(max_length=120, blank=True, default="")
+    original_id = models.BigIntegerField()
+    title = models.CharField(max_length=200, default="Untitled")
+    desc = models.TextField(blank=True, default="")
+    tag = models.CharField(max_length=20, choices=Card.TAG_CHOICES, default=Card.TAG_FINISHED)
+    created_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    # User ids of the card's assignees; their CardAssignment rows go with the card.
+    assignees = models.JSONField(default=no_assignees, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["board", "-id"], name="archived_board_id_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+class ActivityEvent(models.Model):
+    """Who did what on a board; append-only, written in batches by board.activity."""
+
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name="activity")
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    verb = models.CharField(max_length=32)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["board", "-id"], name="activity_board_id_idx"),
+            models.Index(fields=["created_at"], name="activity_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.verb} on {self.board_id}"
+
+class Tombstone(models.Model):
+    """Records a deleted list or card so delta clients learn about it."""
+
+    KIND_LIST = "list"
+    KIND_CARD = "card"
+
+    KIND_CHOICES = [
+        (KIND_LIST, "List"),
+        (KIND_CARD, "Card"),
+    ]
+
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name="tombstones")
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    version = models.PositiveBigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["board", "version"], name="tombstone_board_version_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.board_id}:{self.kind}:{self.object_id}@{self.version}"
+
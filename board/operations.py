@@ -0,0 +1,397 @@
+from asgiref.sync import sync_to_async
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from . import activity, counters, realtime, seeds
+from .models import Board, BoardMember, List, Card, CardAssignment, ArchivedCard, Tombstone, desc_preview
+from .ordering import POSITION_STEP, nth_position, place, renumber
+from .permissions import can_manage_cards, can_manage_lists, can_manage_roles
+
+MAX_BATCH_OPS = 200
+
+OPERATIONS = {}
+
+
+class OperationError(Exception):
+    def __init__(self, code, status=409):
+        super().__init__(code)
+        self.code = code
+        self.status = status
+        self.index = None
+
+
+def operation(name, check, denied):
+    def decorator(func):
+        OPERATIONS[name] = (check, denied, func)
+        return func
+    return decorator
+
+
+def bump_version(board) -> int:
+    # The UPDATE also row-locks the board, so batches on one board run one at a time.
+    Board.objects.filter(id=board.id).update(version=models.F("version") + 1, last_activity_at=timezone.now())
+    board.version = Board.objects.values_list("version", flat=True).get(id=board.id)
+    return board.version
+
+
+def current_version(board) -> int:
+    return Board.objects.values_list("version", flat=True).get(id=board.id)
+
+
+async def acurrent_version(board) -> int:
+    return await Board.objects.values_list("version", flat=True).aget(id=board.id)
+
+
+def _int(value, code, status=400):
+    if isinstance(value, bool):
+        raise OperationError(code, status)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise OperationError(code, status)
+
+
+def _card_id(value, refs):
+    if isinstance(value, str) and value in refs:
+        return refs[value]
+    return _int(value, "card_not_found", 409)
+
+
+def bury(board, kind, ids):
+    Tombstone.objects.bulk_create(
+        [Tombstone(board=board, kind=kind, object_id=pk, version=board.version) for pk in ids],
+        batch_size=1000,
+    )
+
+
+def _publish(board, event_type, **data):
+    realtime.publish(board.id, event_type, version=board.version, **data)
+
+
+def archive(board, cards):
+    """Move ``cards`` (a queryset on this board) to ArchivedCard.
+
+    Returns the card ids and the counter deltas, as published with the event.
+    """
+    cards = list(cards.select_related("list").order_by("list_id", "position", "id"))
+    if not cards:
+        return [], {}
+    ids = [c.id for c in cards]
+    assignees = {}
+    for card_id, user_id in CardAssignment.objects.filter(card_id__in=ids).order_by("id").values_list("card_id", "user_id"):
+        assignees.setdefault(card_id, []).append(user_id)
+    ArchivedCard.objects.bulk_create(
+        [
+            ArchivedCard(
+                board=board,
+                list_id=c.list_id,
+                list_title=c.list.title,
+                original_id=c.id,
+                title=c.title,
+                desc=c.desc,
+                tag=c.tag,
+                created_at=c.created_at,
+                finished_at=c.finished_at,
+                assignees=assignees.get(c.id, []),
+            )
+            for c in cards
+        ],
+        batch_size=500,
+    )
+    Card.objects.filter(board=board, id__in=ids).delete()
+    bury(board, Tombstone.KIND_CARD, ids)
+    counts = counters.adjust(board, counters.negate(counters.tally((c.list_id, c.tag) for c in cards)))
+    _publish(board, "cards.archived", cards=ids, counts=counts)
+    return ids, counts
+
+
+def _append_position(board, lst, tag):
+    """Count a card of ``tag`` into ``lst`` and return the end position it takes.
+
+    Reading the list's next position is safe: bump_version holds the board row lock.
+    """
+    counts = counters.adjust(
+        board, {lst.id: {tag: 1}}, {lst.id: {"next_card_position": models.F("next_card_position") + POSITION_STEP}}
+    )
+    return lst.next_card_position, counts
+
+
+@operation("card.create", can_manage_cards, "no_card_permission")
+def create_card(board, op, refs):
+    title = (op.get("title") or "").strip()
+    if not op.get("list") or not title:
+        raise OperationError("missing_fields", 400)
+
+    lst = List.objects.filter(board=board, id=_int(op["list"], "list_not_found", 409)).first()
+    if not lst:
+        raise OperationError("list_not_found")
+
+    position, counts = _append_position(board, lst, Card.TAG_NOT_STARTED)
+    card = Card.objects.create(
+        board=board,
+        list=lst,
+        title=title,
+        desc="",
+        tag=Card.TAG_NOT_STARTED,
+        position=position,
+        version=board.version,
+    )
+    ref = op.get("ref")
+    if isinstance(ref, str):
+        refs[ref] = card.id
+    _publish(
+        board, "card.created", card=card.id, list=lst.id, title=card.title, desc=card.desc, tag=card.tag, counts=counts
+    )
+    return {"id": card.id, "ref": ref, "counts": counts}
+
+
+@operation("card.update", can_manage_cards, "no_card_permission")
+def update_card(board, op, refs):
+    card_id = _card_id(op.get("card"), refs)
+    title = (op.get("title") or "").strip() or "Untitled"
+    desc = (op.get("desc") or "").strip()
+    tag = op.get("tag")
+    if tag not in dict(Card.TAG_CHOICES):
+        tag = Card.TAG_NOT_STARTED
+
+    # Keep the first finish time across edits; it is what the archive cutoff reads.
+    finished_at = None
+    if tag == Card.TAG_FINISHED:
+        finished_at = Coalesce("finished_at", models.Value(timezone.now()))
+    cards = Card.objects.filter(board=board, id=card_id)
+    row = cards.values_list("list_id", "tag").first()
+    if not row:
+        raise OperationError("card_not_found")
+    cards.update(
+        title=title, desc=desc, desc_preview=desc_preview(desc), tag=tag, finished_at=finished_at, version=board.version
+    )
+    list_id, old_tag = row
+    counts = {}
+    if old_tag != tag:
+        counts = counters.adjust(board, {list_id: {old_tag: -1, tag: 1}})
+        CardAssignment.objects.filter(card_id=card_id).update(tag=tag)
+    activity.record("card.update", card=card_id, title=title, tag=tag, previous_tag=old_tag)
+    _publish(board, "card.updated", card=card_id, title=title, desc=desc, tag=tag, counts=counts)
+    return {"id": card_id, "counts": counts}
+
+
+@operation("card.delete", can_manage_cards, "no_card_permission")
+def delete_card(board, op, refs):
+    card_id = _card_id(op.get("card"), refs)
+    cards = Card.objects.filter(board=board, id=card_id)
+    row = cards.values_list("list_id", "tag").first()
+    if not row:
+        raise OperationError("card_not_found")
+    cards.delete()
+    bury(board, Tombstone.KIND_CARD, [card_id])
+    list_id, tag = row
+    counts = counters.adjust(board, {list_id: {tag: -1}})
+    _publish(board, "card.deleted", card=card_id, counts=counts)
+    return {"id": card_id, "counts": counts}
+
+
+@operation("card.archive", can_manage_cards, "no_card_permission")
+def archive_card(board, op, refs):
+    card_id = _card_id(op.get("card"), refs)
+    ids, counts = archive(board, Card.objects.filter(board=board, id=card_id))
+    if not ids:
+        raise OperationError("card_not_found")
+    return {"id": card_id, "counts": counts}
+
+
+@operation("card.restore", can_manage_cards, "no_card_permission")
+def restore_card(board, op, refs):
+    archived = ArchivedCard.objects.filter(board=board, id=_int(op.get("archived"), "archived_not_found", 409)).first()
+    if not archived:
+        raise OperationError("archived_not_found")
+
+    # Back to the end of its old list, or of the first list if that one is gone.
+    lists = List.objects.filter(board=board)
+    lst = (archived.list_id and lists.filter(id=archived.list_id).first()) or lists.order_by("position", "id").first()
+    if not lst:
+        raise OperationError("list_not_found")
+
+    position, counts = _append_position(board, lst, archived.tag)
+    card = Card.objects.create(
+        board=board,
+        list=lst,
+        title=archived.title,
+        desc=archived.desc,
+        tag=archived.tag,
+        position=position,
+        version=board.version,
+        # A fresh clock, or the archiver would take the card straight back.
+        finished_at=timezone.now() if archived.tag == Card.TAG_FINISHED else None,
+    )
+    # Assignees who left the board meanwhile are not brought back.
+    members = BoardMember.objects.filter(board=board, user_id__in=archived.assignees).values_list("user_id", flat=True)
+    CardAssignment.objects.bulk_create(
+        CardAssignment(card=card, user_id=user_id, board=board, tag=card.tag) for user_id in members
+    )
+    archived.delete()
+    _publish(
+        board, "card.created", card=card.id, list=lst.id, title=card.title, desc=card.desc, tag=card.tag, counts=counts
+    )
+    return {"id": card.id, "list": lst.id, "counts": counts}
+
+
+@operation("card.assign", can_manage_cards, "no_card_permission")
+def assign_card(board, op, refs):
+    card_id = _card_id(op.get("card"), refs)
+    user_id = _int(op.get("user"), "member_not_found", 409)
+    tag = Card.objects.filter(board=board, id=card_id).values_list("tag", flat=True).first()
+    if tag is None:
+        raise OperationError("card_not_found")
+    if not BoardMember.objects.filter(board=board, user_id=user_id).exists():
+        raise OperationError("member_not_found")
+
+    assigned = op.get("assigned", True) is not False
+    if assigned:
+        CardAssignment.objects.get_or_create(card_id=card_id, user_id=user_id, defaults={"board": board, "tag": tag})
+    else:
+        CardAssignment.objects.filter(card_id=card_id, user_id=user_id).delete()
+    _publish(board, "card.assigned", card=card_id, user=user_id, assigned=assigned)
+    return {"id": card_id, "user": user_id, "assigned": assigned}
+
+
+@operation("card.move", can_manage_cards, "no_card_permission")
+def move_card(board, op, refs):
+    if op.get("card") is None or op.get("list") is None or op.get("index") is None:
+        raise OperationError("missing_fields", 400)
+    card_id = _card_id(op["card"], refs)
+    index = _int(op["index"], "bad_index")
+
+    to_list = List.objects.filter(board=board, id=_int(op["list"], "not_found", 409)).first()
+    row = Card.objects.filter(board=board, id=card_id).values_list("list_id", "tag").first()
+    if not to_list or not row:
+        raise OperationError("not_found")
+
+    siblings = Card.objects.filter(board=board, list=to_list).exclude(id=card_id)
+    pos = place(siblings, index, version=board.version)
+    Card.objects.filter(board=board, id=card_id).update(list=to_list, position=pos, version=board.version)
+
+    from_list, tag = row
+    deltas = {from_list: {tag: -1}, to_list.id: {tag: 1}} if from_list != to_list.id else {}
+    # place() may have renumbered the siblings, up to nth_position(len(siblings) - 1).
+    size = to_list.cards_total + (from_list != to_list.id)
+    top = max(pos + POSITION_STEP, nth_position(size))
+    fields = {to_list.id: {"next_card_position": top}} if top > to_list.next_card_position else {}
+    counts = counters.adjust(board, deltas, fields)
+    activity.record("card.move", card=card_id, list=to_list.id, from_list=from_list, index=index)
+    _publish(board, "card.moved", card=card_id, list=to_list.id, index=index, counts=counts)
+    return {"id": card_id, "list": to_list.id, "position": pos, "counts": counts}
+
+
+@operation("list.create", can_manage_lists, "no_list_permission")
+def create_list(board, op, refs):
+    title = (op.get("title") or "").strip() or "Untitled"
+    position = Board.objects.values_list("next_list_position", flat=True).get(id=board.id)
+    counters.adjust_board(board, {}, next_list_position=models.F("next_list_position") + POSITION_STEP)
+    lst = List.objects.create(board=board, title=title, position=position, version=board.version)
+    _publish(board, "list.created", list=lst.id, title=lst.title)
+    return {"id": lst.id}
+
+
+@operation("list.rename", can_manage_lists, "no_list_permission")
+def rename_list(board, op, refs):
+    list_id = _int(op.get("list"), "list_not_found", 409)
+    title = (op.get("title") or "").strip() or "Untitled"
+    if not List.objects.filter(board=board, id=list_id).update(title=title, version=board.version):
+        raise OperationError("list_not_found")
+    _publish(board, "list.renamed", list=list_id, title=title)
+    return {"id": list_id}
+
+
+@operation("list.delete", can_manage_lists, "no_list_permission")
+def delete_list(board, op, refs):
+    list_id = _int(op.get("list"), "list_not_found", 409)
+    lst = List.objects.filter(board=board, id=list_id).first()
+    if not lst:
+        raise OperationError("list_not_found")
+    card_ids = list(Card.objects.filter(board=board, list_id=list_id).values_list("id", flat=True))
+    lst.delete()
+    activity.record("list.delete", list=list_id, title=lst.title, cards=len(card_ids))
+    counters.adjust_board(board, {tag: -getattr(lst, field) for tag, field in counters.TAG_COUNTERS.items()})
+    bury(board, Tombstone.KIND_LIST, [list_id])
+    bury(board, Tombstone.KIND_CARD, card_ids)
+    _publish(board, "list.deleted", list=list_id)
+    return {"id": list_id}
+
+
+@operation("lists.reorder", can_manage_lists, "no_list_permission")
+def reorder_lists(board, op, refs):
+    order = op.get("order")
+    if not isinstance(order, list):
+        raise OperationError("bad_order", 400)
+    order = [_int(list_id, "bad_order") for list_id in order]
+
+    lists = List.objects.filter(board=board)
+    if len(set(order)) != len(order) or set(order) != set(lists.values_list("id", flat=True)):
+        raise OperationError("stale_order")
+    renumber(lists, order, version=board.version)
+    counters.adjust_board(
+        board, {}, next_list_position=Greatest("next_list_position", models.Value(nth_position(len(order))))
+    )
+    _publish(board, "lists.reordered", order=order)
+    return {"order": order}
+
+
+@operation("board.reset", can_manage_roles, "not_admin")
+def reset_board(board, op, refs):
+    try:
+        template = seeds.get_template(op.get("template") or "blank")
+    except seeds.UnknownTemplate:
+        raise OperationError("bad_template", 400)
+    bury(board, Tombstone.KIND_CARD, Card.objects.filter(board=board).values_list("id", flat=True))
+    bury(board, Tombstone.KIND_LIST, List.objects.filter(board=board).values_list("id", flat=True))
+    Card.objects.filter(board=board).delete()
+    List.objects.filter(board=board).delete()
+    seeds.seed_lists(board, template, version=board.version)
+    Board.objects.filter(id=board.id).update(**counters.template_counts(template))
+    _publish(board, "board.reset")
+    return {}
+
+
+def apply(board, role, ops, actor=None):
+    """Run ``ops`` in order inside one transaction; return ``(results, version)``.
+
+    The board version goes up once per batch. Any failing op rolls the whole
+    batch back and raises OperationError with ``index`` set to that op.
+    Cards created earlier in the batch can be addressed by their ``ref``.
+    Activity the ops record is attributed to ``actor`` and written on commit.
+    """
+    if not isinstance(ops, list) or not ops:
+        raise OperationError("bad_ops", 400)
+    if len(ops) > MAX_BATCH_OPS:
+        raise OperationError("too_many_ops", 400)
+
+    results = []
+    refs = {}
+    previous = board.version
+    try:
+        with transaction.atomic(), activity.collect(board, actor):
+            bump_version(board)
+            for index, op in enumerate(ops):
+                spec = OPERATIONS.get(op.get("op")) if isinstance(op, dict) else None
+                if spec is None:
+                    raise OperationError("bad_op", 400)
+                check, denied, func = spec
+                if not check(role):
+                    raise OperationError(denied, 403)
+                results.append(func(board, op, refs))
+    except OperationError as exc:
+        board.version = previous
+        exc.index = index
+        raise
+    return results, board.version
+
+
+def apply_one(board, role, op, actor=None):
+    results, _ = apply(board, role, [op], actor)
+    return results[0]
+
+
+# The async ORM has no transactions, so async views run a batch as one sync call.
+aapply = sync_to_async(apply)
+aapply_one = sync_to_async(apply_one)
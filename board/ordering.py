@@ -0,0 +1,66 @@
+from django.db import models
+
+POSITION_STEP = 1 << 16
+RENUMBER_BATCH = 500
+
+
+def nth_position(index: int) -> int:
+    return (index + 1) * POSITION_STEP
+
+
+def position_after(pos) -> int:
+    return POSITION_STEP if pos is None else pos + POSITION_STEP
+
+
+def position_between(before, after):
+    lo = before if before is not None else 0
+    if after is None:
+        return lo + POSITION_STEP
+    if after - lo < 2:
+        return None
+    return (lo + after) // 2
+
+
+def renumber(queryset, ids, **fields) -> int:
+    """Write ``nth_position`` for each id in order, one CASE UPDATE per batch.
+
+    Extra ``fields`` are written to the same rows in the same statements.
+    """
+    updated = 0
+    for start in range(0, len(ids), RENUMBER_BATCH):
+        chunk = ids[start:start + RENUMBER_BATCH]
+        whens = [models.When(id=pk, then=models.Value(nth_position(start + idx))) for idx, pk in enumerate(chunk)]
+        updated += queryset.filter(id__in=chunk).update(
+            position=models.Case(*whens, output_field=models.PositiveBigIntegerField()), **fields
+        )
+    return updated
+
+
+def rebalance(siblings, **fields) -> int:
+    ids = list(siblings.order_by("position", "id").values_list("id", flat=True))
+    return renumber(siblings, ids, **fields)
+
+
+def _neighbours(siblings, index: int):
+    positions = siblings.order_by("position", "id").values_list("position", flat=True)
+    if index <= 0:
+        return None, positions.first()
+    window = list(positions[index - 1:index + 1])
+    if not window:
+        return positions.last(), None
+    return window[0], (window[1] if len(window) > 1 else None)
+
+
+def place(siblings, index: int, **fields) -> int:
+    """Return a position that puts a row at ``index`` among ``siblings``.
+
+    Only the moved row needs writing; when the gap between its neighbours
+    is used up the siblings are renumbered once and the lookup is retried.
+    """
+    before, after = _neighbours(siblings, index)
+    pos = position_between(before, after)
+    if pos is None:
+        rebalance(siblings, **fields)
+        before, after = _neighbours(siblings, index)
+        pos = position_between(before, after)
+    return pos
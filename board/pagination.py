@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import models
+from django.db.models.functions import RowNumber
+
+CARD_ORDER = ("position", "id")
+MAX_PAGE_SIZE = 200
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(card) -> str:
+    return f"{card.position}.{card.id}"
+
+
+def decode_cursor(cursor):
+    try:
+        position, card_id = (int(part) for part in cursor.split("."))
+    except (AttributeError, ValueError):
+        raise InvalidCursor(cursor)
+    return position, card_id
+
+
+def encode_time_cursor(moment, pk) -> str:
+    """A cursor for newest-first pages keyed on ``(moment, pk)``, exact to the microsecond."""
+    return f"{(moment - _EPOCH) // timedelta(microseconds=1)}.{pk}"
+
+
+def decode_time_cursor(cursor):
+    micros, pk = decode_cursor(cursor)
+    try:
+        return _EPOCH + timedelta(microseconds=micros), pk
+    except OverflowError:
+        raise InvalidCursor(cursor)
+
+
+def before_time_cursor(rows, field, cursor):
+    """Rows strictly after ``cursor`` in (-field, -id) order.
+
+    The leading ``field <= moment`` lets the index seek to the cursor instead
+    of walking every newer row; the OR only settles ties on ``moment``.
+    """
+    moment, pk = decode_time_cursor(cursor)
+    return rows.filter(
+        models.Q(**{f"{field}__lte": moment}), models.Q(**{f"{field}__lt": moment}) | models.Q(id__lt=pk)
+    )
+
+
+def after_cursor(cards, cursor):
+    """Cards strictly after ``cursor`` in (position, id) order."""
+    position, card_id = decode_cursor(cursor)
+    return cards.filter(models.Q(position__gt=position) | models.Q(position=position, id__gt=card_id))
+
+
+def first_pages(cards, limit):
+    """The first ``limit + 1`` cards of every list, in one query.
+
+    The extra row only tells the caller that a list has more cards. Rows come
+    back unordered: sorting the outer query would cost a temporary B-tree, so
+    callers sort each (small) page with ``card_sort_key`` instead.
+    """
+    row = models.Window(RowNumber(), partition_by=models.F("list_id"), order_by=[models.F(f) for f in CARD_ORDER])
+    return cards.annotate(list_row=row).filter(list_row__lte=limit + 1).order_by()
+
+
+def card_sort_key(card):
+    return card.position, card.id
+
+
+def split_page(cards, limit):
+    """Return ``(page, next_cursor)`` from up to ``limit + 1`` ordered cards."""
+    if len(cards) > limit:
+        page = cards[:limit]
+        return page, encode_cursor(page[-1])
+    return cards, None
@@ -1,4 +1,11 @@
-from .models import BoardMember
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.http import Http404, HttpResponseForbidden
+
+from .models import Board, BoardMember
 
 def get_role(board, user):
     if not user.is_authenticated:
@@ -23,3 +30,101 @@ def can_manage_lists(role):
 
 def can_manage_cards(role):
     return role in ["admin", "mentor", "student"]
+
+def _role_cache_timeout():
+    return getattr(settings, "BOARD_ROLE_CACHE_TIMEOUT", 0)
+
+def role_cache_key(board_id, user_id):
+    return f"board:role:{board_id}:{user_id}"
+
+def forget_role(board_id, user_id):
+    if _role_cache_timeout():
+        cache.delete(role_cache_key(board_id, user_id))
+
+def load_board_and_role(request, board_id):
+    """Resolve the board and the user's role on it with at most one query.
+
+    Results are memoized on the request, and roles are additionally kept in
+    Django's cache when BOARD_ROLE_CACHE_TIMEOUT is set.
+    """
+    memo = request.__dict__.setdefault("_board_roles", {})
+    if board_id in memo:
+        return memo[board_id]
+
+    user = request.user
+    timeout = _role_cache_timeout() if user.is_authenticated else 0
+    role = cache.get(role_cache_key(board_id, user.pk)) if timeout else None
+
+    if role:
+        board = Board.objects.filter(id=board_id).first()
+    else:
+        boards = Board.objects.filter(id=board_id)
+        if user.is_authenticated:
+            member_role = BoardMember.objects.filter(board=OuterRef("pk"), user_id=user.pk).values("role")[:1]
+            boards = boards.annotate(member_role=Subquery(member_role))
+        board = boards.first()
+        role = getattr(board, "member_role", None)
+        if board and role and timeout:
+            cache.set(role_cache_key(board_id, user.pk), role, timeout)
+
+    if board is None:
+        raise Http404("board_not_found")
+
+    memo[board_id] = (board, role)
+    return board, role
+
+async def aload_board_and_role(request, board_id):
+    """Async twin of load_board_and_role, on the async ORM and cache API."""
+    memo = request.__dict__.setdefault("_board_roles", {})
+    if board_id in memo:
+        return memo[board_id]
+
+    user = await request.auser()
+    timeout = _role_cache_timeout() if user.is_authenticated else 0
+    role = await cache.aget(role_cache_key(board_id, user.pk)) if timeout else None
+
+    if role:
+        board = await Board.objects.filter(id=board_id).afirst()
+    else:
+        boards = Board.objects.filter(id=board_id)
+        if user.is_authenticated:
+            member_role = BoardMember.objects.filter(board=OuterRef("pk"), user_id=user.pk).values("role")[:1]
+            boards = boards.annotate(member_role=Subquery(member_role))
+        board = await boards.afirst()
+        role = getattr(board, "member_role", None)
+        if board and role and timeout:
+            await cache.aset(role_cache_key(board_id, user.pk), role, timeout)
+
+    if board is None:
+        raise Http404("board_not_found")
+
+    memo[board_id] = (board, role)
+    return board, role
+
+def board_permission(check=None, denied="forbidden"):
+    """Resolve ``board_id`` into ``(board, role)`` and enforce ``check(role)``."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, board_id, *args, **kwargs):
+            board, role = load_board_and_role(request, board_id)
+            if not role:
+                return HttpResponseForbidden("not_member")
+            if check is not None and not check(role):
+                return HttpResponseForbidden(denied)
+            return view(request, board, role, *args, **kwargs)
+        return wrapper
+    return decorator
+
+def aboard_permission(check=None, denied="forbidden"):
+    """board_permission for ``async def`` views."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, board_id, *args, **kwargs):
+            board, role = await aload_board_and_role(request, board_id)
+            if not role:
+                return HttpResponseForbidden("not_member")
+            if check is not None and not check(role):
+                return HttpResponseForbidden(denied)
+            return await view(request, board, role, *args, **kwargs)
+        return wrapper
+    return decorator
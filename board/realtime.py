@@ -0,0 +1,121 @@
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+DEFAULT_BROKER = "board.realtime.InProcessBroker"
+
+_brokers = {}
+_brokers_lock = threading.Lock()
+
+
+class _QueueSubscription:
+    def __init__(self, broker, board_id):
+        self.broker = broker
+        self.board_id = board_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    def push(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+        except RuntimeError:
+            self.broker.unsubscribe(self)
+
+    async def get(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fan events out to subscribers living in this process only."""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def publish(self, board_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(board_id, ()))
+        for sub in subscribers:
+            sub.push(event)
+
+    def subscribe(self, board_id):
+        sub = _QueueSubscription(self, board_id)
+        with self._lock:
+            self._subscribers.setdefault(board_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.board_id)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.board_id]
+
+
+class _RedisSubscription:
+    def __init__(self, url, channel):
+        import redis.asyncio as aioredis
+
+        self.client = aioredis.from_url(url)
+        self.pubsub = self.client.pubsub()
+        self.channel = channel
+        self.subscribed = False
+
+    async def get(self, timeout=None):
+        if not self.subscribed:
+            await self.pubsub.subscribe(self.channel)
+            self.subscribed = True
+        msg = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return json.loads(msg["data"]) if msg else None
+
+    async def close(self):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+class RedisBroker:
+    """Relay events through Redis pub/sub so every worker sees them."""
+
+    def __init__(self, url="redis://localhost:6379/0", prefix="board-events"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImproperlyConfigured("RedisBroker requires the 'redis' package") from exc
+        self.url = url
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+
+    def _channel(self, board_id):
+        return f"{self.prefix}:{board_id}"
+
+    def publish(self, board_id, event):
+        self.client.publish(self._channel(board_id), json.dumps(event))
+
+    def subscribe(self, board_id):
+        return _RedisSubscription(self.url, self._channel(board_id))
+
+
+def get_broker():
+    path = getattr(settings, "BOARD_EVENTS_BROKER", DEFAULT_BROKER)
+    with _brokers_lock:
+        if path not in _brokers:
+            options = getattr(settings, "BOARD_EVENTS_BROKER_OPTIONS", {})
+            _brokers[path] = import_string(path)(**options)
+        return _brokers[path]
+
+
+def publish(board_id, event_type, **data):
+    event = {"type": event_type, **data}
+    transaction.on_commit(lambda: get_broker().publish(board_id, event))
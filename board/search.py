@@ -0,0 +1,141 @@
+import re
+
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+
+from .models import Card
+
+SEARCH_LIMIT = 200
+
+_token_re = re.compile(r"\w+", re.UNICODE)
+
+# Card text is indexed as title + desc. SQLite keeps an external-content FTS5
+# table in sync through triggers, so bulk_create, queryset.update() and
+# cascading deletes are covered without any Python hooks. Postgres uses a GIN
+# expression index over the same text.
+SQLITE_INSTALL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS board_card_fts USING fts5(
+        title, "desc", content='board_card', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS board_card_fts_ai AFTER INSERT ON board_card BEGIN
+        INSERT INTO board_card_fts(rowid, title, "desc") VALUES (new.id, new.title, new."desc");
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS board_card_fts_ad AFTER DELETE ON board_card BEGIN
+        INSERT INTO board_card_fts(board_card_fts, rowid, title, "desc") VALUES ('delete', old.id, old.title, old."desc");
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS board_card_fts_au AFTER UPDATE OF title, "desc" ON board_card BEGIN
+        INSERT INTO board_card_fts(board_card_fts, rowid, title, "desc") VALUES ('delete', old.id, old.title, old."desc");
+        INSERT INTO board_card_fts(rowid, title, "desc") VALUES (new.id, new.title, new."desc");
+    END""",
+]
+SQLITE_OBJECTS = ["board_card_fts", "board_card_fts_ai", "board_card_fts_ad", "board_card_fts_au"]
+SQLITE_UNINSTALL = [f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_OBJECTS[1:]] + [
+    "DROP TABLE IF EXISTS board_card_fts"
+]
+
+PG_DOCUMENT = """to_tsvector('simple', coalesce({table}title, '') || ' ' || coalesce({table}"desc", ''))"""
+PG_INSTALL = [
+    "CREATE INDEX IF NOT EXISTS board_card_search_gin ON board_card USING gin (%s)" % PG_DOCUMENT.format(table=""),
+]
+PG_UNINSTALL = ["DROP INDEX IF EXISTS board_card_search_gin"]
+
+
+def install(connection):
+    """Create the search index objects if missing; safe to call repeatedly.
+
+    SQLite drops triggers whenever Django rebuilds board_card during a
+    migration, so this also runs after every migrate and rebuilds the FTS
+    index when anything had to be recreated.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            placeholders = ", ".join(["%s"] * len(SQLITE_OBJECTS))
+            cursor.execute(f"SELECT count(*) FROM sqlite_master WHERE name IN ({placeholders})", SQLITE_OBJECTS)
+            if cursor.fetchone()[0] == len(SQLITE_OBJECTS):
+                return False
+            for sql in SQLITE_INSTALL:
+                cursor.execute(sql)
+            cursor.execute("INSERT INTO board_card_fts(board_card_fts) VALUES ('rebuild')")
+            return True
+        if connection.vendor == "postgresql":
+            for sql in PG_INSTALL:
+                cursor.execute(sql)
+            return True
+    return False
+
+
+def uninstall(connection):
+    statements = {"sqlite": SQLITE_UNINSTALL, "postgresql": PG_UNINSTALL}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def install_after_migrate(sender, using="default", **kwargs):
+    install(connections[using])
+
+
+def _tokens(q):
+    return _token_re.findall(q or "")[:16]
+
+
+def _fts5_query(tokens):
+    return " ".join('"%s"*' % t.replace('"', "") for t in tokens)
+
+
+def _tsquery(tokens):
+    return " & ".join(f"{t}:*" for t in tokens)
+
+
+def filter_cards(cards, q):
+    """Restrict a Card queryset to matches for ``q`` inside the same query."""
+    tokens = _tokens(q)
+    if not tokens:
+        return cards.none()
+
+    vendor = connections[cards.db].vendor
+    if vendor == "sqlite":
+        fts = RawSQL("SELECT rowid FROM board_card_fts WHERE board_card_fts MATCH %s", (_fts5_query(tokens),))
+        return cards.filter(id__in=fts)
+    if vendor == "postgresql":
+        match = RawSQL(
+            PG_DOCUMENT.format(table='"board_card".') + " @@ to_tsquery('simple', %s)",
+            (_tsquery(tokens),),
+            output_field=models.BooleanField(),
+        )
+        return cards.filter(match)
+
+    cond = models.Q()
+    for t in tokens:
+        cond &= models.Q(title__icontains=t) | models.Q(desc__icontains=t)
+    return cards.filter(cond)
+
+
+def search_board(board, q, limit=SEARCH_LIMIT):
+    """Return the board's cards matching ``q``, best match first."""
+    tokens = _tokens(q)
+    if not tokens:
+        return []
+
+    cards = Card.objects.filter(board=board).only("id", "list_id", "title", "tag")
+    vendor = connections[cards.db].vendor
+    if vendor == "sqlite":
+        return list(Card.objects.raw(
+            """SELECT board_card.id, board_card.list_id, board_card.title, board_card.tag
+               FROM board_card_fts JOIN board_card ON board_card.id = board_card_fts.rowid
+               WHERE board_card_fts MATCH %s AND board_card.board_id = %s
+               ORDER BY bm25(board_card_fts), board_card.id
+               LIMIT %s""",
+            (_fts5_query(tokens), board.id, limit),
+        ))
+    if vendor == "postgresql":
+        rank = RawSQL(
+            "ts_rank(%s, to_tsquery('simple', %%s))" % PG_DOCUMENT.format(table='"board_card".'),
+            (_tsquery(tokens),),
+            output_field=models.FloatField(),
+        )
+        cards = filter_cards(cards, q).annotate(rank=rank).order_by("-rank", "id")
+    else:
+        cards = filter_cards(cards, q).order_by("list_id", "position", "id")
+
+    return list(cards[:limit])
@@ -0,0 +1,249 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .counters import tag_fields, template_counts
+from .dashboard import forget_dashboard
+from .models import Board, BoardMember, List, Card, desc_preview
+from .ordering import nth_position
+
+JOIN_CODE_ATTEMPTS = 5
+
+BLANK = {
+    "board_name": "Untitled board",
+    "lists": [{"title": "To do"}, {"title": "Doing"}, {"title": "Done"}],
+}
+
+STARTER = {
+    "board_name": "Untitled board",
+    "lists": [
+        {
+            "title": "To do",
+            "cards": [
+                {"title": "Set up your board", "desc": "Create lists and add cards."},
+                {"title": "Drag cards", "desc": "Reorder within a list or move across lists."},
+            ],
+        },
+        {
+            "title": "Doing",
+            "cards": [{"title": "Click a card to edit", "desc": "Edit title and description in a modal."}],
+        },
+        {
+            "title": "Done",
+            "cards": [{"title": "Persist to database", "desc": "Reload the page and your board stays."}],
+        },
+    ],
+}
+
+MAI_PHUONG_LINH = {
+    "board_name": "Mai Phuong Linh",
+    "lists": [
+        {
+            "title": "March 2026",
+            "cards": [
+                {
+                    "title": "GENERAL GOALS (Semester 2)",
+                    "desc": (
+                        "Main Targets:\n"
+                        "- GPA: 9.3+\n"
+                        "- IELTS: 7.5+\n"
+                        "- Extracurriculars: Complete 2 activities\n"
+                        "  + 1 Finance-related\n"
+                        "  + 1 Charity / Community-related\n\n"
+                        "Rule: Consistency > intensity. Track progress weekly."
+                    ),
+                },
+                {
+                    "title": "GPA",
+                    "desc": (
+                        "Focus: Build strong study system.\n"
+                        "- Daily review after class (15–20 min)\n"
+                        "- 2 practice sessions per subject/week\n"
+                        "- Start error log\n"
+                        "- Weekly review every Sunday\n"
+                    ),
+                },
+                {
+                    "title": "IELTS",
+                    "desc": (
+                        "Focus: Foundation.\n"
+                        "- 3 Listening + 3 Reading/week\n"
+                        "- 1 Writing task/week\n"
+                        "- 2 Speaking recordings/week\n"
+                        "- Start vocabulary notebook\n"
+                    ),
+                },
+                {
+                    "title": "Finance Extracurriculars",
+                    "desc": (
+                        "Focus: Exploration.\n"
+                        "- Join business/economics club\n"
+                        "- Start personal finance journal\n"
+                        "- Learn basic money concepts\n"
+                        "- Look for 1 charity opportunity\n"
+                    ),
+                },
+            ],
+        },
+
+        {
+            "title": "April 2026",
+            "cards": [
+                {
+                    "title": "GPA",
+                    "desc": (
+                        "Focus: Improve weak subjects.\n"
+                        "- Use error log consistently\n"
+                        "- Focus hardest topics\n"
+                        "- Practice exam-style questions\n"
+                        "- Track progress weekly\n"
+                    ),
+                },
+                {
+                    "title": "IELTS",
+                    "desc": (
+                        "Focus: Improvement.\n"
+                        "- 2 Writing tasks/week\n"
+                        "- Improve structure + clarity\n"
+                        "- Expand vocabulary\n"
+                        "- Continue speaking practice\n"
+                    ),
+                },
+                {
+                    "title": "Finance Extracurriculars",
+                    "desc": (
+                        "Focus: Skill building.\n"
+                        "- Learn Excel basics\n"
+                        "- Create budget spreadsheet\n"
+                        "- Read 2 finance articles/week\n"
+                        "- Start participating in 1 activity (finance or charity)\n"
+                    ),
+                },
+            ],
+        },
+
+        {
+            "title": "May 2026",
+            "cards": [
+                {
+                    "title": "GPA",
+                    "desc": (
+                        "Focus: Exam preparation.\n"
+                        "- Full revision plan\n"
+                        "- Timed practice\n"
+                        "- Review mistakes carefully\n"
+                        "- Aim highest scores\n"
+                    ),
+                },
+                {
+                    "title": "IELTS",
+                    "desc": (
+                        "Focus: Test practice.\n"
+                        "- Weekly mini mock tests\n"
+                        "- Improve timing\n"
+                        "- Focus weak skills\n"
+                        "- Maintain consistency\n"
+                    ),
+                },
+                {
+                    "title": "Finance Extracurriculars",
+                    "desc": (
+                        "Focus: Completion.\n"
+                        "- Complete 1 finance-related activity/project\n"
+                        "- Complete 1 charity/community activity\n"
+                        "- Write reflection (what you learned)\n"
+                    ),
+                },
+            ],
+        },
+    ],
+}
+
+TEMPLATES = {
+    "blank": BLANK,
+    "starter": STARTER,
+    "maiphuonglinh": MAI_PHUONG_LINH,
+}
+
+
+class UnknownTemplate(KeyError):
+    pass
+
+
+def get_template(name):
+    try:
+        return TEMPLATES[name]
+    except KeyError:
+        raise UnknownTemplate(name)
+
+
+def insert_board(**fields):
+    """Create a Board with a fresh join code, retrying on the rare collision.
+
+    The unique constraint does the checking; each attempt runs in a savepoint
+    so a collision does not break the caller's transaction.
+    """
+    for attempt in range(JOIN_CODE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                return Board.objects.create(join_code=Board.generate_join_code(), **fields)
+        except IntegrityError:
+            if attempt == JOIN_CODE_ATTEMPTS - 1:
+                raise
+
+
+def _list_counts(row):
+    cards = row.get("cards", [])
+    counts = tag_fields(card.get("tag", Card.TAG_NOT_STARTED) for card in cards)
+    counts["next_card_position"] = nth_position(len(cards))
+    return counts
+
+
+def seed_lists(board, template, version=0):
+    """Insert the template's lists and cards: two INSERTs however large it is.
+
+    The lists come with their counters; the board's are the caller's to set
+    (``template_counts``), on insert or on reset.
+    """
+    rows = template.get("lists", [])
+    lists = List.objects.bulk_create(
+        List(board=board, title=row["title"], position=nth_position(li), version=version, **_list_counts(row))
+        for li, row in enumerate(rows)
+    )
+    now = timezone.now()
+    Card.objects.bulk_create(
+        (
+            Card(
+                board=board,
+                list=lst,
+                title=card["title"],
+                desc=card.get("desc", ""),
+                desc_preview=desc_preview(card.get("desc", "")),
+                tag=card.get("tag", Card.TAG_NOT_STARTED),
+                position=nth_position(ci),
+                version=version,
+                finished_at=now if card.get("tag") == Card.TAG_FINISHED else None,
+            )
+            for lst, row in zip(lists, rows)
+            for ci, card in enumerate(row.get("cards", []))
+        ),
+        batch_size=1000,
+    )
+    return lists
+
+
+def create_board(owner, template, name=None, members=()):
+    """A new board owned by ``owner`` and seeded from ``template``.
+
+    ``members`` is a sequence of ``(user, role)`` pairs added besides the owner.
+    """
+    with transaction.atomic():
+        board = insert_board(name=name or template["board_name"], created_by=owner, **template_counts(template))
+        BoardMember.objects.bulk_create(
+            [BoardMember(board=board, user=owner, role=BoardMember.ROLE_ADMIN)]
+            + [BoardMember(board=board, user=user, role=role) for user, role in members]
+        )
+        seed_lists(board, template)
+    # bulk_create sends no post_save, so the membership signal does not fire.
+    for user in {owner, *(user for user, _ in members)}:
+        forget_dashboard(user.pk)
+    return board
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .dashboard import forget_dashboard
+from .models import BoardMember, CardAssignment
+from .permissions import forget_role
+
+
+@receiver(post_save, sender=BoardMember)
+@receiver(post_delete, sender=BoardMember)
+def forget_member_role(sender, instance, **kwargs):
+    forget_role(instance.board_id, instance.user_id)
+    forget_dashboard(instance.user_id)
+
+
+@receiver(post_delete, sender=BoardMember)
+def drop_member_assignments(sender, instance, **kwargs):
+    # "My cards" trusts assignments to imply membership.
+    CardAssignment.objects.filter(board_id=instance.board_id, user_id=instance.user_id).delete()
@@ -0,0 +1,119 @@
+import gzip
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import List, Card
+
+try:
+    import orjson
+except ImportError:  # optional, only makes encoding faster
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional, enables Content-Encoding: br
+    brotli = None
+
+SNAPSHOT_FORMAT = 2
+TAGS = [tag for tag, _ in Card.TAG_CHOICES]
+TAG_CODES = {tag: code for code, tag in enumerate(TAGS)}
+
+
+def snapshot_data(board):
+    """The board as parallel arrays: lists in order, then cards grouped by list in order.
+
+    ``tag`` holds indexes into ``tags``; cards carry ``preview`` rather than the
+    full description. The version is read before the rows, so the rows are
+    never older than it.
+    """
+    lists = List.objects.filter(board=board).order_by("position", "id").values_list("id", "title")
+    cards = (
+        Card.objects.filter(board=board)
+        .order_by("list_id", "position", "id")
+        .values_list("id", "list_id", "title", "desc_preview", "tag")
+    )
+
+    list_cols = {"id": [], "title": []}
+    for list_id, title in lists:
+        list_cols["id"].append(list_id)
+        list_cols["title"].append(title)
+
+    card_cols = {"id": [], "list": [], "title": [], "preview": [], "tag": []}
+    for card_id, list_id, title, preview, tag in cards:
+        card_cols["id"].append(card_id)
+        card_cols["list"].append(list_id)
+        card_cols["title"].append(title)
+        card_cols["preview"].append(preview)
+        card_cols["tag"].append(TAG_CODES.get(tag, 0))
+
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "board": {"id": board.id, "name": board.name, "version": board.version},
+        "tags": TAGS,
+        "lists": list_cols,
+        "cards": card_cols,
+    }
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def negotiate_encoding(accept_encoding) -> str:
+    """Pick br, gzip or identity from an Accept-Encoding header, honouring q=0."""
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name] = q
+
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if offered.get(encoding, offered.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    return body
+
+
+def snapshot_key(board, encoding):
+    return f"board:snapshot:{board.id}:{board.version}:{encoding}"
+
+
+def snapshot_bytes(board, encoding="identity"):
+    """Encoded snapshot for the board's current version, cached per encoding.
+
+    The key carries the version, so a write makes the old entries unreachable
+    instead of having to delete them.
+    """
+    timeout = getattr(settings, "BOARD_SNAPSHOT_CACHE_TIMEOUT", 300)
+    key = snapshot_key(board, encoding)
+    body = cache.get(key) if timeout else None
+    if body is None:
+        if encoding == "identity":
+            body = dumps(snapshot_data(board))
+        else:
+            body = compress(snapshot_bytes(board), encoding)
+        if timeout:
+            cache.set(key, body, timeout)
+    return body
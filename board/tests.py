@@ -1,3 +1,1402 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import tracemalloc
+import types
+from contextlib import contextmanager
+from unittest import mock
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.db.utils import load_backend
+from django.http import Http404, HttpResponse
+from django.conf import settings
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import DESC_PREVIEW_LENGTH, Board, BoardMember, List, Card, CardAssignment, ArchivedCard
+from . import exporting, realtime, search
+from .counters import recount
+from .instrumentation import RequestMetricsMiddleware
+from .ordering import nth_position
+from .permissions import aload_board_and_role, load_board_and_role, role_cache_key
+
+
+def make_board(owner, lists=3, cards_per_list=2, role=BoardMember.ROLE_ADMIN):
+    b = Board.objects.create(name="Test board", created_by=owner, join_code=Board.generate_join_code())
+    BoardMember.objects.create(board=b, user=owner, role=role)
+    for li in range(lists):
+        lst = List.objects.create(board=b, title=f"List {li}", position=nth_position(li))
+        Card.objects.bulk_create(
+            Card(board=b, list=lst, title=f"Card {li}.{ci}", desc="body", desc_preview="body", position=nth_position(ci))
+            for ci in range(cards_per_list)
+        )
+    recount(b)
+    return b
+
+
+class BoardTestMixin:
+    """An owner logged in to a fresh board of ``board_lists`` lists of ``board_cards`` cards."""
+
+    board_lists = 2
+    board_cards = 2
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user("owner", password="pw")
+        self.client.force_login(self.user)
+        self.board = make_board(self.user, lists=self.board_lists, cards_per_list=self.board_cards)
+        self.lists = list(self.board.lists.order_by("position", "id"))
+
+    def _ops(self, *ops, expect=200, capture=False):
+        """POST ``ops`` as one batch, check the status and return the JSON body.
+
+        ``capture`` runs the on_commit hooks the batch queued, as a real commit would.
+        """
+        url = reverse("board:board_ops", args=[self.board.id])
+        with self.captureOnCommitCallbacks(execute=capture):
+            res = self.client.post(url, {"ops": list(ops)}, content_type="application/json")
+        self.assertEqual(res.status_code, expect)
+        return res.json()
+
+
+class BoardViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("owner", password="pw")
+        self.client.force_login(self.user)
+
+    def _count_queries(self, board, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(reverse("board:board_view", args=[board.id]), params)
+        self.assertEqual(res.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_lists(self):
+        small = make_board(self.user, lists=1)
+        large = make_board(self.user, lists=60)
+        self.assertEqual(self._count_queries(small), self._count_queries(large))
+        self.assertEqual(self._count_queries(small, q="card"), self._count_queries(large, q="card"))
+
+    def test_cards_grouped_per_list_and_filtered(self):
+        b = make_board(self.user, lists=2, cards_per_list=2)
+        Card.objects.filter(board=b, title="Card 1.1").update(title="Needle")
+
+        res = self.client.get(reverse("board:board_view", args=[b.id]))
+        lists = res.context["lists"]
+        self.assertEqual([len(l.cards_for_view) for l in lists], [2, 2])
+        self.assertEqual([c.title for c in lists[1].cards_for_view], ["Card 1.0", "Needle"])
+
+        res = self.client.get(reverse("board:board_view", args=[b.id]), {"q": "needle"})
+        lists = res.context["lists"]
+        self.assertEqual([[c.title for c in l.cards_for_view] for l in lists], [[], ["Needle"]])
+
+    def test_board_shows_description_previews_and_cards_load_in_full(self):
+        b = make_board(self.user, lists=1, cards_per_list=1)
+        card = Card.objects.get(board=b)
+        long_desc = "Plan the week. " + "Revise every chapter carefully. " * 20 + "THE-END"
+        self.client.post(
+            reverse("board:card_update", args=[b.id, card.id]),
+            {"title": card.title, "desc": long_desc, "tag": "in_progress"},
+            content_type="application/json",
+        )
+        card.refresh_from_db()
+        self.assertEqual(len(card.desc_preview), DESC_PREVIEW_LENGTH)
+        self.assertTrue(card.desc_preview.startswith("Plan the week.") and card.desc_preview.endswith("\u2026"))
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(reverse("board:board_view", args=[b.id]))
+        self.assertContains(res, card.desc_preview)
+        self.assertNotContains(res, "THE-END")
+        card_query = next(q["sql"] for q in ctx.captured_queries if 'FROM "board_card"' in q["sql"])
+        self.assertNotIn('"board_card"."desc",', card_query)
+
+        detail = self.client.get(reverse("board:card_detail", args=[b.id, card.id])).json()
+        self.assertEqual(detail["card"]["desc"], long_desc.strip())
+        self.assertEqual(self.client.get(reverse("board:card_detail", args=[b.id, card.id + 999])).status_code, 400)
+
+
+@override_settings(BOARD_LIST_PAGE_SIZE=10)
+class ListPaginationTests(TestCase):
+    card_id_re = re.compile(r'data-card-id="(\d+)"')
+
+    def setUp(self):
+        caches["template_fragments"].clear()
+        self.user = get_user_model().objects.create_user("owner", password="pw")
+        self.client.force_login(self.user)
+
+    def _render(self, board):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(reverse("board:board_view", args=[board.id]))
+        self.assertEqual(res.status_code, 200)
+        return res.content.decode(), len(ctx.captured_queries)
+
+    def test_initial_render_is_bounded_by_page_size(self):
+        small_html, small_queries = self._render(make_board(self.user, lists=3, cards_per_list=11))
+        large_html, large_queries = self._render(make_board(self.user, lists=3, cards_per_list=600))
+
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(len(self.card_id_re.findall(large_html)), 30)
+        self.assertLess(abs(len(large_html) - len(small_html)), 200)
+        self.assertEqual(large_html.count('data-role="load-more"'), 3)
+
+    def test_list_cards_walks_the_list_in_order(self):
+        b = make_board(self.user, lists=1, cards_per_list=25)
+        lst = b.lists.get()
+        Card.objects.filter(list=lst, title="Card 0.3").update(position=nth_position(20))
+        expected = list(Card.objects.filter(list=lst).order_by("position", "id").values_list("id", flat=True))
+        url = reverse("board:list_cards", args=[b.id, lst.id])
+
+        seen, cursor = [], None
+        while True:
+            data = self.client.get(url, {"limit": 7, **({"after": cursor} if cursor else {})}).json()
+            seen += [int(pk) for pk in self.card_id_re.findall(data["html"])]
+            cursor = data["next"]
+            if not cursor:
+                break
+        self.assertEqual(seen, expected)
+
+        self.assertEqual(self.client.get(url, {"after": "nope"}).status_code, 400)
+        other = make_board(self.user, lists=1).lists.get()
+        self.assertEqual(self.client.get(reverse("board:list_cards", args=[b.id, other.id])).status_code, 400)
+
+
+class CardMoveTests(BoardTestMixin, TestCase):
+    board_cards = 3
+
+    def _titles(self, lst):
+        return list(Card.objects.filter(list=lst).order_by("position", "id").values_list("title", flat=True))
+
+    def _move(self, card, to_list, to_index):
+        return self.client.post(
+            reverse("board:card_move", args=[self.board.id]),
+            {"card_id": card.id, "to_list_id": to_list.id, "to_index": to_index},
+            content_type="application/json",
+        )
+
+    def test_move_writes_only_the_moved_card(self):
+        card = Card.objects.get(board=self.board, title="Card 0.2")
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._move(card, self.lists[1], 1).status_code, 200)
+        writes = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "board_card"')]
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(self._titles(self.lists[1]), ["Card 1.0", "Card 0.2", "Card 1.1", "Card 1.2"])
+        self.assertEqual(self._titles(self.lists[0]), ["Card 0.0", "Card 0.1"])
+
+    def test_move_within_list_and_to_ends(self):
+        card = Card.objects.get(board=self.board, title="Card 0.0")
+        self._move(card, self.lists[0], 99)
+        self.assertEqual(self._titles(self.lists[0]), ["Card 0.1", "Card 0.2", "Card 0.0"])
+        self._move(card, self.lists[0], 0)
+        self.assertEqual(self._titles(self.lists[0]), ["Card 0.0", "Card 0.1", "Card 0.2"])
+
+    def test_exhausted_gap_rebalances_list(self):
+        Card.objects.filter(list=self.lists[0]).update(position=5)
+        card = Card.objects.get(board=self.board, title="Card 1.0")
+        self._move(card, self.lists[0], 1)
+        self.assertEqual(self._titles(self.lists[0]), ["Card 0.0", "Card 1.0", "Card 0.1", "Card 0.2"])
+        positions = list(Card.objects.filter(list=self.lists[0]).values_list("position", flat=True))
+        self.assertEqual(len(set(positions)), 4)
+
+    def test_rebalance_command_bumps_version_for_delta_clients(self):
+        Card.objects.filter(list=self.lists[0]).update(position=5)
+        since = Board.objects.get(id=self.board.id).version
+        call_command("rebalance_positions", "--board-id", str(self.board.id), stdout=io.StringIO())
+        changes = self.client.get(reverse("board:board_changes", args=[self.board.id]), {"since": since}).json()
+        self.assertEqual(changes["version"], since + 1)
+        moved = {c["id"]: c["position"] for c in changes["cards"] if c["list_id"] == self.lists[0].id}
+        self.assertEqual(sorted(moved.values()), [nth_position(i) for i in range(3)])
+
+
+class ListReorderTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("owner", password="pw")
+        self.client.force_login(self.user)
+        self.board = make_board(self.user, lists=3, cards_per_list=0)
+        self.ids = list(self.board.lists.order_by("position", "id").values_list("id", flat=True))
+
+    def _reorder(self, order):
+        return self.client.post(
+            reverse("board:list_reorder", args=[self.board.id]), {"order": order}, content_type="application/json"
+        )
+
+    def test_reorder_is_one_update(self):
+        new_order = list(reversed(self.ids))
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._reorder(new_order).status_code, 200)
+        self.assertEqual(len([q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "board_list"')]), 1)
+        self.assertEqual(list(self.board.lists.order_by("position", "id").values_list("id", flat=True)), new_order)
+
+    def test_stale_orders_are_rejected(self):
+        other = make_board(self.user, lists=1, cards_per_list=0)
+        foreign = other.lists.get().id
+        for order in (self.ids[:2], self.ids + [foreign], self.ids[:2] + [foreign], self.ids + self.ids[:1]):
+            res = self._reorder(order)
+            self.assertEqual(res.status_code, 400)
+            self.assertEqual(res.content, b"stale_order")
+        self.assertEqual(list(self.board.lists.order_by("position", "id").values_list("id", flat=True)), self.ids)
+
+
+class BoardPermissionTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user("owner", password="pw")
+        self.other = User.objects.create_user("other", password="pw")
+        self.board = make_board(self.owner, lists=1, cards_per_list=1)
+
+    def _request(self, user):
+        request = RequestFactory().get("/")
+        request.user = user
+        return request
+
+    def test_board_and_role_resolved_in_one_query_and_memoized(self):
+        request = self._request(self.owner)
+        with self.assertNumQueries(1):
+            board, role = load_board_and_role(request, self.board.id)
+            self.assertEqual((board, role), (self.board, BoardMember.ROLE_ADMIN))
+            load_board_and_role(request, self.board.id)
+
+        self.assertEqual(load_board_and_role(self._request(self.other), self.board.id)[1], None)
+        with self.assertRaises(Http404):
+            load_board_and_role(self._request(self.owner), self.board.id + 1000)
+
+    def test_api_views_answer_404_and_403(self):
+        self.client.force_login(self.other)
+        url = reverse("board:card_create", args=[self.board.id])
+        self.assertEqual(self.client.post(url, {}, content_type="application/json").status_code, 403)
+        url = reverse("board:card_create", args=[self.board.id + 1000])
+        self.assertEqual(self.client.post(url, {}, content_type="application/json").status_code, 404)
+
+        BoardMember.objects.create(board=self.board, user=self.other, role=BoardMember.ROLE_SPECTATOR)
+        res = self.client.post(reverse("board:card_create", args=[self.board.id]), {}, content_type="application/json")
+        self.assertEqual(res.content, b"no_card_permission")
+
+    async def test_async_api_views_check_permissions_on_the_async_orm(self):
+        request = self._request(self.owner)
+        request.auser = lambda: asyncio.sleep(0, self.owner)
+        board, role = await aload_board_and_role(request, self.board.id)
+        self.assertEqual((board.id, role), (self.board.id, BoardMember.ROLE_ADMIN))
+
+        card = await Card.objects.filter(board_id=self.board.id).aget()
+        url = reverse("board:card_update", args=[self.board.id, card.id])
+        body = {"title": "Async", "desc": "", "tag": "finished"}
+        await self.async_client.aforce_login(self.other)
+        self.assertEqual((await self.async_client.post(url, body, content_type="application/json")).status_code, 403)
+
+        await self.async_client.aforce_login(self.owner)
+        res = await self.async_client.post(url, body, content_type="application/json")
+        self.assertEqual(res.json(), {"ok": True})
+        self.assertEqual((await Card.objects.aget(id=card.id)).title, "Async")
+
+    @override_settings(BOARD_ROLE_CACHE_TIMEOUT=60)
+    def test_cached_role_is_invalidated_on_membership_changes(self):
+        cache.clear()
+        self.client.force_login(self.other)
+        self.client.post(reverse("board:board_join"), {"join_code": self.board.join_code}, content_type="application/json")
+        self.assertEqual(load_board_and_role(self._request(self.other), self.board.id)[1], BoardMember.ROLE_SPECTATOR)
+
+        self.client.force_login(self.owner)
+        self.client.post(
+            reverse("board:member_set_role", args=[self.board.id]),
+            {"user_id": self.other.id, "role": BoardMember.ROLE_MENTOR},
+            content_type="application/json",
+        )
+        self.assertEqual(load_board_and_role(self._request(self.other), self.board.id)[1], BoardMember.ROLE_MENTOR)
+
+        board_id = self.board.id
+        self.board.delete()
+        self.assertIsNone(cache.get(role_cache_key(board_id, self.other.id)))
+        with self.assertRaises(Http404):
+            load_board_and_role(self._request(self.other), board_id)
+
+
+class RecordingBroker(realtime.InProcessBroker):
+    """The in-process broker, also keeping every published event."""
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def publish(self, board_id, event):
+        self.events.append((board_id, event))
+        super().publish(board_id, event)
+
+
+@override_settings(BOARD_EVENTS_BROKER="board.tests.RecordingBroker")
+class RealtimeEventTests(BoardTestMixin, TestCase):
+    board_cards = 1
+
+    def setUp(self):
+        super().setUp()
+        self.broker = realtime.get_broker()
+        self.broker.events.clear()
+
+    def _post(self, name, data, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(reverse(name, args=[self.board.id, *args]), data, content_type="application/json")
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def test_mutations_publish_compact_events(self):
+        card_id = self._post("board:card_create", {"list_id": self.lists[0].id, "title": "New"})["id"]
+        self._post("board:card_update", {"title": "Renamed", "desc": "", "tag": "finished"}, card_id)
+        self._post("board:card_move", {"card_id": card_id, "to_list_id": self.lists[1].id, "to_index": 0})
+        self._post("board:list_rename", {"title": "Later"}, self.lists[1].id)
+        self._post("board:list_reorder", {"order": [self.lists[1].id, self.lists[0].id]})
+        self._post("board:card_delete", {}, card_id)
+
+        first, second = (str(lst.id) for lst in self.lists)
+        self.assertEqual(
+            [event for _, event in self.broker.events],
+            [
+                {"type": "card.created", "card": card_id, "list": self.lists[0].id, "title": "New", "desc": "", "tag": "not_started", "version": 1, "counts": {first: {"not_started": 1}}},
+                {"type": "card.updated", "card": card_id, "title": "Renamed", "desc": "", "tag": "finished", "version": 2, "counts": {first: {"not_started": -1, "finished": 1}}},
+                {"type": "card.moved", "card": card_id, "list": self.lists[1].id, "index": 0, "version": 3, "counts": {first: {"finished": -1}, second: {"finished": 1}}},
+                {"type": "list.renamed", "list": self.lists[1].id, "title": "Later", "version": 4},
+                {"type": "lists.reordered", "order": [self.lists[1].id, self.lists[0].id], "version": 5},
+                {"type": "card.deleted", "card": card_id, "version": 6, "counts": {second: {"finished": -1}}},
+            ],
+        )
+        self.assertEqual({board_id for board_id, _ in self.broker.events}, {self.board.id})
+
+    def test_rejected_mutations_publish_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("board:list_reorder", args=[self.board.id]), {"order": [self.lists[0].id]}, content_type="application/json"
+            )
+        self.assertEqual(self.broker.events, [])
+
+
+@override_settings(BOARD_EVENTS_BROKER="board.tests.RecordingBroker")
+class BoardOpsTests(BoardTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.broker = realtime.get_broker()
+        self.broker.events.clear()
+
+    def _titles(self, lst):
+        return list(Card.objects.filter(list=lst).order_by("position", "id").values_list("title", flat=True))
+
+    def test_batch_applies_in_order_with_one_version(self):
+        first = Card.objects.get(title="Card 0.0")
+        data = self._ops(
+            {"op": "card.create", "list": self.lists[0].id, "title": "Fresh", "ref": "tmp-1"},
+            {"op": "card.move", "card": "tmp-1", "list": self.lists[1].id, "index": 0},
+            {"op": "card.update", "card": first.id, "title": "Edited", "desc": "d", "tag": "in_progress"},
+            {"op": "lists.reorder", "order": [self.lists[1].id, self.lists[0].id]},
+            capture=True,
+        )
+        new_id = data["results"][0]["id"]
+        self.assertEqual(data["version"], 1)
+        self.assertEqual(data["results"][0]["ref"], "tmp-1")
+        self.assertEqual(data["results"][1]["id"], new_id)
+
+        self.assertEqual(self._titles(self.lists[1]), ["Fresh", "Card 1.0", "Card 1.1"])
+        self.assertEqual(self._titles(self.lists[0]), ["Edited", "Card 0.1"])
+        self.assertEqual(list(self.board.lists.order_by("position").values_list("id", flat=True)), [self.lists[1].id, self.lists[0].id])
+        self.assertEqual({event["version"] for _, event in self.broker.events}, {1})
+        self.assertEqual(len(self.broker.events), 4)
+
+    def test_failing_op_rolls_back_the_whole_batch(self):
+        card = Card.objects.get(title="Card 0.0")
+        data = self._ops(
+            {"op": "card.update", "card": card.id, "title": "Lost", "desc": "", "tag": "finished"},
+            {"op": "card.delete", "card": 999999},
+            expect=409,
+            capture=True,
+        )
+        self.assertEqual(data, {"ok": False, "error": "card_not_found", "index": 1, "version": 0})
+        card.refresh_from_db()
+        self.assertEqual(card.title, "Card 0.0")
+        self.assertEqual(self.broker.events, [])
+
+    def test_list_ops_need_list_permission(self):
+        BoardMember.objects.filter(board=self.board, user=self.user).update(role=BoardMember.ROLE_STUDENT)
+        data = self._ops({"op": "list.rename", "list": self.lists[0].id, "title": "Nope"}, expect=403)
+        self.assertEqual(data["error"], "no_list_permission")
+
+    def test_malformed_batches_are_rejected(self):
+        self._ops(expect=400)
+        self.assertEqual(self._ops({"op": "card.explode"}, expect=400)["error"], "bad_op")
+        self._ops({"op": "card.move", "card": 1, "list": "x", "index": 0}, expect=409)
+
+
+class ChangeTrackingTests(BoardTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.changes_url = reverse("board:board_changes", args=[self.board.id])
+
+    def test_get_views_answer_304_until_the_board_changes(self):
+        for url in (reverse("board:board_view", args=[self.board.id]), reverse("board:export_json", args=[self.board.id])):
+            etag = self.client.get(url)["ETag"]
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+            self._ops({"op": "list.rename", "list": self.lists[0].id, "title": url})
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(res.status_code, 200)
+            self.assertNotEqual(res["ETag"], etag)
+
+    def test_changes_since_returns_only_the_delta(self):
+        kept, dropped = Card.objects.filter(list=self.lists[0]).order_by("position")
+        lost_with_list = list(Card.objects.filter(list=self.lists[1]).values_list("id", flat=True))
+        v1 = self._ops({"op": "card.update", "card": kept.id, "title": "Edited", "desc": "", "tag": "finished"})["version"]
+        self._ops({"op": "card.delete", "card": dropped.id}, {"op": "list.delete", "list": self.lists[1].id})
+
+        with self.assertNumQueries(6):
+            data = self.client.get(self.changes_url, {"since": v1}).json()
+        self.assertEqual(data["version"], v1 + 1)
+        self.assertFalse(data["full"])
+        # The delete changed the first list's counters, so it is part of the delta.
+        self.assertEqual(
+            data["lists"],
+            [{"id": self.lists[0].id, "title": "List 0", "position": nth_position(0), "counts": {"not_started": 0, "in_progress": 0, "finished": 1}}],
+        )
+        self.assertEqual(data["cards"], [])
+        self.assertEqual(data["deleted"]["lists"], [self.lists[1].id])
+        self.assertEqual(sorted(data["deleted"]["cards"]), sorted([dropped.id, *lost_with_list]))
+
+        data = self.client.get(self.changes_url, {"since": v1 - 1}).json()
+        self.assertEqual([c["title"] for c in data["cards"]], ["Edited"])
+
+        data = self.client.get(self.changes_url, {"since": 0}).json()
+        self.assertTrue(data["full"])
+        self.assertEqual([c["title"] for c in data["cards"]], ["Edited"])
+        self.assertEqual([l["id"] for l in data["lists"]], [self.lists[0].id])
+
+    def test_changes_etag_and_bad_since(self):
+        etag = self.client.get(self.changes_url, {"since": 0})["ETag"]
+        self.assertEqual(self.client.get(self.changes_url, {"since": 0}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(self.changes_url, {"since": "x"}).status_code, 400)
+
+
+class ArchiveTests(BoardTestMixin, TestCase):
+    board_cards = 3
+
+    def _finish(self, card, days_ago):
+        self._ops({"op": "card.update", "card": card.id, "title": card.title, "desc": "", "tag": "finished"})
+        Card.objects.filter(id=card.id).update(finished_at=timezone.now() - timedelta(days=days_ago))
+
+    def test_finish_time_is_kept_across_edits_and_cleared_when_reopened(self):
+        card = Card.objects.get(title="Card 0.0")
+        self._finish(card, days_ago=5)
+        stamped = Card.objects.get(id=card.id).finished_at
+        self._ops({"op": "card.update", "card": card.id, "title": "Renamed", "desc": "", "tag": "finished"})
+        self.assertEqual(Card.objects.get(id=card.id).finished_at, stamped)
+        self._ops({"op": "card.update", "card": card.id, "title": "Renamed", "desc": "", "tag": "in_progress"})
+        self.assertIsNone(Card.objects.get(id=card.id).finished_at)
+
+    def test_archived_cards_leave_the_board_and_come_back_on_restore(self):
+        card = Card.objects.get(title="Card 0.1")
+        before = self._ops({"op": "list.rename", "list": self.lists[1].id, "title": "Later"})["version"]
+        res = self.client.post(reverse("board:card_archive", args=[self.board.id, card.id]))
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(Card.objects.filter(id=card.id).exists())
+        self.assertNotContains(self.client.get(reverse("board:board_view", args=[self.board.id])), "Card 0.1")
+
+        changes = self.client.get(reverse("board:board_changes", args=[self.board.id]), {"since": 0}).json()
+        self.assertNotIn("Card 0.1", [c["title"] for c in changes["cards"]])
+        delta = self.client.get(reverse("board:board_changes", args=[self.board.id]), {"since": before}).json()
+        self.assertEqual(delta["deleted"]["cards"], [card.id])
+
+        listing = self.client.get(reverse("board:archived_cards", args=[self.board.id])).json()
+        self.assertEqual([(c["title"], c["list_title"]) for c in listing["cards"]], [("Card 0.1", self.lists[0].title)])
+
+        archived_id = listing["cards"][0]["id"]
+        res = self.client.post(reverse("board:archive_restore", args=[self.board.id, archived_id]))
+        self.assertEqual(res.json()["list"], self.lists[0].id)
+        titles = list(Card.objects.filter(list=self.lists[0]).order_by("position").values_list("title", flat=True))
+        self.assertEqual(titles, ["Card 0.0", "Card 0.2", "Card 0.1"])
+        self.assertFalse(ArchivedCard.objects.exists())
+        self.assertEqual(self.client.post(reverse("board:archive_restore", args=[self.board.id, archived_id])).content, b"archived_not_found")
+
+    def test_restore_brings_back_assignees_still_on_the_board(self):
+        card = Card.objects.get(title="Card 0.1")
+        stays, leaves = (get_user_model().objects.create_user(name, password="pw") for name in ("stays", "leaves"))
+        for user in (stays, leaves):
+            BoardMember.objects.create(board=self.board, user=user, role=BoardMember.ROLE_STUDENT)
+            self._ops({"op": "card.assign", "card": card.id, "user": user.id})
+        self._ops({"op": "card.archive", "card": card.id})
+        self.assertEqual(ArchivedCard.objects.get().assignees, [stays.id, leaves.id])
+
+        BoardMember.objects.filter(user=leaves).delete()
+        restored = self._ops({"op": "card.restore", "archived": ArchivedCard.objects.get().id})["results"][0]["id"]
+        self.assertEqual(
+            list(CardAssignment.objects.filter(card_id=restored).values_list("user_id", "tag", "board_id")),
+            [(stays.id, "not_started", self.board.id)],
+        )
+
+    def test_restore_falls_back_to_the_first_list(self):
+        card = Card.objects.get(title="Card 1.0")
+        self._ops({"op": "card.archive", "card": card.id}, {"op": "list.delete", "list": self.lists[1].id})
+        archived = ArchivedCard.objects.get()
+        self.assertIsNone(archived.list_id)
+        result = self._ops({"op": "card.restore", "archived": archived.id})["results"][0]
+        self.assertEqual(result["list"], self.lists[0].id)
+
+    def test_archive_command_moves_only_cards_finished_before_the_cutoff(self):
+        old = Card.objects.filter(list=self.lists[0]).order_by("position")
+        for card in old:
+            self._finish(card, days_ago=40)
+        self._finish(Card.objects.get(title="Card 1.0"), days_ago=2)
+        version = Board.objects.get(id=self.board.id).version
+
+        out = io.StringIO()
+        call_command("archive_cards", "--dry-run", stdout=out)
+        self.assertIn("3 cards", out.getvalue())
+        self.assertEqual(ArchivedCard.objects.count(), 0)
+
+        call_command("archive_cards", "--batch-size", "2", stdout=io.StringIO())
+        self.assertEqual(sorted(ArchivedCard.objects.values_list("title", flat=True)), ["Card 0.0", "Card 0.1", "Card 0.2"])
+        self.assertEqual(list(Card.objects.filter(board=self.board).values_list("title", flat=True).order_by("title")),
+                         ["Card 1.0", "Card 1.1", "Card 1.2"])
+        # Two batches, one version each.
+        self.assertEqual(Board.objects.get(id=self.board.id).version, version + 2)
+
+
+class CounterTests(BoardTestMixin, TestCase):
+    board_cards = 3
+
+    def _counts(self, obj):
+        obj.refresh_from_db()
+        return (obj.cards_not_started, obj.cards_in_progress, obj.cards_finished)
+
+    def test_every_op_keeps_the_counters_exact(self):
+        first, second = self.lists
+        cards = list(Card.objects.filter(list=first).order_by("position"))
+        res = self._ops(
+            {"op": "card.create", "list": first.id, "title": "New", "ref": "n"},
+            {"op": "card.update", "card": cards[0].id, "title": "Done", "desc": "", "tag": "finished"},
+            {"op": "card.update", "card": cards[1].id, "title": "Busy", "desc": "", "tag": "in_progress"},
+            {"op": "card.move", "card": cards[1].id, "list": second.id, "index": 0},
+            {"op": "card.delete", "card": cards[2].id},
+            {"op": "card.archive", "card": cards[0].id},
+        )
+        self.assertEqual(res["results"][3]["counts"], {str(first.id): {"in_progress": -1}, str(second.id): {"in_progress": 1}})
+        self.assertEqual(self._counts(first), (1, 0, 0))
+        self.assertEqual(self._counts(second), (3, 1, 0))
+        self.assertEqual(self._counts(self.board), (4, 1, 0))
+
+        archived = ArchivedCard.objects.get(original_id=cards[0].id)
+        self._ops({"op": "card.restore", "archived": archived.id}, {"op": "list.delete", "list": second.id})
+        self.assertEqual(self._counts(first), (1, 0, 1))
+        self.assertEqual(self._counts(self.board), (1, 0, 1))
+        self.assertFalse(recount(self.board))
+
+        self._ops({"op": "board.reset", "template": "starter"}, {"op": "list.create", "title": "Extra"})
+        self.board.refresh_from_db()
+        self.assertFalse(recount(self.board))
+
+    def test_new_cards_and_lists_take_the_next_position(self):
+        first = self.lists[0]
+        first.refresh_from_db()
+        expected = first.next_card_position
+        with CaptureQueriesContext(connection) as ctx:
+            card_id = self._ops({"op": "card.create", "list": first.id, "title": "New"})["results"][0]["id"]
+        self.assertEqual(Card.objects.get(id=card_id).position, expected)
+        self.assertFalse([q for q in ctx.captured_queries if "MAX(" in q["sql"]])
+
+        # A move to the end of a list leaves room after it as well.
+        self._ops({"op": "card.move", "card": card_id, "list": self.lists[1].id, "index": 99})
+        self._ops({"op": "card.create", "list": self.lists[1].id, "title": "Last"})
+        titles = list(Card.objects.filter(list=self.lists[1]).order_by("position").values_list("title", flat=True))
+        self.assertEqual(titles[-2:], ["New", "Last"])
+
+        list_id = self._ops({"op": "list.create", "title": "Third"})["results"][0]["id"]
+        self.assertEqual(list(self.board.lists.order_by("position").values_list("id", flat=True))[-1], list_id)
+
+    def test_recount_boards_repairs_drift(self):
+        List.objects.filter(id=self.lists[0].id).update(cards_finished=7, next_card_position=0)
+        Board.objects.filter(id=self.board.id).update(cards_not_started=0)
+        out = io.StringIO()
+        call_command("recount_boards", stdout=out)
+        self.assertIn("repaired 1", out.getvalue())
+        self.assertEqual(self._counts(self.lists[0]), (3, 0, 0))
+        self.assertEqual(self.lists[0].next_card_position, nth_position(3))
+        self.assertEqual(self._counts(self.board), (6, 0, 0))
+
+        out = io.StringIO()
+        call_command("recount_boards", "--board-id", str(self.board.id), stdout=out)
+        self.assertIn("repaired 0", out.getvalue())
+
+    def test_home_shows_progress_without_a_query_per_board(self):
+        for _ in range(5):
+            make_board(self.user, lists=1, cards_per_list=2)
+        Board.objects.filter(id=self.board.id).update(cards_not_started=2, cards_finished=4)
+        with self.assertNumQueries(3):
+            res = self.client.get(reverse("board:home"))
+        self.assertContains(res, "4/6 finished")
+        self.assertContains(res, "0/2 finished", count=5)
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("owner", password="pw")
+        self.client.force_login(self.user)
+        self.url = reverse("board:dashboard")
+        self.boards = [make_board(self.user, lists=li + 1, cards_per_list=2) for li in range(5)]
+
+    @override_settings(BOARD_DASHBOARD_CACHE_TIMEOUT=0)
+    def test_pages_by_join_time_in_constant_queries(self):
+        seen, after = [], None
+        while True:
+            with self.assertNumQueries(4):
+                data = self.client.get(self.url, {"limit": 2, **({"after": after} if after else {})}).json()
+            seen += data["boards"]
+            after = data["next"]
+            if not after:
+                break
+        self.assertEqual([b["id"] for b in seen], [b.id for b in reversed(self.boards)])
+        newest = seen[0]
+        self.assertEqual((newest["role"], newest["lists"], newest["cards_total"]), ("admin", 5, 10))
+        self.assertEqual(newest["cards"], {"not_started": 10, "in_progress": 0, "finished": 0})
+        self.assertEqual(self.client.get(self.url, {"after": "nope"}).status_code, 400)
+
+    @override_settings(BOARD_DASHBOARD_CACHE_TIMEOUT=60)
+    def test_cached_per_user_until_memberships_change(self):
+        first = self.client.get(self.url).json()
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url).json(), first)
+
+        other = make_board(get_user_model().objects.create_user("other", password="pw"))
+        res = self.client.post(reverse("board:board_join"), {"join_code": other.join_code}, content_type="application/json")
+        self.assertEqual(res.status_code, 200)
+        data = self.client.get(self.url).json()
+        self.assertEqual((data["boards"][0]["id"], data["boards"][0]["role"]), (other.id, "spectator"))
+
+        self.client.post(reverse("board:board_create"), {"name": "Fresh"}, content_type="application/json")
+        self.assertEqual(self.client.get(self.url).json()["boards"][0]["name"], "Fresh")
+
+
+class AssignmentTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("student", password="pw")
+        self.client.force_login(self.user)
+        self.boards = [make_board(self.user, lists=1, cards_per_list=3) for _ in range(3)]
+        self.url = reverse("board:my_cards")
+
+    def _assign(self, card, user, assigned=True):
+        url = reverse("board:card_assign", args=[card.board_id, card.id])
+        return self.client.post(url, {"user_id": user.id, "assigned": assigned}, content_type="application/json")
+
+    def test_my_cards_spans_boards_newest_first_with_keyset_pages(self):
+        cards = list(Card.objects.filter(board__in=self.boards).order_by("id"))
+        for card in cards:
+            self.assertEqual(self._assign(card, self.user).status_code, 200)
+
+        seen, after = [], None
+        while True:
+            with self.assertNumQueries(3):
+                data = self.client.get(self.url, {"limit": 4, **({"after": after} if after else {})}).json()
+            seen += data["cards"]
+            after = data["next"]
+            if not after:
+                break
+        self.assertEqual([c["id"] for c in seen], [c.id for c in reversed(cards)])
+        self.assertEqual({c["board_id"] for c in seen}, {b.id for b in self.boards})
+        self.assertEqual(self.client.get(self.url, {"after": "x"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"tag": "nope"}).status_code, 400)
+
+    def test_tag_follows_card_updates_and_membership_bounds_assignment(self):
+        card = Card.objects.filter(board=self.boards[0]).first()
+        self._assign(card, self.user)
+        url = reverse("board:card_update", args=[card.board_id, card.id])
+        self.client.post(url, {"title": "Doing", "desc": "", "tag": "in_progress"}, content_type="application/json")
+        mine = self.client.get(self.url, {"tag": "in_progress"}).json()["cards"]
+        self.assertEqual([(c["id"], c["title"]) for c in mine], [(card.id, "Doing")])
+        self.assertEqual(self.client.get(self.url, {"tag": "not_started"}).json()["cards"], [])
+
+        stranger = get_user_model().objects.create_user("stranger", password="pw")
+        self.assertEqual(self._assign(card, stranger).content, b"member_not_found")
+
+        self._assign(card, self.user, assigned=False)
+        self.assertEqual(self.client.get(self.url).json()["cards"], [])
+        self._assign(card, self.user)
+        BoardMember.objects.filter(board=self.boards[0], user=self.user).delete()
+        self.assertFalse(CardAssignment.objects.filter(user=self.user).exists())
+
+
+class ActivityTests(BoardTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = get_user_model().objects.create_user("other", password="pw")
+        BoardMember.objects.create(board=self.board, user=self.other, role=BoardMember.ROLE_STUDENT)
+        self.url = reverse("board:board_activity", args=[self.board.id])
+
+    def test_batch_is_written_in_one_insert_on_commit(self):
+        card = Card.objects.filter(list=self.lists[0]).first()
+        with CaptureQueriesContext(connection) as ctx:
+            self._ops(
+                {"op": "card.update", "card": card.id, "title": "Edited", "desc": "", "tag": "finished"},
+                {"op": "card.move", "card": card.id, "list": self.lists[1].id, "index": 0},
+                {"op": "list.delete", "list": self.lists[0].id},
+                capture=True,
+            )
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "board_activityevent"')]
+        self.assertEqual(len(inserts), 1)
+
+        events = self.client.get(self.url).json()["events"]
+        self.assertEqual([e["verb"] for e in events], ["list.delete", "card.move", "card.update"])
+        self.assertEqual({e["actor_name"] for e in events}, {"owner"})
+        self.assertEqual(events[1]["data"], {"card": card.id, "list": self.lists[1].id, "from_list": self.lists[0].id, "index": 0})
+        self.assertEqual(events[2]["data"]["previous_tag"], "not_started")
+        self.assertEqual(events[0]["data"]["cards"], 1)
+
+    def test_failed_batch_and_disabled_log_write_nothing(self):
+        card = Card.objects.filter(list=self.lists[0]).first()
+        self._ops(
+            {"op": "card.move", "card": card.id, "list": self.lists[1].id, "index": 0},
+            {"op": "card.move", "card": 0, "list": self.lists[1].id, "index": 0},
+            expect=409,
+            capture=True,
+        )
+        with override_settings(BOARD_ACTIVITY_LOG=False):
+            self._ops({"op": "card.move", "card": card.id, "list": self.lists[1].id, "index": 0}, capture=True)
+        self.assertEqual(self.client.get(self.url).json()["events"], [])
+
+    def test_role_changes_are_logged_and_feed_pages_newest_first(self):
+        roles = [BoardMember.ROLE_MENTOR, BoardMember.ROLE_SPECTATOR, BoardMember.ROLE_STUDENT]
+        for role in roles:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    reverse("board:member_set_role", args=[self.board.id]),
+                    {"user_id": self.other.id, "role": role},
+                    content_type="application/json",
+                )
+
+        seen, before = [], None
+        while True:
+            data = self.client.get(self.url, {"limit": 2, **({"before": before} if before else {})}).json()
+            seen += data["events"]
+            before = data["next"]
+            if not before:
+                break
+        self.assertEqual([e["data"]["role"] for e in seen], roles[::-1])
+        self.assertEqual(seen[-1]["data"]["previous"], BoardMember.ROLE_STUDENT)
+        self.assertEqual(self.client.get(self.url, {"before": "x"}).status_code, 400)
+
+        self.client.force_login(get_user_model().objects.create_user("stranger", password="pw"))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_prune_removes_only_expired_events_in_batches(self):
+        card = Card.objects.filter(list=self.lists[0]).first()
+        for index in range(3):
+            self._ops({"op": "card.move", "card": card.id, "list": self.lists[index % 2].id, "index": 0}, capture=True)
+        expired = timezone.now() - timedelta(days=settings.BOARD_ACTIVITY_RETENTION_DAYS + 1)
+        self.board.activity.filter(id__in=self.board.activity.order_by("id").values("id")[:2]).update(created_at=expired)
+
+        out = io.StringIO()
+        call_command("prune_activity", "--dry-run", stdout=out)
+        self.assertIn("2 events", out.getvalue())
+        call_command("prune_activity", "--batch-size", "1", stdout=out)
+        self.assertIn("Deleted 2 activity events", out.getvalue())
+        self.assertEqual(self.board.activity.count(), 1)
+
+
+class FragmentCacheTests(BoardTestMixin, TestCase):
+    board_cards = 3
+
+    def setUp(self):
+        caches["template_fragments"].clear()
+        super().setUp()
+        self.url = reverse("board:board_view", args=[self.board.id])
+
+    def _card_renders(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        return res, [t.name for t in res.templates].count("board/_card.html")
+
+    def test_only_written_cards_are_rendered_again(self):
+        self.assertEqual(self._card_renders()[1], 6)
+        self.assertEqual(self._card_renders()[1], 0)
+
+        card = Card.objects.get(title="Card 1.1")
+        self._ops({"op": "card.update", "card": card.id, "title": "Fresh title", "desc": "", "tag": "finished"})
+        res, renders = self._card_renders()
+        self.assertEqual(renders, 1)
+        self.assertContains(res, "Fresh title")
+
+    def test_removed_cards_leave_the_cached_list(self):
+        self._card_renders()
+        card = Card.objects.get(title="Card 0.1")
+        self._ops({"op": "card.delete", "card": card.id})
+        res, renders = self._card_renders()
+        self.assertEqual(renders, 0)
+        self.assertNotContains(res, "Card 0.1")
+        self.assertContains(res, "Card 0.2")
+
+
+class SnapshotTests(BoardTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+        self.url = reverse("board:board_snapshot", args=[self.board.id])
+
+    def test_columnar_payload_in_board_order(self):
+        card = Card.objects.get(title="Card 1.0")
+        Card.objects.filter(id=card.id).update(tag=Card.TAG_FINISHED)
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["lists"], {"id": [l.id for l in self.lists], "title": ["List 0", "List 1"]})
+        self.assertEqual(data["cards"]["title"], ["Card 0.0", "Card 0.1", "Card 1.0", "Card 1.1"])
+        self.assertEqual(data["cards"]["list"], [self.lists[0].id] * 2 + [self.lists[1].id] * 2)
+        self.assertEqual([data["tags"][t] for t in data["cards"]["tag"]], ["not_started"] * 2 + ["finished", "not_started"])
+        self.assertEqual(data["cards"]["preview"], ["body"] * 4)
+        self.assertNotIn("desc", data["cards"])
+        self.assertNotIn("join_code", data["board"])
+
+    def test_payload_is_cached_per_version(self):
+        first = self.client.get(self.url).content
+        with self.assertNumQueries(3):  # session, user, board + role
+            self.assertEqual(self.client.get(self.url).content, first)
+
+        self._ops({"op": "list.rename", "list": self.lists[0].id, "title": "Renamed"})
+        self.assertEqual(self.client.get(self.url).json()["lists"]["title"], ["Renamed", "List 1"])
+
+    def test_content_negotiation_and_etag(self):
+        plain = self.client.get(self.url)
+        res = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip;q=0.8, identity")
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", res["Vary"])
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertNotEqual(res["ETag"], plain["ETag"])
+
+        self.assertNotIn("Content-Encoding", self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip;q=0"))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=plain["ETag"]).status_code, 304)
+
+
+class InProcessBrokerTests(TestCase):
+    def test_events_reach_subscribers_of_the_same_board(self):
+        broker = realtime.InProcessBroker()
+
+        async def scenario():
+            sub = broker.subscribe(1)
+            other = broker.subscribe(2)
+            publisher = threading.Thread(target=broker.publish, args=(1, {"type": "card.deleted", "card": 7}))
+            publisher.start()
+            publisher.join()
+            # publish() has handed the event to the loop; one pass delivers it.
+            await asyncio.sleep(0)
+            event = sub.queue.get_nowait()
+            missed = other.queue.empty()
+            await sub.close()
+            await other.close()
+            return event, missed
+
+        event, missed = asyncio.run(scenario())
+        self.assertEqual(event, {"type": "card.deleted", "card": 7})
+        self.assertTrue(missed)
+        self.assertEqual(broker._subscribers, {})
+
+
+class FakePubSub:
+    def __init__(self, server):
+        self.server = server
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.server.channels.setdefault(channel, []).append(self.queue)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        if not self.queue.empty():
+            return self.queue.get_nowait()
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        for queues in self.server.channels.values():
+            if self.queue in queues:
+                queues.remove(self.queue)
+
+
+class FakeRedis:
+    """Just enough of redis and redis.asyncio for RedisBroker: one in-memory server."""
+
+    def __init__(self):
+        self.channels = {}
+        self.published = []
+        self.Redis = self
+        self.asyncio = types.SimpleNamespace(from_url=self.from_url)
+
+    def from_url(self, url):
+        return self
+
+    def publish(self, channel, data):
+        self.published.append(channel)
+        for queue in self.channels.get(channel, ()):
+            queue.put_nowait({"type": "message", "channel": channel.encode(), "data": data.encode()})
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    async def aclose(self):
+        pass
+
+
+class RedisBrokerTests(SimpleTestCase):
+    def test_events_round_trip_through_per_board_channels(self):
+        server = FakeRedis()
+        with mock.patch.dict(sys.modules, {"redis": server, "redis.asyncio": server.asyncio}):
+            broker = realtime.RedisBroker(url="redis://fake:6379/0", prefix="lini")
+
+            async def scenario():
+                sub = broker.subscribe(1)
+                other = broker.subscribe(2)
+                # The first get subscribes; nothing has been published yet.
+                self.assertIsNone(await sub.get(timeout=0))
+                self.assertIsNone(await other.get(timeout=0))
+                broker.publish(1, {"type": "card.deleted", "card": 7})
+                event = await sub.get(timeout=0)
+                missed = await other.get(timeout=0)
+                await sub.close()
+                await other.close()
+                return event, missed
+
+            event, missed = asyncio.run(scenario())
+        self.assertEqual(event, {"type": "card.deleted", "card": 7})
+        self.assertIsNone(missed)
+        self.assertEqual(server.published, ["lini:1"])
+        self.assertEqual(server.channels, {"lini:1": [], "lini:2": []})
+
+    def test_missing_package_is_a_configuration_error(self):
+        with mock.patch.dict(sys.modules, {"redis": None}), self.assertRaises(ImproperlyConfigured):
+            realtime.RedisBroker()
+
+
+class BoardEventStreamTests(TransactionTestCase):
+    def test_stream_delivers_published_events(self):
+        user = get_user_model().objects.create_user("owner", password="pw")
+        board = make_board(user, lists=1, cards_per_list=0)
+        stranger = get_user_model().objects.create_user("stranger", password="pw")
+
+        async def scenario():
+            await self.async_client.aforce_login(stranger)
+            denied = await self.async_client.get(reverse("board:board_events", args=[board.id]))
+
+            await self.async_client.aforce_login(user)
+            res = await self.async_client.get(reverse("board:board_events", args=[board.id]))
+            stream = aiter(res.streaming_content)
+            first = await anext(stream)
+            realtime.get_broker().publish(board.id, {"type": "list.deleted", "list": 3})
+            second = await anext(stream)
+            await stream.aclose()
+            return denied.status_code, res["Content-Type"], first, second
+
+        status, content_type, first, second = asyncio.run(scenario())
+        self.assertEqual(status, 403)
+        self.assertEqual(content_type, "text/event-stream")
+        self.assertTrue(first.startswith(b"retry:"))
+        self.assertEqual(json.loads(second.decode()[len("data: "):]), {"type": "list.deleted", "list": 3})
+
+    def test_stream_refuses_wsgi(self):
+        user = get_user_model().objects.create_user("owner", password="pw")
+        board = make_board(user, lists=1, cards_per_list=0)
+        self.client.force_login(user)
+        res = self.client.get(reverse("board:board_events", args=[board.id]))
+        self.assertEqual((res.status_code, res.content), (501, b"asgi_required"))
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("owner", password="pw")
+        self.client.force_login(self.user)
+        self.board = make_board(self.user, lists=2, cards_per_list=2)
+        Card.objects.filter(board=self.board, title="Card 0.0").update(tag=Card.TAG_FINISHED)
+        self.url = reverse("board:export_json", args=[self.board.id])
+
+    def _streamed(self, **params):
+        headers = params.pop("headers", {})
+        res = self.client.get(self.url, params, headers=headers)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.streaming)
+        return res, b"".join(res.streaming_content)
+
+    def test_export_includes_card_tag(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(len(data["cards"]), 4)
+        self.assertEqual(data["cards"][0]["tag"], Card.TAG_FINISHED)
+
+    def test_streamed_json_matches_document(self):
+        document = self.client.get(self.url).json()
+        _, body = self._streamed(stream=1)
+        self.assertEqual(json.loads(body), document)
+
+    def test_ndjson_and_gzip(self):
+        res, body = self._streamed(format="ndjson", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in gzip.decompress(body).decode().splitlines()]
+        self.assertEqual([r["type"] for r in rows], ["board", "member", "list", "list", "card", "card", "card", "card"])
+        self.assertEqual(self.client.get(self.url, {"format": "xml"}).status_code, 400)
+
+    async def test_asgi_stream_is_async(self):
+        await self.async_client.aforce_login(self.user)
+        document = (await self.async_client.get(self.url)).json()
+        res = await self.async_client.get(self.url, {"stream": 1})
+        self.assertTrue(res.is_async)
+        self.assertEqual(json.loads(b"".join([chunk async for chunk in res])), document)
+
+    @tag("slow")
+    async def test_asgi_streaming_starts_early_with_bounded_memory_on_100k_cards(self):
+        lst = await self.board.lists.afirst()
+        await Card.objects.abulk_create(
+            (Card(board=self.board, list=lst, title=f"Bulk {i}", desc="x" * 200, position=nth_position(i)) for i in range(100_000)),
+            batch_size=5000,
+        )
+        await self.async_client.aforce_login(self.user)
+        res = await self.async_client.get(self.url, {"format": "ndjson"})
+        self.assertTrue(res.is_async)
+        chunks = aiter(res)
+        with mock.patch("board.exporting.card_data", wraps=exporting.card_data) as rendered:
+            total = len(await anext(chunks))
+        # The first chunk goes out after a buffer's worth of rows, not the whole board.
+        self.assertLess(rendered.call_count, 1000)
+        tracemalloc.start()
+        try:
+            async for chunk in chunks:
+                total += len(chunk)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(total, 100_000 * 200)
+        self.assertLess(peak, 16 * 1024 * 1024)
+
+
+class SeedTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("owner", password="pw")
+        self.client.force_login(self.user)
+
+    def _create(self, **body):
+        return self.client.post(reverse("board:board_create"), {"name": "Fresh", **body}, content_type="application/json")
+
+    def test_board_create_seeds_the_starter_template_in_fixed_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self._create()
+        b = Board.objects.get(id=res.json()["board_id"])
+        inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 4)
+        self.assertEqual(list(b.lists.order_by("position").values_list("title", flat=True)), ["To do", "Doing", "Done"])
+        self.assertEqual(Card.objects.filter(board=b).count(), 4)
+        self.assertEqual(b.members.get().role, BoardMember.ROLE_ADMIN)
+
+    def test_templates_are_selectable_and_validated(self):
+        b = Board.objects.get(id=self._create(template="maiphuonglinh").json()["board_id"])
+        self.assertEqual(b.name, "Fresh")
+        self.assertEqual(b.lists.count(), 3)
+        self.assertEqual(Card.objects.filter(board=b).count(), 10)
+        self.assertEqual(self._create(template="nope").content, b"bad_template")
+
+    def test_join_code_collision_retries(self):
+        taken = Board.objects.get(id=self._create().json()["board_id"]).join_code
+        with mock.patch.object(Board, "generate_join_code", side_effect=[taken, taken, "fresh-code"]):
+            res = self._create()
+        self.assertEqual(Board.objects.get(id=res.json()["board_id"]).join_code, "fresh-code")
+
+    def test_reset_uses_a_template(self):
+        b = Board.objects.get(id=self._create().json()["board_id"])
+        url = reverse("board:reset_board", args=[b.id])
+        self.client.post(url, {}, content_type="application/json")
+        self.assertEqual(Card.objects.filter(board=b).count(), 0)
+        self.assertEqual(b.lists.count(), 3)
+        self.client.post(url, {"template": "starter"}, content_type="application/json")
+        self.assertEqual(Card.objects.filter(board=b).count(), 4)
+        self.assertEqual(self.client.post(url, {"template": "nope"}, content_type="application/json").status_code, 400)
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("owner", password="pw")
+        self.client.force_login(self.user)
+        self.board = make_board(self.user, lists=3, cards_per_list=3)
+        Card.objects.filter(board=self.board, title="Card 2.1").update(tag=Card.TAG_IN_PROGRESS, desc="multi\nline")
+
+    def _export(self, board, **params):
+        res = self.client.get(reverse("board:export_json", args=[board.id]), params)
+        return b"".join(res.streaming_content) if res.streaming else res.content
+
+    def _shape(self, raw):
+        doc = json.loads(raw)
+        titles = {l["id"]: l["title"] for l in doc["lists"]}
+        return (
+            [l["title"] for l in doc["lists"]],
+            [(titles[c["list_id"]], c["title"], c["desc"], c["tag"], c["position"]) for c in doc["cards"]],
+        )
+
+    def test_round_trip_export_import_export(self):
+        original = self._export(self.board)
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(reverse("board:import_json"), original, content_type="application/json")
+        self.assertEqual(res.status_code, 200)
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 4)
+
+        clone = Board.objects.get(id=res.json()["board_id"])
+        self.assertEqual(clone.name, self.board.name)
+        self.assertNotEqual(clone.join_code, self.board.join_code)
+        self.assertEqual(self._shape(self._export(clone)), self._shape(original))
+
+    def test_ndjson_import_via_command(self):
+        raw = self._export(self.board, format="ndjson")
+        with tempfile.NamedTemporaryFile(suffix=".ndjson") as fh:
+            fh.write(raw)
+            fh.flush()
+            call_command("import_board", fh.name, user_id=self.user.id, name="Restored", stdout=io.StringIO())
+        clone = Board.objects.get(name="Restored")
+        self.assertEqual(self._shape(self._export(clone)), self._shape(self._export(self.board)))
+
+    def test_rejects_cards_for_unknown_lists(self):
+        doc = {"board": {"name": "x"}, "lists": [], "cards": [{"list_id": 5, "title": "orphan"}]}
+        res = self.client.post(reverse("board:import_json"), doc, content_type="application/json")
+        self.assertEqual((res.status_code, res.content), (400, b"unknown_list"))
+        self.assertFalse(Board.objects.filter(name="x").exists())
+
+    def test_rejects_non_integer_ids_and_positions(self):
+        lists = [{"id": 1, "title": "a", "position": 1}]
+        for bad in (
+            {"lists": [*lists, {"id": 2, "title": "b", "position": "a"}], "cards": []},
+            {"lists": [*lists, {"id": [1], "title": "b"}], "cards": []},
+            {"lists": lists, "cards": [{"list_id": {"x": 1}, "title": "c"}]},
+            {"lists": lists, "cards": [{"list_id": 1, "title": "c", "position": 1.5}, {"list_id": 1, "id": "z"}]},
+        ):
+            res = self.client.post(reverse("board:import_json"), {"board": {"name": "x"}, **bad}, content_type="application/json")
+            self.assertEqual((res.status_code, res.content), (400, b"bad_document"))
+        self.assertFalse(Board.objects.filter(name="x").exists())
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("owner", password="pw")
+        self.client.force_login(self.user)
+        self.board = make_board(self.user, lists=1, cards_per_list=0)
+        self.lst = self.board.lists.get()
+
+    def _card(self, title, desc=""):
+        return Card.objects.create(board=self.board, list=self.lst, title=title, desc=desc)
+
+    def _search(self, q):
+        res = self.client.get(reverse("board:card_search", args=[self.board.id]), {"q": q})
+        self.assertEqual(res.status_code, 200)
+        return [r["title"] for r in res.json()["results"]]
+
+    def test_ranked_prefix_search_scoped_to_board(self):
+        self._card("Budget review", "budget budget budget spreadsheet")
+        self._card("Reading list", "one budget note")
+        self._card("Unrelated")
+        other = make_board(self.user, lists=1, cards_per_list=0)
+        Card.objects.create(board=other, list=other.lists.get(), title="Budget elsewhere")
+
+        self.assertEqual(self._search("budg"), ["Budget review", "Reading list"])
+        self.assertEqual(self._search("budget spread"), ["Budget review"])
+        self.assertEqual(self._search("  "), [])
+        self.assertEqual(self._search('"*) OR (x'), [])
+
+    def test_index_follows_updates_bulk_writes_and_deletes(self):
+        card = self._card("Alpha")
+        Card.objects.filter(id=card.id).update(title="Gamma")
+        Card.objects.bulk_create([Card(board=self.board, list=self.lst, title="Gamma bulk")])
+        self.assertEqual(self._search("alpha"), [])
+        self.assertEqual(sorted(self._search("gamma")), ["Gamma", "Gamma bulk"])
+
+        self.lst.delete()
+        self.assertEqual(self._search("gamma"), [])
+
+    def test_install_restores_dropped_triggers(self):
+        card = self._card("Delta")
+        search.uninstall(connection)
+        self.assertTrue(search.install(connection))
+        self.assertFalse(search.install(connection))
+        self.assertEqual(self._search("delta"), ["Delta"])
+        Card.objects.filter(id=card.id).update(title="Epsilon")
+        self.assertEqual(self._search("epsilon"), ["Epsilon"])
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = io.StringIO()
+        call_command("check_query_plans", stdout=out)
+        self.assertNotIn("FAIL", out.getvalue())
+
+
+METRICS_MIDDLEWARE = [*settings.MIDDLEWARE[:1], "board.instrumentation.RequestMetricsMiddleware", *settings.MIDDLEWARE[1:]]
+
+
+@override_settings(MIDDLEWARE=METRICS_MIDDLEWARE, BOARD_METRICS_TOKEN="s3cret")
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("owner", password="pw")
+        self.client.force_login(self.user)
+        self.board = make_board(self.user)
+
+    def test_server_timing_log_line_and_metrics_endpoint(self):
+        with self.assertLogs("board.metrics", "INFO") as logs:
+            res = self.client.get(reverse("board:board_view", args=[self.board.id]))
+        self.assertRegex(res["Server-Timing"], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"$')
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((line["view"], line["status"]), ("board:board_view", 200))
+        self.assertGreater(line["queries"], 0)
+
+        metrics_url = reverse("board:metrics")
+        self.assertEqual(self.client.get(metrics_url).status_code, 403)
+        body = self.client.get(metrics_url, HTTP_AUTHORIZATION="Bearer s3cret").content.decode()
+        self.assertIn('lini_requests_total{view="board:board_view",method="GET",status="200"}', body)
+        self.assertIn('lini_request_queries_bucket{view="board:board_view",method="GET",le="+Inf"}', body)
+
+    async def test_queries_in_async_views_are_attributed(self):
+        card = await Card.objects.filter(board_id=self.board.id).afirst()
+        await self.async_client.aforce_login(self.user)
+        res = await self.async_client.post(
+            reverse("board:card_update", args=[self.board.id, card.id]),
+            {"title": "T", "desc": "", "tag": "in_progress"},
+            content_type="application/json",
+        )
+        self.assertRegex(res["Server-Timing"], r'desc="([1-9]\d*) queries"')
+
+    def test_repeated_statements_are_logged_as_n_plus_one(self):
+        def view(request):
+            for card in Card.objects.filter(board=self.board):
+                List.objects.get(id=card.list_id)
+            return HttpResponse()
+
+        middleware = RequestMetricsMiddleware(view)
+        with self.assertLogs("board.metrics", "WARNING") as logs:
+            middleware(RequestFactory().get("/"))
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(line["repeated_times"], 6)
+        self.assertEqual(line["duplicate_queries"], 5)
+        self.assertIn('FROM "board_list"', line["repeated_sql"])
+
+
+class BenchCommandTests(TestCase):
+    def test_bench_reports_every_workload_and_flags_regressions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "base.json")
+            call_command("bench", "--lists", "2", "--cards", "6", "--members", "2", "--repeat", "3",
+                         "--output", baseline, stdout=io.StringIO())
+            with open(baseline) as fh:
+                report = json.load(fh)
+            self.assertEqual([r["workload"] for r in report["results"]],
+                             ["board_view", "card_move", "list_reorder", "card_update", "export_json", "search"])
+            self.assertTrue(all(r["queries"] > 0 and r["p99_ms"] >= r["p50_ms"] for r in report["results"]))
+
+            # Flagged whatever the rerun's own timings and cache state: every workload issues queries.
+            for row in report["results"]:
+                row["p50_ms"] /= 10
+                row["queries"] = 0
+            with open(baseline, "w") as fh:
+                json.dump(report, fh)
+            with self.assertRaisesMessage(CommandError, "search queries"):
+                call_command("bench", "--lists", "2", "--cards", "6", "--members", "2", "--repeat", "3",
+                             "--workloads", "search", "--baseline", baseline, stdout=io.StringIO())
+
+
+class SQLiteConcurrencyTests(SimpleTestCase):
+    """Django connections on a scratch SQLite file, configured by board.db as usual."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self._create("stress")
+
+    def _create(self, name):
+        self.path = os.path.join(self.tmp, f"{name}.sqlite3")
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("CREATE TABLE counter (value INTEGER)")
+            conn.execute("INSERT INTO counter VALUES (0)")
+
+    @contextmanager
+    def _connection(self, alias, options):
+        # Set on this thread only and never registered in DATABASES, so the test
+        # runner leaves it alone; transaction.atomic(using=alias) still finds it.
+        sqlite = {"ENGINE": "django.db.backends.sqlite3", "NAME": self.path, "OPTIONS": options}
+        configured = connections.configure_settings({"default": settings.DATABASES["default"], alias: sqlite})[alias]
+        setattr(connections._connections, alias, load_backend(sqlite["ENGINE"]).DatabaseWrapper(configured, alias))
+        try:
+            yield connections[alias]
+        finally:
+            connections[alias].close()
+            delattr(connections._connections, alias)
+
+    def _increment(self, alias):
+        with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+            cursor.execute("SELECT value FROM counter")
+            (value,) = cursor.fetchone()
+            cursor.execute("UPDATE counter SET value = %s", [value + 1])
+
+    def _value(self):
+        with sqlite3.connect(self.path) as conn:
+            return conn.execute("SELECT value FROM counter").fetchone()[0]
+
+    def _in_thread(self, alias, options, fn):
+        errors = []
+
+        def run():
+            try:
+                with self._connection(alias, options):
+                    fn()
+            except OperationalError as exc:
+                errors.append(str(exc))
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread, errors
+
+    def test_configured_writers_queue_instead_of_failing(self):
+        # The shipped OPTIONS (IMMEDIATE transactions, busy timeout) and PRAGMAs, in
+        # both journal modes: BEGIN takes the write lock, so no lock upgrade can fail.
+        # A fresh file per mode: leaving WAL needs the file to itself.
+        options = settings.DATABASES["default"]["OPTIONS"]
+        for journal_mode in ("wal", "delete"):
+            self._create(journal_mode)
+            pragmas = {**settings.SQLITE_PRAGMAS, "journal_mode": journal_mode}
+            with self.subTest(journal_mode=journal_mode), override_settings(SQLITE_PRAGMAS=pragmas):
+                workers = [
+                    self._in_thread("stress", options, lambda: [self._increment("stress") for _ in range(40)])
+                    for _ in range(8)
+                ]
+                for thread, _ in workers:
+                    thread.join()
+                self.assertEqual([e for _, errors in workers for e in errors], [])
+                self.assertEqual(self._value(), 8 * 40)
+
+    def test_deferred_rollback_journal_setup_fails_on_lock_upgrade(self):
+        # Django's defaults before the tuning: deferred BEGIN, no PRAGMAs. Two
+        # transactions that both read, then both write: the second upgrade is
+        # refused at once, busy timeout or not, as SQLite would otherwise deadlock.
+        with override_settings(SQLITE_PRAGMAS={}), self._connection("first", {}), self._connection("second", {}):
+            with transaction.atomic(using="first"), connections["first"].cursor() as first:
+                first.execute("SELECT value FROM counter")
+                with transaction.atomic(using="second"), connections["second"].cursor() as second:
+                    second.execute("SELECT value FROM counter")
+                    first.execute("UPDATE counter SET value = value + 1")
+                    with self.assertRaisesMessage(OperationalError, "database is locked"):
+                        second.execute("UPDATE counter SET value = value + 1")
+                    transaction.set_rollback(True, using="second")
+        self.assertEqual(self._value(), 1)
+
+        # The same interleaving with the shipped settings: the second BEGIN waits
+        # for the first transaction to commit instead.
+        options = settings.DATABASES["default"]["OPTIONS"]
+        with self._connection("first", options):
+            with transaction.atomic(using="first"), connections["first"].cursor() as first:
+                first.execute("SELECT value FROM counter")
+                waiter, errors = self._in_thread("second", options, lambda: self._increment("second"))
+                first.execute("UPDATE counter SET value = value + 1")
+            waiter.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self._value(), 3)
@@ -9,24 +9,41 @@ urlpatterns = [
     path("register/", views.register_view, name="register"),
     path("login/", views.login_view, name="login"),
     path("logout/", views.logout_view, name="logout"),
+    path("metrics/", views.metrics, name="metrics"),
 
     path("boards/<int:board_id>/", views.board_view, name="board_view"),
     path("boards/<int:board_id>/members/", views.members_view, name="members_view"),
+    path("boards/<int:board_id>/events/", views.board_events, name="board_events"),
 
+    path("api/dashboard/", views.dashboard_api, name="dashboard"),
+    path("api/my-cards/", views.my_cards, name="my_cards"),
     path("api/boards/create/", views.board_create, name="board_create"),
     path("api/boards/join/", views.board_join, name="board_join"),
+    path("api/boards/import/", views.import_json, name="import_json"),
     path("api/boards/<int:board_id>/role/", views.member_set_role, name="member_set_role"),
 
     path("api/boards/<int:board_id>/export/", views.export_json, name="export_json"),
+    path("api/boards/<int:board_id>/search/", views.card_search, name="card_search"),
+    path("api/boards/<int:board_id>/changes/", views.board_changes, name="board_changes"),
+    path("api/boards/<int:board_id>/snapshot/", views.board_snapshot, name="board_snapshot"),
     path("api/boards/<int:board_id>/reset/", views.reset_board, name="reset_board"),
+    path("api/boards/<int:board_id>/ops/", views.board_ops, name="board_ops"),
 
     path("api/boards/<int:board_id>/list/create/", views.list_create, name="list_create"),
     path("api/boards/<int:board_id>/list/<int:list_id>/rename/", views.list_rename, name="list_rename"),
     path("api/boards/<int:board_id>/list/<int:list_id>/delete/", views.list_delete, name="list_delete"),
     path("api/boards/<int:board_id>/list/reorder/", views.list_reorder, name="list_reorder"),
+    path("api/boards/<int:board_id>/list/<int:list_id>/cards/", views.list_cards, name="list_cards"),
 
     path("api/boards/<int:board_id>/card/create/", views.card_create, name="card_create"),
+    path("api/boards/<int:board_id>/card/<int:card_id>/", views.card_detail, name="card_detail"),
     path("api/boards/<int:board_id>/card/<int:card_id>/update/", views.card_update, name="card_update"),
     path("api/boards/<int:board_id>/card/<int:card_id>/delete/", views.card_delete, name="card_delete"),
     path("api/boards/<int:board_id>/card/move/", views.card_move, name="card_move"),
+    path("api/boards/<int:board_id>/card/<int:card_id>/archive/", views.card_archive, name="card_archive"),
+    path("api/boards/<int:board_id>/card/<int:card_id>/assign/", views.card_assign, name="card_assign"),
+
+    path("api/boards/<int:board_id>/activity/", views.board_activity, name="board_activity"),
+    path("api/boards/<int:board_id>/archive/", views.archived_cards, name="archived_cards"),
+    path("api/boards/<int:board_id>/archive/<int:archived_id>/restore/", views.archive_restore, name="archive_restore"),
 ]
@@ -1,24 +1,54 @@
+import hashlib
 import json
+import re
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.db import models, transaction
-from django.http import JsonResponse, HttpResponseBadRequest, HttpResponseForbidden
-from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.http import require_http_methods
-
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponse, JsonResponse, HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.utils.crypto import constant_time_compare
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition, require_http_methods
+
+from . import activity, dashboard, exporting, instrumentation, operations, pagination, realtime, search, seeds, snapshots
+from .importing import InvalidImport, import_board, parse_document
 from .forms import RegisterForm, CreateBoardForm, JoinBoardForm
-from .models import Board, BoardMember, List, Card
+from .models import ActivityEvent, Board, BoardMember, List, Card, CardAssignment, ArchivedCard
 from .permissions import (
-    require_member,
+    aboard_permission,
+    aload_board_and_role,
+    board_permission,
+    load_board_and_role,
     can_manage_roles,
     can_manage_lists,
     can_manage_cards,
     can_read,
 )
 
-def _forbidden(msg="forbidden"):
-    return HttpResponseForbidden(msg)
+_accepts_gzip = re.compile(r"\bgzip\b")
+
+def _etag(*parts):
+    return hashlib.sha1(":".join(str(p) for p in parts).encode()).hexdigest()[:24]
+
+def _versioned_etag(*extra, weak=False):
+    """ETag function for board GET views: the board version plus whatever else shapes the body."""
+    def etag_func(request, board_id, *args, **kwargs):
+        b, role = load_board_and_role(request, board_id)
+        if not role:
+            return None
+        tag = '"%s"' % _etag(b.id, b.version, role, *(part(request) for part in extra))
+        return "W/" + tag if weak else tag
+    return etag_func
+
+def _csrf_secret(request):
+    get_token(request)  # create the secret now, as rendering the page would
+    return request.META["CSRF_COOKIE"]
 
 def register_view(request):
     if request.user.is_authenticated:
@@ -69,6 +99,16 @@ def home(request):
         },
     )
 
+@login_required
+@require_http_methods(["GET"])
+def dashboard_api(request):
+    try:
+        limit = max(1, min(int(request.GET.get("limit") or dashboard.DASHBOARD_PAGE_SIZE), pagination.MAX_PAGE_SIZE))
+        page = dashboard.dashboard_page(request.user, request.GET.get("after") or None, limit)
+    except ValueError:
+        return HttpResponseBadRequest("bad_cursor")
+    return JsonResponse({"ok": True, **page})
+
 @login_required
 @require_http_methods(["POST"])
 def board_create(request):
@@ -78,23 +118,29 @@ def board_create(request):
         return HttpResponseBadRequest("bad_form")
 
     name = form.cleaned_data["name"].strip() or "Untitled board"
+    try:
+        template = seeds.get_template(body.get("template") or "starter")
+    except seeds.UnknownTemplate:
+        return HttpResponseBadRequest("bad_template")
 
-    join_code = Board.generate_join_code()
-    while Board.objects.filter(join_code=join_code).exists():
-        join_code = Board.generate_join_code()
-
-    with transaction.atomic():
-        b = Board.objects.create(name=name, created_by=request.user, join_code=join_code)
-        BoardMember.objects.create(board=b, user=request.user, role=BoardMember.ROLE_ADMIN)
-
-        List.objects.create(board=b, title="To do", position=0)
-        List.objects.create(board=b, title="Doing", position=1)
-        List.objects.create(board=b, title="Done", position=2)
+    b = seeds.create_board(request.user, template, name=name)
+    return JsonResponse({"ok": True, "board_id": b.id})
 
-        Card.objects.create(board=b, list=b.lists.get(position=0), position=0, title="Set up your board", desc="Create lists and add cards.")
-        Card.objects.create(board=b, list=b.lists.get(position=0), position=1, title="Drag cards", desc="Reorder within a list or move across lists.")
-        Card.objects.create(board=b, list=b.lists.get(position=1), position=0, title="Click a card to edit", desc="Edit title and description in a modal.")
-        Card.objects.create(board=b, list=b.lists.get(position=2), position=0, title="Persist to database", desc="Reload the page and your board stays.")
+@login_required
+@require_http_methods(["POST"])
+def import_json(request):
+    try:
+        doc = parse_document(request.body or b"{}")
+        b = import_board(
+            doc,
+            request.user,
+            name=request.GET.get("name"),
+            with_members=bool(request.GET.get("members")),
+        )
+    except UnicodeDecodeError:
+        return HttpResponseBadRequest("bad_encoding")
+    except InvalidImport as exc:
+        return HttpResponseBadRequest(str(exc))
 
     return JsonResponse({"ok": True, "board_id": b.id})
 
@@ -111,34 +157,50 @@ def board_join(request):
     if not b:
         return HttpResponseBadRequest("invalid_code")
 
-    BoardMember.objects.get_or_create(
-        board=b,
-        user=request.user,
-        defaults={"role": BoardMember.ROLE_SPECTATOR},
-    )
+    with transaction.atomic():
+        _, created = BoardMember.objects.get_or_create(
+            board=b,
+            user=request.user,
+            defaults={"role": BoardMember.ROLE_SPECTATOR},
+        )
+        if created:
+            operations.bump_version(b)
 
     return JsonResponse({"ok": True, "board_id": b.id})
 
-@login_required
-def board_view(request, board_id: int):
-    b = get_object_or_404(Board, id=board_id)
-    try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
+def _load_lists_with_cards(board, q="", limit=None):
+    limit = limit or settings.BOARD_LIST_PAGE_SIZE
+    lists = list(List.objects.filter(board=board).order_by("position", "id"))
 
-    if not can_read(role):
-        return _forbidden()
-
-    q = (request.GET.get("q") or "").strip()
+    # Cards show desc_preview; the full description loads with card_detail.
+    cards = Card.objects.filter(board=board).defer("desc")
+    if q:
+        cards = search.filter_cards(cards, q)
 
-    lists = list(List.objects.filter(board=b).order_by("position", "id"))
+    by_list = {lst.id: [] for lst in lists}
+    for c in pagination.first_pages(cards, limit):
+        by_list.setdefault(c.list_id, []).append(c)
 
     for lst in lists:
-        qs = Card.objects.filter(board=b, list=lst).order_by("position", "id")
-        if q:
-            qs = qs.filter(models.Q(title__icontains=q) | models.Q(desc__icontains=q))
-        lst.cards_for_view = list(qs)
+        page = sorted(by_list[lst.id], key=pagination.card_sort_key)
+        lst.cards_for_view, lst.next_cursor = pagination.split_page(page, limit)
+        # Changes whenever a card on the first page is written, added, removed or replaced.
+        lst.page_key = _etag(*(f"{c.id}.{c.version}" for c in lst.cards_for_view), lst.next_cursor)
+    return lists
+
+@login_required
+@condition(etag_func=_versioned_etag(
+    # The page also embeds the viewer and their CSRF token.
+    lambda r: r.user.pk,
+    lambda r: (r.GET.get("q") or "").strip(),
+    _csrf_secret,
+    weak=True,
+))
+@board_permission(can_read)
+def board_view(request, b, role):
+    q = (request.GET.get("q") or "").strip()
+
+    lists = _load_lists_with_cards(b, q)
 
     return render(
         request,
@@ -148,18 +210,72 @@ def board_view(request, board_id: int):
             "role": role,
             "lists": lists,
             "q": q,
+            "fragment_timeout": settings.BOARD_FRAGMENT_CACHE_TIMEOUT,
         },
     )
 
 
 @login_required
-def members_view(request, board_id: int):
-    b = get_object_or_404(Board, id=board_id)
+@require_http_methods(["GET"])
+@board_permission(can_read)
+def list_cards(request, b, role, list_id: int):
+    q = (request.GET.get("q") or "").strip()
+    try:
+        limit = max(1, min(int(request.GET.get("limit") or settings.BOARD_LIST_PAGE_SIZE), pagination.MAX_PAGE_SIZE))
+    except ValueError:
+        return HttpResponseBadRequest("bad_limit")
+
+    if not List.objects.filter(board=b, id=list_id).exists():
+        return HttpResponseBadRequest("list_not_found")
+
+    cards = Card.objects.filter(board=b, list_id=list_id).defer("desc")
+    if q:
+        cards = search.filter_cards(cards, q)
+    if request.GET.get("after"):
+        try:
+            cards = pagination.after_cursor(cards, request.GET["after"])
+        except pagination.InvalidCursor:
+            return HttpResponseBadRequest("bad_cursor")
+
+    page, next_cursor = pagination.split_page(list(cards.order_by(*pagination.CARD_ORDER)[:limit + 1]), limit)
+    html = render_to_string(
+        "board/_cards.html",
+        {"cards": page, "fragment_timeout": settings.BOARD_FRAGMENT_CACHE_TIMEOUT},
+        request=request,
+    )
+    return JsonResponse({"ok": True, "html": html, "next": next_cursor})
+
+@login_required
+@require_http_methods(["GET"])
+@aboard_permission(can_read)
+async def card_detail(request, b, role, card_id: int):
+    card = await (
+        Card.objects.filter(board=b, id=card_id).values("id", "list_id", "title", "desc", "tag", "version").afirst()
+    )
+    if card is None:
+        return HttpResponseBadRequest("card_not_found")
+    return JsonResponse({"ok": True, "card": card})
+
+@login_required
+@require_http_methods(["GET"])
+@board_permission(can_read)
+def card_search(request, b, role):
+    q = (request.GET.get("q") or "").strip()
     try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
+        limit = max(1, min(int(request.GET.get("limit") or search.SEARCH_LIMIT), search.SEARCH_LIMIT))
+    except ValueError:
+        return HttpResponseBadRequest("bad_limit")
+
+    results = search.search_board(b, q, limit=limit)
+    return JsonResponse({
+        "ok": True,
+        "q": q,
+        "results": [{"id": c.id, "list_id": c.list_id, "title": c.title, "tag": c.tag} for c in results],
+    })
 
+@login_required
+@board_permission()
+def members_view(request, b, role):
     members = BoardMember.objects.select_related("user").filter(board=b).order_by("role", "user__username")
     return render(
         request,
@@ -173,16 +289,8 @@ def members_view(request, board_id: int):
 
 @login_required
 @require_http_methods(["POST"])
-def member_set_role(request, board_id: int):
-    b = get_object_or_404(Board, id=board_id)
-    try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
-
-    if not can_manage_roles(role):
-        return _forbidden("not_admin")
-
+@board_permission(can_manage_roles, "not_admin")
+def member_set_role(request, b, role):
     body = json.loads(request.body or "{}")
     user_id = body.get("user_id")
     new_role = body.get("role")
@@ -198,279 +306,347 @@ def member_set_role(request, board_id: int):
     if m.user_id == b.created_by_id:
         return HttpResponseBadRequest("cannot_change_creator_role")
 
-    m.role = new_role
-    m.save(update_fields=["role"])
+    with transaction.atomic(), activity.collect(b, request.user):
+        previous = m.role
+        m.role = new_role
+        m.save(update_fields=["role"])
+        operations.bump_version(b)
+        activity.record("member.role", user=m.user_id, role=new_role, previous=previous)
     return JsonResponse({"ok": True})
 
 @login_required
 @require_http_methods(["GET"])
-def export_json(request, board_id: int):
-    b = get_object_or_404(Board, id=board_id)
-    try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
-
-    if not can_read(role):
-        return _forbidden()
-
-    lists = list(List.objects.filter(board=b).order_by("position", "id"))
-    cards = list(Card.objects.filter(board=b).order_by("list_id", "position", "id"))
-    members = list(BoardMember.objects.select_related("user").filter(board=b).order_by("role", "user__username"))
-
-    data = {
-        "board": {"id": b.id, "name": b.name, "join_code": b.join_code},
-        "members": [{"username": m.user.username, "role": m.role} for m in members],
-        "lists": [{"id": l.id, "title": l.title, "position": l.position} for l in lists],
-        "cards": [
-            {
-                "id": c.id,
-                "list_id": c.list_id,
-                "title": c.title,
-                "desc": c.desc,
-                "position": c.position,
-                "created_at": c.created_at.isoformat(),
-            }
-            for c in cards
-        ],
-    }
-    return JsonResponse(data, json_dumps_params={"indent": 2})
-
-@login_required
-@require_http_methods(["POST"])
-def reset_board(request, board_id: int):
-    b = get_object_or_404(Board, id=board_id)
-    try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
+@condition(etag_func=_versioned_etag(
+    lambda r: r.GET.urlencode(),
+    lambda r: bool(_accepts_gzip.search(r.headers.get("Accept-Encoding", ""))),
+))
+@board_permission(can_read)
+def export_json(request, b, role):
+    fmt = request.GET.get("format", "json")
+    if fmt not in ("json", "ndjson"):
+        return HttpResponseBadRequest("bad_format")
+
+    if fmt == "json" and not request.GET.get("stream"):
+        indent = None if request.GET.get("compact") else 2
+        return JsonResponse(exporting.export_document(b), json_dumps_params={"indent": indent})
+
+    if fmt == "ndjson":
+        chunks, content_type = exporting.iter_ndjson(b), "application/x-ndjson"
+    else:
+        chunks, content_type = exporting.iter_json(b), "application/json"
+    body = exporting.buffered(chunks)
 
-    if role != BoardMember.ROLE_ADMIN:
-        return _forbidden("not_admin")
+    gzip = bool(_accepts_gzip.search(request.headers.get("Accept-Encoding", "")))
+    if gzip:
+        body = exporting.gzipped(body)
+    if isinstance(request, ASGIRequest):
+        body = exporting.aiterate(body)
 
-    with transaction.atomic():
-        Card.objects.filter(board=b).delete()
-        List.objects.filter(board=b).delete()
+    response = StreamingHttpResponse(body, content_type=content_type)
+    if gzip:
+        response["Content-Encoding"] = "gzip"
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
 
-        List.objects.create(board=b, title="To do", position=0)
-        List.objects.create(board=b, title="Doing", position=1)
-        List.objects.create(board=b, title="Done", position=2)
+def _snapshot_encoding(request):
+    return snapshots.negotiate_encoding(request.headers.get("Accept-Encoding", ""))
 
-    return JsonResponse({"ok": True})
+@login_required
+@require_http_methods(["GET"])
+@condition(etag_func=_versioned_etag(_snapshot_encoding))
+@board_permission(can_read)
+def board_snapshot(request, b, role):
+    encoding = _snapshot_encoding(request)
+    response = HttpResponse(snapshots.snapshot_bytes(b, encoding), content_type="application/json")
+    if encoding != "identity":
+        response["Content-Encoding"] = encoding
+    # Always revalidate; an unchanged board answers 304 from the ETag alone.
+    response["Cache-Control"] = "private, no-cache"
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
 
 @login_required
-@require_http_methods(["POST"])
-def list_create(request, board_id: int):
-    b = get_object_or_404(Board, id=board_id)
+@require_http_methods(["GET"])
+@condition(etag_func=_versioned_etag(lambda r: r.GET.get("since", "")))
+@board_permission(can_read)
+def board_changes(request, b, role):
     try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
+        since = int(request.GET.get("since") or 0)
+    except ValueError:
+        return HttpResponseBadRequest("bad_since")
+    if since < 0:
+        return HttpResponseBadRequest("bad_since")
 
-    if not can_manage_lists(role):
-        return _forbidden("no_list_permission")
+    return JsonResponse({"ok": True, **exporting.changes_since(b, since)})
 
-    body = json.loads(request.body or "{}")
-    title = (body.get("title") or "").strip() or "Untitled"
+async def _apply(request, b, role, ops):
+    # auser() is cached on the request by the permission check: no extra query.
+    return await operations.aapply(b, role, ops, actor=await request.auser())
 
-    max_pos = List.objects.filter(board=b).aggregate(models.Max("position")).get("position__max")
-    pos = (max_pos + 1) if max_pos is not None else 0
-
-    lst = List.objects.create(board=b, title=title, position=pos)
-    return JsonResponse({"ok": True, "id": lst.id})
+async def _apply_one(request, b, role, op):
+    return await operations.aapply_one(b, role, op, actor=await request.auser())
 
 @login_required
 @require_http_methods(["POST"])
-def list_rename(request, board_id: int, list_id: int):
-    b = get_object_or_404(Board, id=board_id)
-    try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
-
-    if not can_manage_lists(role):
-        return _forbidden("no_list_permission")
-
+@aboard_permission(can_manage_roles, "not_admin")
+async def reset_board(request, b, role):
     body = json.loads(request.body or "{}")
-    title = (body.get("title") or "").strip() or "Untitled"
-
-    updated = List.objects.filter(board=b, id=list_id).update(title=title)
-    if not updated:
-        return HttpResponseBadRequest("list_not_found")
+    try:
+        await _apply_one(request, b, role, {"op": "board.reset", "template": body.get("template")})
+    except operations.OperationError as exc:
+        return HttpResponseBadRequest(exc.code)
     return JsonResponse({"ok": True})
 
 @login_required
 @require_http_methods(["POST"])
-def list_delete(request, board_id: int, list_id: int):
-    b = get_object_or_404(Board, id=board_id)
+@aboard_permission(can_manage_cards, "no_card_permission")
+async def board_ops(request, b, role):
     try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
+        body = json.loads(request.body or "{}")
+    except ValueError:
+        return HttpResponseBadRequest("bad_json")
+    ops = body.get("ops") if isinstance(body, dict) else None
 
-    if not can_manage_lists(role):
-        return _forbidden("no_list_permission")
+    try:
+        results, version = await _apply(request, b, role, ops)
+    except operations.OperationError as exc:
+        return JsonResponse(
+            {"ok": False, "error": exc.code, "index": exc.index, "version": await operations.acurrent_version(b)},
+            status=exc.status,
+        )
 
-    deleted, _ = List.objects.filter(board=b, id=list_id).delete()
-    if not deleted:
-        return HttpResponseBadRequest("list_not_found")
-    return JsonResponse({"ok": True})
+    return JsonResponse({"ok": True, "version": version, "results": results})
 
 @login_required
 @require_http_methods(["POST"])
-def list_reorder(request, board_id: int):
-    b = get_object_or_404(Board, id=board_id)
-    try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
-
-    if not can_manage_lists(role):
-        return _forbidden("no_list_permission")
-
+@aboard_permission(can_manage_lists, "no_list_permission")
+async def list_create(request, b, role):
     body = json.loads(request.body or "{}")
-    order = body.get("order")
-    if not isinstance(order, list):
-        return HttpResponseBadRequest("bad_order")
-
-    with transaction.atomic():
-        for idx, list_id in enumerate(order):
-            List.objects.filter(board=b, id=list_id).update(position=idx)
+    result = await _apply_one(request, b, role, {"op": "list.create", "title": body.get("title")})
+    return JsonResponse({"ok": True, "id": result["id"]})
 
+@login_required
+@require_http_methods(["POST"])
+@aboard_permission(can_manage_lists, "no_list_permission")
+async def list_rename(request, b, role, list_id: int):
+    body = json.loads(request.body or "{}")
+    try:
+        await _apply_one(request, b, role, {"op": "list.rename", "list": list_id, "title": body.get("title")})
+    except operations.OperationError as exc:
+        return HttpResponseBadRequest(exc.code)
     return JsonResponse({"ok": True})
 
 @login_required
 @require_http_methods(["POST"])
-def card_create(request, board_id: int):
-    b = get_object_or_404(Board, id=board_id)
+@aboard_permission(can_manage_lists, "no_list_permission")
+async def list_delete(request, b, role, list_id: int):
     try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
-
-    if not can_manage_cards(role):
-        return _forbidden("no_card_permission")
+        await _apply_one(request, b, role, {"op": "list.delete", "list": list_id})
+    except operations.OperationError as exc:
+        return HttpResponseBadRequest(exc.code)
+    return JsonResponse({"ok": True})
 
+@login_required
+@require_http_methods(["POST"])
+@aboard_permission(can_manage_lists, "no_list_permission")
+async def list_reorder(request, b, role):
     body = json.loads(request.body or "{}")
-    list_id = body.get("list_id")
-    title = (body.get("title") or "").strip()
-
-    if not list_id or not title:
-        return HttpResponseBadRequest("missing_fields")
-
-    lst = List.objects.filter(board=b, id=list_id).first()
-    if not lst:
-        return HttpResponseBadRequest("list_not_found")
-
-    max_pos = Card.objects.filter(board=b, list=lst).aggregate(models.Max("position")).get("position__max")
-    pos = (max_pos + 1) if max_pos is not None else 0
-
-    card = Card.objects.create(
-        board=b,
-        list=lst,
-        title=title,
-        desc="",
-        tag=Card.TAG_NOT_STARTED,
-        position=pos,
-    )
-
-    return JsonResponse({"ok": True, "id": card.id})
+    try:
+        await _apply_one(request, b, role, {"op": "lists.reorder", "order": body.get("order")})
+    except operations.OperationError as exc:
+        return HttpResponseBadRequest(exc.code)
+    return JsonResponse({"ok": True})
 
 @login_required
 @require_http_methods(["POST"])
-def card_update(request, board_id: int, card_id: int):
-    b = get_object_or_404(Board, id=board_id)
+@aboard_permission(can_manage_cards, "no_card_permission")
+async def card_create(request, b, role):
+    body = json.loads(request.body or "{}")
     try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
-
-    if not can_manage_cards(role):
-        return _forbidden("no_card_permission")
+        result = await _apply_one(
+            request, b, role, {"op": "card.create", "list": body.get("list_id"), "title": body.get("title")}
+        )
+    except operations.OperationError as exc:
+        return HttpResponseBadRequest(exc.code)
+    return JsonResponse({"ok": True, "id": result["id"]})
 
+@login_required
+@require_http_methods(["POST"])
+@aboard_permission(can_manage_cards, "no_card_permission")
+async def card_update(request, b, role, card_id: int):
     body = json.loads(request.body or "{}")
-    title = (body.get("title") or "").trim() if False else (body.get("title") or "").strip()
-    desc = (body.get("desc") or "").strip()
-    tag = body.get("tag")
-
-    valid_tags = dict(Card.TAG_CHOICES).keys()
-    if tag not in valid_tags:
-        tag = Card.TAG_NOT_STARTED
-
-    updated = Card.objects.filter(board=b, id=card_id).update(
-        title=title or "Untitled",
-        desc=desc,
-        tag=tag,
-    )
-
-    if not updated:
-        return HttpResponseBadRequest("card_not_found")
+    op = {"op": "card.update", "card": card_id, "title": body.get("title"), "desc": body.get("desc"), "tag": body.get("tag")}
+    try:
+        await _apply_one(request, b, role, op)
+    except operations.OperationError as exc:
+        return HttpResponseBadRequest(exc.code)
     return JsonResponse({"ok": True})
 
 @login_required
 @require_http_methods(["POST"])
-def card_delete(request, board_id: int, card_id: int):
-    b = get_object_or_404(Board, id=board_id)
+@aboard_permission(can_manage_cards, "no_card_permission")
+async def card_delete(request, b, role, card_id: int):
     try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
-
-    if not can_manage_cards(role):
-        return _forbidden("no_card_permission")
-
-    deleted, _ = Card.objects.filter(board=b, id=card_id).delete()
-    if not deleted:
-        return HttpResponseBadRequest("card_not_found")
+        await _apply_one(request, b, role, {"op": "card.delete", "card": card_id})
+    except operations.OperationError as exc:
+        return HttpResponseBadRequest(exc.code)
     return JsonResponse({"ok": True})
 
 @login_required
 @require_http_methods(["POST"])
-def card_move(request, board_id: int):
-    b = get_object_or_404(Board, id=board_id)
+@aboard_permission(can_manage_cards, "no_card_permission")
+async def card_archive(request, b, role, card_id: int):
     try:
-        role = require_member(b, request.user)
-    except PermissionError:
-        return _forbidden("not_member")
-
-    if not can_manage_cards(role):
-        return _forbidden("no_card_permission")
+        await _apply_one(request, b, role, {"op": "card.archive", "card": card_id})
+    except operations.OperationError as exc:
+        return HttpResponseBadRequest(exc.code)
+    return JsonResponse({"ok": True})
 
+@login_required
+@require_http_methods(["POST"])
+@aboard_permission(can_manage_cards, "no_card_permission")
+async def card_assign(request, b, role, card_id: int):
     body = json.loads(request.body or "{}")
-    card_id = body.get("card_id")
-    to_list_id = body.get("to_list_id")
-    to_index = body.get("to_index")
-
-    if card_id is None or to_list_id is None or to_index is None:
-        return HttpResponseBadRequest("missing_fields")
-
-    card = Card.objects.select_related("list").filter(board=b, id=card_id).first()
-    to_list = List.objects.filter(board=b, id=to_list_id).first()
-    if not card or not to_list:
-        return HttpResponseBadRequest("not_found")
+    op = {"op": "card.assign", "card": card_id, "user": body.get("user_id"), "assigned": body.get("assigned", True)}
+    try:
+        await _apply_one(request, b, role, op)
+    except operations.OperationError as exc:
+        return HttpResponseBadRequest(exc.code)
+    return JsonResponse({"ok": True})
 
-    to_index = int(to_index)
+@login_required
+@require_http_methods(["GET"])
+def my_cards(request):
+    tag = request.GET.get("tag") or None
+    if tag is not None and tag not in dict(Card.TAG_CHOICES):
+        return HttpResponseBadRequest("bad_tag")
+    try:
+        limit = max(1, min(int(request.GET.get("limit") or settings.BOARD_LIST_PAGE_SIZE), pagination.MAX_PAGE_SIZE))
+        # Newest assignment first, keyed on (assigned_at, id) so deep pages cost the same.
+        rows = CardAssignment.objects.filter(user=request.user)
+        if tag:
+            rows = rows.filter(tag=tag)
+        if request.GET.get("after"):
+            rows = pagination.before_time_cursor(rows, "assigned_at", request.GET["after"])
+    except ValueError:
+        return HttpResponseBadRequest("bad_cursor")
+
+    rows = list(rows.select_related("card", "board").order_by("-assigned_at", "-id")[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = pagination.encode_time_cursor(rows[limit - 1].assigned_at, rows[limit - 1].id)
+    cards = [
+        {
+            "id": a.card_id,
+            "board_id": a.board_id,
+            "board_name": a.board.name,
+            "list_id": a.card.list_id,
+            "title": a.card.title,
+            "preview": a.card.desc_preview,
+            "tag": a.tag,
+            "assigned_at": a.assigned_at.isoformat(),
+        }
+        for a in rows[:limit]
+    ]
+    return JsonResponse({"ok": True, "cards": cards, "next": next_cursor})
 
-    with transaction.atomic():
-        from_list_id = card.list_id
+@login_required
+@require_http_methods(["GET"])
+@aboard_permission(can_read)
+async def board_activity(request, b, role):
+    try:
+        limit = max(1, min(int(request.GET.get("limit") or settings.BOARD_LIST_PAGE_SIZE), pagination.MAX_PAGE_SIZE))
+        before = int(request.GET["before"]) if request.GET.get("before") else None
+    except ValueError:
+        return HttpResponseBadRequest("bad_cursor")
+
+    # Newest first on the (board, -id) index; ids follow insertion order.
+    events = ActivityEvent.objects.filter(board=b).order_by("-id")
+    if before is not None:
+        events = events.filter(id__lt=before)
+    events = events.values("id", "verb", "data", "created_at", "actor_id", actor_name=F("actor__username"))
+    rows = [row async for row in events[:limit + 1]]
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    return JsonResponse({"ok": True, "events": rows[:limit], "next": next_cursor})
 
-        from_cards = list(Card.objects.filter(board=b, list_id=from_list_id).order_by("position", "id"))
-        to_cards = list(Card.objects.filter(board=b, list_id=to_list_id).order_by("position", "id"))
+@login_required
+@require_http_methods(["GET"])
+@aboard_permission(can_read)
+async def archived_cards(request, b, role):
+    try:
+        limit = max(1, min(int(request.GET.get("limit") or settings.BOARD_LIST_PAGE_SIZE), pagination.MAX_PAGE_SIZE))
+        before = int(request.GET["before"]) if request.GET.get("before") else None
+    except ValueError:
+        return HttpResponseBadRequest("bad_cursor")
+
+    # Newest first, paged on the id so old archives cost the same as new ones.
+    archived = ArchivedCard.objects.filter(board=b).order_by("-id")
+    if before is not None:
+        archived = archived.filter(id__lt=before)
+    archived = archived.values("id", "list_id", "list_title", "title", "tag", "finished_at", "archived_at")
+    rows = [row async for row in archived[:limit + 1]]
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    return JsonResponse({"ok": True, "cards": rows[:limit], "next": next_cursor})
 
-        from_cards = [c for c in from_cards if c.id != card.id]
-        if from_list_id == to_list_id:
-            to_cards = from_cards
+@login_required
+@require_http_methods(["POST"])
+@aboard_permission(can_manage_cards, "no_card_permission")
+async def archive_restore(request, b, role, archived_id: int):
+    try:
+        result = await _apply_one(request, b, role, {"op": "card.restore", "archived": archived_id})
+    except operations.OperationError as exc:
+        return HttpResponseBadRequest(exc.code)
+    return JsonResponse({"ok": True, "id": result["id"], "list": result["list"]})
 
-        to_index = max(0, min(to_index, len(to_cards)))
-        to_cards.insert(to_index, card)
+@login_required
+@require_http_methods(["POST"])
+@aboard_permission(can_manage_cards, "no_card_permission")
+async def card_move(request, b, role):
+    body = json.loads(request.body or "{}")
+    op = {"op": "card.move", "card": body.get("card_id"), "list": body.get("to_list_id"), "index": body.get("to_index")}
+    try:
+        await _apply_one(request, b, role, op)
+    except operations.OperationError as exc:
+        return HttpResponseBadRequest(exc.code)
+    return JsonResponse({"ok": True})
 
-        if from_list_id != to_list_id:
-            for idx, c in enumerate(from_cards):
-                Card.objects.filter(board=b, id=c.id).update(position=idx)
-            card.list = to_list
-            card.save(update_fields=["list"])
+async def _event_stream(board_id):
+    keepalive = getattr(settings, "BOARD_EVENTS_KEEPALIVE", 15)
+    subscription = realtime.get_broker().subscribe(board_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            event = await subscription.get(timeout=keepalive)
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"data: {json.dumps(event, separators=(',', ':'))}\n\n"
+    finally:
+        await subscription.close()
 
-        for idx, c in enumerate(to_cards):
-            Card.objects.filter(board=b, id=c.id).update(list_id=to_list_id, position=idx)
+@login_required
+@require_http_methods(["GET"])
+async def board_events(request, board_id: int):
+    """Server-sent events for one board. The stream never ends, so it needs
+    ASGI: under WSGI Django would buffer it forever and hold the worker."""
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse("asgi_required", status=501)
+    b, role = await aload_board_and_role(request, board_id)
+    if not role or not can_read(role):
+        return HttpResponseForbidden("not_member")
+
+    response = StreamingHttpResponse(_event_stream(b.id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
-    return JsonResponse({"ok": True})
+@require_http_methods(["GET"])
+def metrics(request):
+    # Scrapers send the token; without one configured, only staff may look.
+    token = getattr(settings, "BOARD_METRICS_TOKEN", "")
+    if token:
+        if not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return HttpResponseForbidden("bad_token")
+    elif not request.user.is_staff:
+        return HttpResponseForbidden("not_staff")
+    return HttpResponse(instrumentation.registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -29,7 +29,43 @@ function listIdFromEl(el) {
 }
 
 function cardIdFromEl(el) {
-  return Number(el.getAttribute("data-card-id"));
+  // Cards created locally carry a "tmp-N" ref until the server assigns an id.
+  const id = el.getAttribute("data-card-id");
+  return /^\d+$/.test(id) ? Number(id) : id;
+}
+
+function listColumn(listId) {
+  return qs(':scope > [data-list-id="' + listId + '"]', listsEl);
+}
+
+function cardDropzone(listId) {
+  return qs('[data-role="card-dropzone"][data-list-id="' + listId + '"]', listsEl);
+}
+
+function cardElById(cardId) {
+  return qs('[data-card-id="' + cardId + '"]', listsEl);
+}
+
+async function filterCards(q) {
+  const term = (q || "").trim();
+  const url = new URL(location.href);
+  if (term) url.searchParams.set("q", term);
+  else url.searchParams.delete("q");
+  history.replaceState(null, "", url.toString());
+
+  const cards = qsa("[data-card-id]", listsEl);
+  if (!term) {
+    cards.forEach((el) => el.classList.remove("hidden"));
+    return;
+  }
+
+  const res = await fetch(endpoints.search + "?q=" + encodeURIComponent(term));
+  if (!res.ok) return;
+  const data = await res.json();
+  if ((searchInput.value || "").trim() !== term) return;
+
+  const hits = new Set(data.results.map((r) => r.id));
+  cards.forEach((el) => el.classList.toggle("hidden", !hits.has(cardIdFromEl(el))));
 }
 
 function reloadWithSearch(q) {
@@ -63,12 +99,273 @@ const modalClose = qs("#modalClose");
 const modalCancel = qs("#modalCancel");
 const modalSave = qs("#modalSave");
 const deleteCardBtn = qs("#deleteCardBtn");
+const archiveCardBtn = qs("#archiveCardBtn");
 const cardTitleInput = qs("#cardTitleInput");
 const cardDescInput = qs("#cardDescInput");
 const cardTagInput = qs("#cardTagInput");
 const modalMeta = qs("#modalMeta");
 
 let modalCardId = null;
+let liveConnected = false;
+
+// Local mutations are applied to the DOM at once and queued here; the queue
+// goes to the ops endpoint as one batch, with a single request in flight.
+const pendingOps = [];
+const ownVersions = new Set();
+const heldEvents = [];
+const refIds = {};
+let opsInFlight = false;
+let flushTimer = null;
+let nextRef = 1;
+
+const TAG_BADGES = {
+  not_started: ["bg-slate-200 text-slate-700", "Not started"],
+  in_progress: ["bg-amber-200 text-amber-800", "In progress"],
+  finished: ["bg-emerald-200 text-emerald-800", "Finished"],
+};
+
+let reloadWhenIdle = false;
+
+// The board shows description previews; full descriptions are fetched when a
+// card opens and kept in a small LRU. Same cut as models.desc_preview.
+const DESC_PREVIEW_LENGTH = 140;
+const DESC_CACHE_SIZE = 100;
+const descCache = new Map();
+
+function descPreview(desc) {
+  const text = (desc || "").trim();
+  if (text.length <= DESC_PREVIEW_LENGTH) return text;
+  return text.slice(0, DESC_PREVIEW_LENGTH - 1).trimEnd() + "\u2026";
+}
+
+function cacheDesc(id, desc) {
+  descCache.delete(id);
+  descCache.set(id, desc);
+  if (descCache.size > DESC_CACHE_SIZE) descCache.delete(descCache.keys().next().value);
+}
+
+function cachedDesc(id) {
+  if (!descCache.has(id)) return undefined;
+  const desc = descCache.get(id);
+  cacheDesc(id, desc);
+  return desc;
+}
+
+async function loadDesc(id) {
+  const known = cachedDesc(id);
+  if (known !== undefined) return known;
+  const res = await fetch(endpoints.cardDetailPrefix + id + "/");
+  if (!res.ok) return undefined;
+  const data = await res.json();
+  cacheDesc(id, data.card.desc);
+  return data.card.desc;
+}
+
+// List progress bars follow the server's counters: confirmed op results and
+// other clients' events carry {list id: {tag: delta}}.
+const COUNT_TAGS = ["not_started", "in_progress", "finished"];
+
+function renderProgress(el, counts) {
+  const [, inProgress, finished] = counts;
+  const total = counts.reduce((a, b) => a + b, 0);
+  el.setAttribute("data-counts", counts.join(","));
+  qs('[data-role="progress-finished"]', el).style.width = Math.floor((finished * 100) / (total || 1)) + "%";
+  qs('[data-role="progress-in-progress"]', el).style.width = Math.floor((inProgress * 100) / (total || 1)) + "%";
+  qs('[data-role="progress-label"]', el).textContent = `${finished}/${total} finished`;
+}
+
+function applyCounts(changes) {
+  Object.entries(changes || {}).forEach(([listId, byTag]) => {
+    const col = listColumn(listId);
+    const el = col && qs('[data-role="progress"]', col);
+    if (!el) return;
+    const counts = el.getAttribute("data-counts").split(",").map(Number);
+    Object.entries(byTag).forEach(([tag, n]) => {
+      const i = COUNT_TAGS.indexOf(tag);
+      if (i >= 0) counts[i] = Math.max(0, counts[i] + n);
+    });
+    renderProgress(el, counts);
+  });
+}
+
+function refreshAfterMutation() {
+  // With the live event stream open the change arrives as an event instead.
+  if (!liveConnected) reloadBoard();
+}
+
+function renderSnapshot(snap) {
+  const columns = snap.lists.id.map((id, i) => buildListEl({ id, title: snap.lists.title[i] }));
+  const zones = new Map(columns.map((col) => [listIdFromEl(col), qs('[data-role="card-dropzone"]', col)]));
+  const cards = snap.cards;
+  const counts = new Map(snap.lists.id.map((id) => [id, [0, 0, 0]]));
+  cards.id.forEach((id, i) => {
+    const zone = zones.get(cards.list[i]);
+    if (!zone) return;
+    const tag = snap.tags[cards.tag[i]];
+    zone.appendChild(buildCardEl({ card: id, title: cards.title[i], preview: cards.preview[i], tag }));
+    counts.get(cards.list[i])[COUNT_TAGS.indexOf(tag)] += 1;
+  });
+  // The snapshot holds every card, so it gives the counts as well.
+  columns.forEach((col) => renderProgress(qs('[data-role="progress"]', col), counts.get(listIdFromEl(col))));
+
+  listsEl.replaceChildren(...columns);
+  columns.forEach(wireList);
+  applyRoleUI();
+
+  if (modalCardId && !cardElById(modalCardId)) closeModal();
+  // The page now holds every card, so search can filter in place.
+  ctx.q = "";
+  if (searchInput && searchInput.value.trim()) filterCards(searchInput.value);
+}
+
+async function reloadBoard() {
+  // Re-rendering would wipe optimistic changes that the server has not confirmed yet.
+  if (opsInFlight || pendingOps.length) {
+    reloadWhenIdle = true;
+    return;
+  }
+  reloadWhenIdle = false;
+  const res = await fetch(endpoints.snapshot);
+  if (!res.ok) {
+    location.reload();
+    return;
+  }
+  const snap = await res.json();
+  if (opsInFlight || pendingOps.length) {
+    reloadWhenIdle = true;
+    return;
+  }
+  descCache.clear();
+  renderSnapshot(snap);
+}
+
+// True when ``prev``, still queued, is made redundant by the newer ``op``.
+function supersedes(op, prev) {
+  switch (op.op) {
+    case "card.move":
+    case "card.update":
+      return prev.op === op.op && prev.card === op.card;
+    case "card.delete":
+      return (prev.op.startsWith("card.") && prev.card === op.card) || (prev.op === "card.create" && prev.ref === op.card);
+    case "list.rename":
+    case "list.delete":
+      return prev.op === "list.rename" && prev.list === op.list;
+    case "lists.reorder":
+      return prev.op === "lists.reorder";
+    default:
+      return false;
+  }
+}
+
+function queueOp(op, undo) {
+  const undos = [undo];
+  let send = true;
+  for (let i = pendingOps.length - 1; i >= 0; i--) {
+    const prev = pendingOps[i];
+    if (!supersedes(op, prev.op)) continue;
+    pendingOps.splice(i, 1);
+    undos.push(prev.undo);
+    // A card deleted before its create was sent never needs to reach the server.
+    if (prev.op.op === "card.create") send = false;
+  }
+  if (send) pendingOps.push({ op, undo: () => undos.forEach((fn) => fn && fn()) });
+  scheduleFlush();
+}
+
+function scheduleFlush() {
+  if (flushTimer || opsInFlight || !pendingOps.length) return;
+  flushTimer = setTimeout(flushOps, 50);
+}
+
+function resolveRefs(op) {
+  if (typeof op.card === "string" && refIds[op.card]) return { ...op, card: refIds[op.card] };
+  return op;
+}
+
+function adoptCardId(ref, id) {
+  refIds[ref] = id;
+  const el = cardElById(ref);
+  if (el) el.setAttribute("data-card-id", id);
+  if (modalCardId === ref) modalCardId = id;
+  if (descCache.has(ref)) {
+    cacheDesc(id, descCache.get(ref));
+    descCache.delete(ref);
+  }
+}
+
+async function flushOps() {
+  flushTimer = null;
+  const batch = pendingOps.splice(0);
+  if (!batch.length) return;
+  opsInFlight = true;
+
+  let data = null;
+  try {
+    const res = await fetch(endpoints.ops, {
+      method: "POST",
+      headers: { "Content-Type": "application/json", "X-CSRFToken": getCsrfToken() },
+      body: JSON.stringify({ ops: batch.map((entry) => resolveRefs(entry.op)) }),
+    });
+    data = await res.json();
+  } catch {
+    data = null;
+  }
+  opsInFlight = false;
+
+  if (data && data.ok) {
+    ownVersions.add(data.version);
+    data.results.forEach((r) => r.ref && adoptCardId(r.ref, r.id));
+    data.results.forEach((r) => applyCounts(r.counts));
+  } else {
+    // The server rolled the whole batch back; so do we, newest change first.
+    // Ops queued meanwhile were built on top of it and are dropped as well.
+    pendingOps.splice(0).concat(batch).reverse().forEach((entry) => entry.undo());
+    refreshAfterMutation();
+  }
+
+  heldEvents.splice(0).forEach(receiveEvent);
+  scheduleFlush();
+  if (reloadWhenIdle) reloadBoard();
+}
+
+function snapshotPlace(el) {
+  const parent = el.parentNode;
+  const next = el.nextSibling;
+  return () => parent.insertBefore(el, next && next.parentNode === parent ? next : null);
+}
+
+function readCardFields(cardEl) {
+  return {
+    title: qs('[data-role="card-title"]', cardEl)?.textContent || "",
+    preview: qs('[data-role="card-desc"]', cardEl)?.textContent || "",
+    tag: cardEl.getAttribute("data-card-tag") || "not_started",
+  };
+}
+
+function createCard(listId, title) {
+  const zone = cardDropzone(listId);
+  if (!zone) return;
+  const ref = "tmp-" + nextRef++;
+  const el = buildCardEl({ card: ref, title, desc: "", tag: "not_started" });
+  cacheDesc(ref, "");
+  zone.appendChild(el);
+  wireCard(el);
+  queueOp({ op: "card.create", list: listId, title, ref }, () => el.remove());
+}
+
+function deleteCard(cardEl) {
+  const restore = snapshotPlace(cardEl);
+  const id = cardIdFromEl(cardEl);
+  cardEl.remove();
+  queueOp({ op: "card.delete", card: id }, restore);
+}
+
+function archiveCard(cardEl) {
+  const restore = snapshotPlace(cardEl);
+  const id = cardIdFromEl(cardEl);
+  cardEl.remove();
+  queueOp({ op: "card.archive", card: id }, restore);
+}
 
 function openModal(cardEl) {
   if (!roleCanManageCards()) return;
@@ -78,13 +375,9 @@ function openModal(cardEl) {
   const listEl = cardEl.closest("[data-list-id]");
   const listTitle = qs('[data-role="list-title"]', listEl)?.value || "List";
 
-  const title = qs('[data-role="card-title"]', cardEl)?.textContent || "";
-  const desc = qs('[data-role="card-desc"]', cardEl)?.textContent || "";
-  const tag = cardEl.getAttribute("data-card-tag") || "not_started";
-
-  cardTitleInput.value = title;
-  cardDescInput.value = desc;
-  if (cardTagInput) cardTagInput.value = tag;
+  const fields = readCardFields(cardEl);
+  cardTitleInput.value = fields.title;
+  if (cardTagInput) cardTagInput.value = fields.tag;
 
   modalMeta.textContent = listTitle;
 
@@ -92,6 +385,28 @@ function openModal(cardEl) {
   modal.classList.add("flex");
   cardTitleInput.focus();
   cardTitleInput.select();
+
+  const id = modalCardId;
+  const known = cachedDesc(id);
+  setDescLoading(known === undefined);
+  cardDescInput.value = known === undefined ? fields.preview : known;
+  if (known !== undefined) return;
+  // Saving before the full text arrives would overwrite it with the preview.
+  loadDesc(id).then((desc) => {
+    if (modalCardId !== id) return;
+    if (desc === undefined) {
+      modalMeta.textContent = listTitle + " \u00b7 description unavailable";
+      return;
+    }
+    cardDescInput.value = desc;
+    setDescLoading(false);
+  });
+}
+
+function setDescLoading(loading) {
+  cardDescInput.disabled = loading;
+  if (modalSave) modalSave.disabled = loading || !roleCanManageCards();
+  cardDescInput.classList.toggle("opacity-50", loading);
 }
 
 function closeModal() {
@@ -114,107 +429,254 @@ function applyRoleUI() {
 
     if (modalSave) modalSave.setAttribute("disabled", "disabled");
     if (deleteCardBtn) deleteCardBtn.setAttribute("disabled", "disabled");
+    if (archiveCardBtn) archiveCardBtn.setAttribute("disabled", "disabled");
     if (modalSave) modalSave.classList.add("opacity-50");
     if (deleteCardBtn) deleteCardBtn.classList.add("opacity-50");
+    if (archiveCardBtn) archiveCardBtn.classList.add("opacity-50");
   }
 }
 
-function wireListsAndCards() {
-  qsa('[data-role="list-title"]').forEach((input) => {
-    input.addEventListener("change", async (e) => {
-      if (!roleCanManageLists()) return;
-      const listEl = e.target.closest("[data-list-id]");
-      const id = listIdFromEl(listEl);
-      await postJson(endpoints.listRenamePrefix + id + "/rename/", { title: e.target.value });
-    });
-  });
+function renderTagBadge(container, tag) {
+  container.textContent = "";
+  const badge = TAG_BADGES[tag];
+  if (!badge) return;
+  const span = document.createElement("span");
+  span.className = "rounded-full px-2 py-0.5 " + badge[0];
+  span.textContent = badge[1];
+  container.appendChild(span);
+}
 
-  qsa('[data-role="list-delete"]').forEach((btn) => {
-    btn.addEventListener("click", async (e) => {
-      if (!roleCanManageLists()) return;
-      const listEl = e.target.closest("[data-list-id]");
-      const id = listIdFromEl(listEl);
-      const ok = confirm("Delete this list and its cards?");
-      if (!ok) return;
-      await postJson(endpoints.listDeletePrefix + id + "/delete/", {});
-      location.reload();
-    });
-  });
+function applyCardFields(cardEl, card) {
+  const titleEl = qs('[data-role="card-title"]', cardEl);
+  const descEl = qs('[data-role="card-desc"]', cardEl);
+  if (titleEl) titleEl.textContent = card.title;
+  if (descEl) {
+    const preview = card.preview !== undefined ? card.preview : descPreview(card.desc);
+    descEl.textContent = preview;
+    descEl.classList.toggle("hidden", !preview);
+  }
+  cardEl.setAttribute("data-card-tag", card.tag);
+  const tagEl = qs('[data-role="card-tag"]', cardEl);
+  if (tagEl) renderTagBadge(tagEl, card.tag);
+}
 
-  qsa('[data-role="add-card-btn"]').forEach((btn) => {
-    btn.addEventListener("click", async (e) => {
-      if (!roleCanManageCards()) return;
-      const listEl = e.target.closest("[data-list-id]");
-      const listId = listIdFromEl(listEl);
-      const input = qs('[data-role="new-card-input"]', listEl);
-      const title = (input.value || "").trim();
-      if (!title) return;
-      await postJson(endpoints.cardCreate, { list_id: listId, title });
-      location.reload();
-    });
+function buildCardEl(card) {
+  const el = document.createElement("div");
+  el.className = "group cursor-pointer rounded-xl border border-slate-200 bg-white p-3 shadow-sm hover:border-slate-300";
+  el.setAttribute("data-card-id", card.card);
+  el.innerHTML =
+    '<div class="flex items-start justify-between gap-2">' +
+    '<div class="min-w-0 flex-1">' +
+    '<div class="text-sm font-medium text-slate-900" data-role="card-title"></div>' +
+    '<div class="mt-1 text-xs" data-role="card-tag"></div>' +
+    '<div class="mt-1 hidden text-xs text-slate-600" data-role="card-desc"></div>' +
+    "</div>" +
+    '<button class="hidden rounded-lg p-1.5 hover:bg-slate-100 group-hover:block" data-role="quick-delete" title="Delete card">' +
+    '<svg xmlns="http://www.w3.org/2000/svg" class="h-4 w-4 text-slate-500" viewBox="0 0 20 20" fill="currentColor">' +
+    '<path d="M6 2a1 1 0 00-1 1v1H3a1 1 0 000 2h1v11a2 2 0 002 2h8a2 2 0 002-2V6h1a1 1 0 100-2h-2V3a1 1 0 00-1-1H6zm2 4a1 1 0 011 1v8a1 1 0 11-2 0V7a1 1 0 011-1zm4 0a1 1 0 011 1v8a1 1 0 11-2 0V7a1 1 0 011-1z"/>' +
+    "</svg></button></div>";
+  applyCardFields(el, card);
+  if (!roleCanManageCards()) qs('[data-role="quick-delete"]', el).style.display = "none";
+  return el;
+}
+
+function buildListEl(list) {
+  const el = document.createElement("div");
+  el.className = "w-80 shrink-0 rounded-2xl border border-slate-200 bg-white shadow-sm";
+  el.setAttribute("data-list-id", list.id);
+  el.innerHTML =
+    '<div class="flex items-center justify-between gap-2 px-3 py-3">' +
+    '<input class="min-w-0 flex-1 rounded-lg border border-transparent px-2 py-1 text-sm font-semibold outline-none hover:border-slate-200 focus:border-slate-300" data-role="list-title" />' +
+    '<button class="rounded-lg p-2 hover:bg-slate-100" data-role="list-delete" title="Delete list">' +
+    '<svg xmlns="http://www.w3.org/2000/svg" class="h-5 w-5 text-slate-600" viewBox="0 0 20 20" fill="currentColor">' +
+    '<path d="M10 6a1 1 0 011 1v8a1 1 0 11-2 0V7a1 1 0 011-1z"/>' +
+    '<path fill-rule="evenodd" d="M4 5a1 1 0 011-1h10a1 1 0 011 1v1a1 1 0 01-1 1h-1v9a2 2 0 01-2 2H7a2 2 0 01-2-2V8H4a1 1 0 01-1-1V5zm3 3v9h6V8H7z" clip-rule="evenodd"/>' +
+    "</svg></button></div>" +
+    '<div class="px-5 pb-3"><div data-role="progress" data-counts="0,0,0">' +
+    '<div class="flex h-1.5 overflow-hidden rounded-full bg-slate-100">' +
+    '<div class="bg-emerald-400" data-role="progress-finished" style="width: 0%"></div>' +
+    '<div class="bg-amber-300" data-role="progress-in-progress" style="width: 0%"></div>' +
+    "</div>" +
+    '<div class="mt-1 text-xs text-slate-500" data-role="progress-label">0/0 finished</div>' +
+    "</div></div>" +
+    '<div class="px-3 pb-3">' +
+    '<div class="mb-2 flex items-center gap-2">' +
+    '<input class="flex-1 rounded-lg border border-slate-200 bg-white px-3 py-2 text-sm outline-none focus:border-slate-400" placeholder="Add a card" data-role="new-card-input" />' +
+    '<button class="rounded-lg bg-slate-900 px-3 py-2 text-sm font-medium text-white hover:bg-slate-800" data-role="add-card-btn">Add</button>' +
+    "</div>" +
+    '<div class="min-h-10 space-y-2 rounded-xl bg-slate-50 p-2" data-role="card-dropzone"></div>' +
+    "</div>";
+  const titleInput = qs('[data-role="list-title"]', el);
+  titleInput.value = list.title;
+  titleInput.defaultValue = list.title;
+  qs('[data-role="card-dropzone"]', el).setAttribute("data-list-id", list.id);
+  return el;
+}
+
+function insertCardAt(zone, cardEl, index) {
+  const siblings = qsa("[data-card-id]", zone).filter((el) => el !== cardEl);
+  zone.insertBefore(cardEl, siblings[index] || null);
+}
+
+function wireCard(cardEl) {
+  cardEl.addEventListener("click", (e) => {
+    const del = e.target.closest('[data-role="quick-delete"]');
+    if (del) return;
+    openModal(cardEl);
   });
 
-  qsa('[data-role="new-card-input"]').forEach((input) => {
-    input.addEventListener("keydown", async (e) => {
+  const qd = qs('[data-role="quick-delete"]', cardEl);
+  if (qd) {
+    qd.addEventListener("click", (e) => {
+      e.stopPropagation();
       if (!roleCanManageCards()) return;
-      if (e.key !== "Enter") return;
-      e.preventDefault();
-      const listEl = e.target.closest("[data-list-id]");
-      const listId = listIdFromEl(listEl);
-      const title = (e.target.value || "").trim();
-      if (!title) return;
-      await postJson(endpoints.cardCreate, { list_id: listId, title });
-      location.reload();
+      deleteCard(cardEl);
     });
-  });
+  }
+}
 
-  qsa("[data-card-id]").forEach((cardEl) => {
-    cardEl.addEventListener("click", (e) => {
-      const del = e.target.closest('[data-role="quick-delete"]');
-      if (del) return;
-      openModal(cardEl);
-    });
+function wireCardDropzone(zone) {
+  if (!roleCanManageCards()) return;
+  new Sortable(zone, {
+    group: "cards",
+    animation: 150,
+    draggable: "[data-card-id]",
+    onEnd: (evt) => {
+      if (evt.from === evt.to && evt.oldIndex === evt.newIndex) return;
+      const op = {
+        op: "card.move",
+        card: cardIdFromEl(evt.item),
+        list: Number(evt.to.getAttribute("data-list-id")),
+        index: evt.newIndex,
+      };
+      queueOp(op, () => insertCardAt(evt.from, evt.item, evt.oldIndex));
+    },
+  });
+}
 
-    const qd = qs('[data-role="quick-delete"]', cardEl);
-    if (qd) {
-      qd.addEventListener("click", async (e) => {
-        e.stopPropagation();
-        if (!roleCanManageCards()) return;
-        const id = cardIdFromEl(cardEl);
-        await postJson(endpoints.cardDeletePrefix + id + "/delete/", {});
-        location.reload();
-      });
-    }
+function appendCardsHtml(zone, html) {
+  const tpl = document.createElement("template");
+  tpl.innerHTML = html;
+  qsa("[data-card-id]", tpl.content).forEach((el) => {
+    // Cards added or moved here locally can show up again in a later page; keep the server's place.
+    const existing = cardElById(cardIdFromEl(el));
+    if (existing) existing.remove();
+    zone.appendChild(el);
+    wireCard(el);
   });
+  applyRoleUI();
 }
 
-function wireDragAndDrop() {
-  if (roleCanManageLists()) {
-    new Sortable(listsEl, {
-      animation: 150,
-      draggable: "[data-list-id]",
-      onEnd: async () => {
-        const order = qsa("[data-list-id]", listsEl).map((el) => listIdFromEl(el));
-        await postJson(endpoints.listReorder, { order });
-      },
+function wireLoadMore(listEl) {
+  const btn = qs('[data-role="load-more"]', listEl);
+  if (!btn) return;
+  const zone = qs('[data-role="card-dropzone"]', listEl);
+  let loading = false;
+  let observer = null;
+
+  async function loadMore() {
+    if (loading || !btn.isConnected) return;
+    loading = true;
+    const url = new URL(endpoints.listCardsPrefix + listIdFromEl(listEl) + "/cards/", location.href);
+    url.searchParams.set("after", btn.getAttribute("data-cursor"));
+    if (ctx.q) url.searchParams.set("q", ctx.q);
+    try {
+      const res = await fetch(url);
+      if (!res.ok) return;
+      const data = await res.json();
+      appendCardsHtml(zone, data.html);
+      if (data.next) {
+        btn.setAttribute("data-cursor", data.next);
+        // Re-observing reports the button again if it is still on screen.
+        if (observer) {
+          observer.unobserve(btn);
+          observer.observe(btn);
+        }
+      } else {
+        if (observer) observer.disconnect();
+        btn.remove();
+      }
+    } finally {
+      loading = false;
+    }
+  }
+
+  btn.addEventListener("click", loadMore);
+  if (window.IntersectionObserver) {
+    observer = new IntersectionObserver((entries) => entries.some((e) => e.isIntersecting) && loadMore(), {
+      rootMargin: "300px",
     });
+    observer.observe(btn);
   }
+}
 
-  if (roleCanManageCards()) {
-    qsa('[data-role="card-dropzone"]').forEach((zone) => {
-      new Sortable(zone, {
-        group: "cards",
-        animation: 150,
-        draggable: "[data-card-id]",
-        onEnd: async (evt) => {
-          const cardId = cardIdFromEl(evt.item);
-          const toListId = Number(evt.to.getAttribute("data-list-id"));
-          const toIndex = evt.newIndex;
-          await postJson(endpoints.cardMove, { card_id: cardId, to_list_id: toListId, to_index: toIndex });
-        },
-      });
+function wireList(listEl) {
+  const listId = listIdFromEl(listEl);
+
+  const titleInput = qs('[data-role="list-title"]', listEl);
+  titleInput.addEventListener("change", () => {
+    if (!roleCanManageLists()) return;
+    const previous = titleInput.defaultValue;
+    titleInput.defaultValue = titleInput.value;
+    queueOp({ op: "list.rename", list: listId, title: titleInput.value }, () => {
+      titleInput.value = previous;
+      titleInput.defaultValue = previous;
     });
+  });
+
+  qs('[data-role="list-delete"]', listEl).addEventListener("click", () => {
+    if (!roleCanManageLists()) return;
+    const ok = confirm("Delete this list and its cards?");
+    if (!ok) return;
+    const restore = snapshotPlace(listEl);
+    listEl.remove();
+    queueOp({ op: "list.delete", list: listId }, restore);
+  });
+
+  const newCardInput = qs('[data-role="new-card-input"]', listEl);
+  function addCard() {
+    if (!roleCanManageCards()) return;
+    const title = (newCardInput.value || "").trim();
+    if (!title) return;
+    createCard(listId, title);
+    newCardInput.value = "";
   }
+  qs('[data-role="add-card-btn"]', listEl).addEventListener("click", addCard);
+  newCardInput.addEventListener("keydown", (e) => {
+    if (e.key !== "Enter") return;
+    e.preventDefault();
+    addCard();
+  });
+
+  qsa("[data-card-id]", listEl).forEach(wireCard);
+  wireCardDropzone(qs('[data-role="card-dropzone"]', listEl));
+  wireLoadMore(listEl);
+}
+
+function wireListsAndCards() {
+  qsa(":scope > [data-list-id]", listsEl).forEach(wireList);
+}
+
+function wireDragAndDrop() {
+  if (!roleCanManageLists()) return;
+  const listOrder = () => qsa(":scope > [data-list-id]", listsEl).map((el) => listIdFromEl(el));
+  let before = [];
+  new Sortable(listsEl, {
+    animation: 150,
+    draggable: "[data-list-id]",
+    onStart: () => (before = listOrder()),
+    onEnd: () => {
+      const order = listOrder();
+      if (order.join() === before.join()) return;
+      const previous = before;
+      queueOp({ op: "lists.reorder", order }, () =>
+        previous.forEach((id) => {
+          const col = listColumn(id);
+          if (col) listsEl.appendChild(col);
+        })
+      );
+    },
+  });
 }
 
 function initTopActions() {
@@ -224,7 +686,7 @@ function initTopActions() {
       const name = prompt("List name?");
       if (!name) return;
       await postJson(endpoints.listCreate, { title: name });
-      location.reload();
+      refreshAfterMutation();
     });
   }
 
@@ -232,7 +694,8 @@ function initTopActions() {
     let t = null;
     searchInput.addEventListener("input", () => {
       if (t) clearTimeout(t);
-      t = setTimeout(() => reloadWithSearch(searchInput.value), 250);
+      // A page rendered with ?q only holds the matching cards, so it must reload once.
+      t = setTimeout(() => (ctx.q ? reloadWithSearch(searchInput.value) : filterCards(searchInput.value)), 250);
     });
   }
 
@@ -259,7 +722,7 @@ function initTopActions() {
       const ok = confirm("Reset board?");
       if (!ok) return;
       await postJson(endpoints.reset, {});
-      location.reload();
+      reloadBoard();
     });
   }
 }
@@ -268,14 +731,26 @@ function initModal() {
   function save() {
     if (!roleCanManageCards()) return;
     if (!modalCardId) return;
+    // Still showing the preview: saving now would store it over the full text.
+    if (cardDescInput.disabled || (modalSave && modalSave.disabled)) return;
 
     const title = (cardTitleInput.value || "").trim() || "Untitled";
     const desc = (cardDescInput.value || "").trim();
     const tag = (cardTagInput ? cardTagInput.value : "not_started");
 
-    postJson(endpoints.cardUpdatePrefix + modalCardId + "/update/", { title, desc, tag })
-      .then(() => location.reload())
-      .catch(() => {});
+    const cardEl = cardElById(modalCardId);
+    if (cardEl) {
+      const id = modalCardId;
+      const previous = { ...readCardFields(cardEl), desc: cachedDesc(id) };
+      applyCardFields(cardEl, { title, desc, tag });
+      cacheDesc(id, desc);
+      queueOp({ op: "card.update", card: id, title, desc, tag }, () => {
+        applyCardFields(cardEl, previous);
+        if (previous.desc === undefined) descCache.delete(id);
+        else cacheDesc(id, previous.desc);
+      });
+    }
+    closeModal();
   }
 
   if (modalSave) modalSave.addEventListener("click", save);
@@ -284,14 +759,24 @@ function initModal() {
   if (modalBackdrop) modalBackdrop.addEventListener("click", closeModal);
 
   if (deleteCardBtn) {
-    deleteCardBtn.addEventListener("click", async () => {
+    deleteCardBtn.addEventListener("click", () => {
       if (!roleCanManageCards()) return;
       if (!modalCardId) return;
       const ok = confirm("Delete this card?");
       if (!ok) return;
-      await postJson(endpoints.cardDeletePrefix + modalCardId + "/delete/", {});
+      const cardEl = cardElById(modalCardId);
+      if (cardEl) deleteCard(cardEl);
+      closeModal();
+    });
+  }
+
+  if (archiveCardBtn) {
+    archiveCardBtn.addEventListener("click", () => {
+      if (!roleCanManageCards()) return;
+      if (!modalCardId) return;
+      const cardEl = cardElById(modalCardId);
+      if (cardEl) archiveCard(cardEl);
       closeModal();
-      location.reload();
     });
   }
 
@@ -302,10 +787,106 @@ function initModal() {
   });
 }
 
+function applyEvent(ev) {
+  applyCounts(ev.counts);
+  switch (ev.type) {
+    case "card.created": {
+      const zone = cardDropzone(ev.list);
+      if (!zone || cardElById(ev.card)) return;
+      // New cards go to the end of the list; with more pages to load they arrive with the last one.
+      if (qs('[data-role="load-more"]', listColumn(ev.list))) return;
+      const el = buildCardEl(ev);
+      zone.appendChild(el);
+      wireCard(el);
+      cacheDesc(ev.card, ev.desc);
+      return;
+    }
+    case "card.updated": {
+      const el = cardElById(ev.card);
+      if (el) applyCardFields(el, ev);
+      cacheDesc(ev.card, ev.desc);
+      return;
+    }
+    case "card.moved": {
+      const el = cardElById(ev.card);
+      const zone = cardDropzone(ev.list);
+      if (el && zone) insertCardAt(zone, el, ev.index);
+      return;
+    }
+    case "card.deleted": {
+      const el = cardElById(ev.card);
+      if (el) el.remove();
+      if (modalCardId === ev.card) closeModal();
+      descCache.delete(ev.card);
+      return;
+    }
+    case "cards.archived":
+      ev.cards.forEach((id) => {
+        const el = cardElById(id);
+        if (el) el.remove();
+        if (modalCardId === id) closeModal();
+        descCache.delete(id);
+      });
+      return;
+    case "list.renamed": {
+      const col = listColumn(ev.list);
+      const input = col && qs('[data-role="list-title"]', col);
+      if (input && document.activeElement !== input) input.value = ev.title;
+      return;
+    }
+    case "list.deleted": {
+      const col = listColumn(ev.list);
+      if (col) col.remove();
+      return;
+    }
+    case "list.created": {
+      if (listColumn(ev.list)) return;
+      const col = buildListEl({ id: ev.list, title: ev.title });
+      listsEl.appendChild(col);
+      wireList(col);
+      applyRoleUI();
+      return;
+    }
+    case "card.assigned":
+      // Assignments are not shown on the board; "my cards" reads them.
+      return;
+    case "lists.reordered":
+      ev.order.forEach((id) => {
+        const col = listColumn(id);
+        if (col) listsEl.appendChild(col);
+      });
+      return;
+    default:
+      // board.reset and anything unknown: fetch the whole board again.
+      reloadBoard();
+  }
+}
+
+function receiveEvent(ev) {
+  // Hold events while a batch is out: its own echoes are only known by version once it returns.
+  if (opsInFlight) {
+    heldEvents.push(ev);
+    return;
+  }
+  if (!ownVersions.has(ev.version)) applyEvent(ev);
+  // Events arrive in version order, and one batch may send several with the
+  // same version: once a newer one shows up, older echoes are all in.
+  ownVersions.forEach((v) => v < ev.version && ownVersions.delete(v));
+}
+
+function initLiveSync() {
+  if (!window.EventSource || !endpoints.events) return;
+  const source = new EventSource(endpoints.events);
+  source.onopen = () => (liveConnected = true);
+  source.onerror = () => (liveConnected = false);
+  source.onmessage = (e) => receiveEvent(JSON.parse(e.data));
+}
+
 (function main() {
   applyRoleUI();
   wireListsAndCards();
   wireDragAndDrop();
   initTopActions();
   initModal();
+  initLiveSync();
 })();
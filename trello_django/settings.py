@@ -54,6 +54,16 @@ MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware'
 ]
 
+# Per-request wall time, SQL time and query counts: Server-Timing headers,
+# "board.metrics" log lines and a Prometheus text endpoint at /metrics/.
+BOARD_METRICS = os.environ.get("BOARD_METRICS") == "1"
+if BOARD_METRICS:
+    MIDDLEWARE.insert(1, "board.instrumentation.RequestMetricsMiddleware")
+# Bearer token for /metrics/; when empty only staff users can read it.
+BOARD_METRICS_TOKEN = os.environ.get("BOARD_METRICS_TOKEN", "")
+# A statement repeated this often in one request is logged as a warning (likely N+1).
+BOARD_METRICS_DUPLICATE_THRESHOLD = int(os.environ.get("BOARD_METRICS_DUPLICATE_THRESHOLD", "5"))
+
 ROOT_URLCONF = 'trello_django.urls'
 
 TEMPLATES = [
@@ -77,14 +87,84 @@ WSGI_APPLICATION = 'trello_django.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# The app is served over ASGI, where every sync_to_async thread holds its own
+# connection: persistent connections would pile up (and rerun the SQLite
+# PRAGMAs on each), so they are off by default. Under a WSGI server,
+# DB_CONN_MAX_AGE=60 saves the connect per request; the health checks then
+# drop connections the server closed.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': dj_database_url.config(
+        default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
+        conn_max_age=int(os.environ.get("DB_CONN_MAX_AGE", "0")),
+        conn_health_checks=os.environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1",
+    )
+}
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Writers take the lock when their transaction starts instead of failing
+    # with "database is locked" when a read lock has to be upgraded.
+    DATABASES['default'].setdefault('OPTIONS', {}).update({
+        'transaction_mode': os.environ.get("SQLITE_TRANSACTION_MODE", "IMMEDIATE"),
+        'timeout': int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")) / 1000,
+    })
+
+# Applied to every new SQLite connection by board.db.configure_connection.
+# The bundled db.sqlite3 is tracked in git and stays in rollback-journal
+# mode, so running manage.py does not rewrite its header; any other SQLite
+# database defaults to WAL.
+_BUNDLED_DB = DATABASES['default'].get('NAME') == str(BASE_DIR / 'db.sqlite3')
+SQLITE_PRAGMAS = {
+    "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "delete" if _BUNDLED_DB else "wal"),
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "normal"),
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024))),
+    "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", "-20000")),
 }
 
 
+# Caches. CACHE_URL picks the backend: locmem:// (default, per process),
+# file:///path/to/dir, or redis://host:port/db. Rendered board fragments get
+# their own alias so they can be sized or pointed elsewhere separately. The
+# file backend scans its directory on every write, so it only suits small
+# boards; prefer redis once several workers share a cache.
+def cache_config(url, prefix, max_entries=300):
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": url, "KEY_PREFIX": prefix}
+    elif url.startswith("file://"):
+        config = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": url[len("file://"):] or str(BASE_DIR / ".cache" / prefix),
+        }
+    else:
+        config = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": prefix}
+    # Local backends cull once they hold MAX_ENTRIES keys; a big board has one per card.
+    config.update({"KEY_PREFIX": prefix, "OPTIONS": {"MAX_ENTRIES": max_entries}})
+    return config
+
+CACHE_URL = os.environ.get("CACHE_URL", "locmem://")
+CACHES = {
+    "default": cache_config(CACHE_URL, "lini"),
+    "template_fragments": cache_config(
+        os.environ.get("FRAGMENT_CACHE_URL", CACHE_URL),
+        "lini-fragments",
+        max_entries=int(os.environ.get("FRAGMENT_CACHE_MAX_ENTRIES", "50000")),
+    ),
+}
+
+# Board fragments are keyed on list/card versions, so a write never has to
+# delete anything; the timeout only bounds how long stale versions linger.
+BOARD_FRAGMENT_CACHE_TIMEOUT = int(os.environ.get("BOARD_FRAGMENT_CACHE_TIMEOUT", str(24 * 3600)))
+
+# Cards rendered per list on the board page; the rest load as the list scrolls.
+BOARD_LIST_PAGE_SIZE = int(os.environ.get("BOARD_LIST_PAGE_SIZE", "50"))
+
+# Finished cards older than this are moved to the archive by `manage.py archive_cards`.
+BOARD_ARCHIVE_AFTER_DAYS = int(os.environ.get("BOARD_ARCHIVE_AFTER_DAYS", "30"))
+
+# Seconds to keep encoded /snapshot/ payloads per (board, version); 0 disables.
+BOARD_SNAPSHOT_CACHE_TIMEOUT = int(os.environ.get("BOARD_SNAPSHOT_CACHE_TIMEOUT", "300"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -126,5 +206,38 @@ LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/login/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Seconds to keep (board, user) roles in the cache; 0 disables the cache tier.
+BOARD_ROLE_CACHE_TIMEOUT = int(os.environ.get("BOARD_ROLE_CACHE_TIMEOUT", "0"))
+
+# Seconds to keep a user's /api/dashboard/ pages. Membership changes retire
+# them at once; card counts and activity times may lag by this much. 0 disables.
+BOARD_DASHBOARD_CACHE_TIMEOUT = int(os.environ.get("BOARD_DASHBOARD_CACHE_TIMEOUT", "60"))
+
+# Card moves/edits, list deletes and role changes go to the per-board activity
+# log, written in one INSERT per committed batch. Events older than the
+# retention are removed by `manage.py prune_activity`.
+BOARD_ACTIVITY_LOG = os.environ.get("BOARD_ACTIVITY_LOG", "1") != "0"
+BOARD_ACTIVITY_RETENTION_DAYS = int(os.environ.get("BOARD_ACTIVITY_RETENTION_DAYS", "90"))
+
+# Live board updates. The in-process broker only reaches viewers on the same
+# worker; use "board.realtime.RedisBroker" when running several workers.
+BOARD_EVENTS_BROKER = os.environ.get("BOARD_EVENTS_BROKER", "board.realtime.InProcessBroker")
+BOARD_EVENTS_BROKER_OPTIONS = {"url": os.environ["REDIS_URL"]} if "REDIS_URL" in os.environ and "Redis" in BOARD_EVENTS_BROKER else {}
+BOARD_EVENTS_KEEPALIVE = 15
 CSRF_TRUSTED_ORIGINS = ["*"]
-django_heroku.settings(locals())
\ No newline at end of file
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    # Metric lines are JSON already; keep them one parseable object per line.
+    "formatters": {"json": {"format": "%(message)s"}},
+    "handlers": {"metrics": {"class": "logging.StreamHandler", "formatter": "json"}},
+    "loggers": {
+        "board.metrics": {"handlers": ["metrics"], "level": os.environ.get("BOARD_METRICS_LOG_LEVEL", "INFO"), "propagate": False},
+    },
+}
+
+# LOGGING above replaces django-heroku's default logging setup, and DATABASES
+# (DATABASE_URL plus the connection tuning) its database config.
+django_heroku.settings(locals(), logging=False, databases=False)
\ No newline at end of file